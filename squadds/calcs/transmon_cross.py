@@ -12,6 +12,7 @@ from scipy.constants import Planck, e, h, hbar, pi
 from scqubits.core.transmon import Transmon
 
 from squadds.calcs.qubit import QubitHamiltonian
+from squadds.core.join import FactorizedJoin
 
 """
 ========================================================
@@ -321,6 +322,33 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
         alpha = transmon.anharmonicity() * 1E3  # MHz
         return E01, alpha
 
+    def unique_E01_and_anharmonicity(self, EJ, EC, ng=0, ncut=30):
+        """
+        Calculate E01 and the anharmonicity for arrays of EJ and EC, diagonalizing each distinct (EJ, EC) pair only once.
+
+        Merged qubit-cavity rows repeat the same qubit once per cavity partner, so there are far fewer distinct
+        pairs than rows.
+
+        Args:
+            - EJ (numpy.ndarray or float): Josephson energies of the transmon qubits.
+            - EC (numpy.ndarray): Charging energies of the transmon qubits.
+            - ng (float, optional): Offset charge on the transmon qubit. Defaults to 0.
+            - ncut (int, optional): Truncation level for the transmon qubit's Hilbert space. Defaults to 30.
+
+        Returns:
+            - E01 (numpy.ndarray): Energy of the first excited state (E01) in GHz, for every row.
+            - alpha (numpy.ndarray): Anharmonicity (alpha) in MHz, for every row.
+        """
+        EC = np.asarray(EC, dtype=float)
+        EJ = np.broadcast_to(np.asarray(EJ, dtype=float), EC.shape)
+        if EC.size == 0:
+            return np.empty(0), np.empty(0)
+
+        unique_pairs, inverse = np.unique(np.column_stack([EJ, EC]), axis=0, return_inverse=True)
+        E01, alpha = np.array([self.E01_and_anharmonicity(ej, ec, ng=ng, ncut=ncut) for ej, ec in unique_pairs]).T
+        inverse = inverse.reshape(-1)
+        return E01[inverse], alpha[inverse]
+
     def E01(self, EJ, EC, ng=0, ncut=30):
         """
         Calculate the energy of the first excited state (E01) of a transmon qubit.
@@ -354,7 +382,7 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
         EJ_target = self.EJ(self.target_params["qubit_frequency_GHz"], self.target_params["anharmonicity_MHz"] * 1e-3)
         self.df["EC"] = self.df.apply(lambda row: self.EC(row["cross_to_claw"], row["cross_to_ground"]), axis=1)
         self.df['EJ'] = EJ_target
-        self.df['qubit_frequency_GHz'], self.df['anharmonicity_MHz'] = zip(*self.df.apply(lambda row: self.E01_and_anharmonicity(row['EJ'], row['EC']), axis=1))
+        self.df['qubit_frequency_GHz'], self.df['anharmonicity_MHz'] = self.unique_E01_and_anharmonicity(self.df['EJ'].values, self.df['EC'].values)
 
     def add_qubit_H_params_chunk(self, df):
         """
@@ -373,11 +401,11 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
 
         cross_to_claw_values = df["cross_to_claw"].values
         cross_to_ground_values = df["cross_to_ground"].values
-        EC_values = np.array([EC_numba(claw, ground) for claw, ground in zip(cross_to_claw_values, cross_to_ground_values)], dtype=np.float32)
+        EC_values = EC_numba(cross_to_claw_values.astype(np.float64), cross_to_ground_values.astype(np.float64)).astype(np.float32)
 
         df["EC"] = EC_values
         df['EJ'] = EJ_target
-        df['qubit_frequency_GHz'], df['anharmonicity_MHz'] = np.vectorize(self.E01_and_anharmonicity)(df['EJ'].values, df['EC'].values)
+        df['qubit_frequency_GHz'], df['anharmonicity_MHz'] = self.unique_E01_and_anharmonicity(df['EJ'].values, df['EC'].values)
         df['qubit_frequency_GHz'] = df['qubit_frequency_GHz'].astype(np.float32)
         df['anharmonicity_MHz'] = df['anharmonicity_MHz'].astype(np.float32)
 
@@ -398,6 +426,10 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
         Returns:
             None
         """
+        if isinstance(self.df, FactorizedJoin):
+            self.add_factorized_cavity_coupled_H_params(Z_0=Z_0)
+            return
+
         if self.selected_resonator_type == "half":
             if num_chunks == "auto":
                 num_chunks = psutil.cpu_count(logical=True)
@@ -417,6 +449,38 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
                             res_type=row['resonator_type'], 
                             Z0=50), axis=1)
 
+    def add_factorized_cavity_coupled_H_params(self, Z_0=50):
+        """
+        Add cavity-coupled Hamiltonian parameters to a FactorizedJoin of qubits and cavities.
+
+        The qubit parameters (EC, EJ, qubit_frequency_GHz, anharmonicity_MHz) only depend on the qubit, so they are
+        computed once per qubit row. Only 'g_MHz' is computed and stored once per qubit-cavity pair.
+
+        Args:
+            - Z_0: The characteristic impedance of the transmission line. Default is 50 ohms.
+
+        Returns:
+            None
+        """
+        join = self.df
+        EJ_target = self.EJ(self.target_params["qubit_frequency_GHz"], self.target_params["anharmonicity_MHz"] * 1e-3)
+
+        qubits = join.left
+        qubits["EC"] = [self.EC(claw, ground) for claw, ground in zip(qubits["cross_to_claw"], qubits["cross_to_ground"])]
+        qubits["EJ"] = EJ_target
+        qubits["qubit_frequency_GHz"], qubits["anharmonicity_MHz"] = self.unique_E01_and_anharmonicity(qubits["EJ"].values, qubits["EC"].values)
+
+        C = join.column("cross_to_ground").astype(float)
+        C_c = join.column("cross_to_claw").astype(float)
+        f_r = join.column("cavity_frequency_GHz").astype(float)
+        # the half-wave cavities are built from quarter-wave entries, so their `resonator_type` column is not used
+        res_type = np.full(len(join), "half", dtype=object) if self.selected_resonator_type == "half" else join.column("resonator_type")
+        g = np.empty(len(join))
+        for kind in pd.unique(res_type):
+            mask = res_type == kind
+            g[mask] = self.g_from_cap_matrix(C=C[mask], C_c=C_c[mask], EJ=EJ_target, f_r=f_r[mask], res_type=kind, Z0=Z_0)
+        join["g_MHz"] = g
+
     def add_cavity_coupled_H_params_chunk(self, chunk, Z_0=50):
         """
         Add cavity-coupled Hamiltonian parameters to the DataFrame chunk.
@@ -431,7 +495,19 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
             - chunk: The DataFrame chunk with the added parameters.
         """
         chunk = self.add_qubit_H_params_chunk(chunk)
+        return self.add_g_chunk(chunk, Z_0)
 
+    def add_g_chunk(self, chunk, Z_0=50):
+        """
+        Add the coupling strength 'g_MHz' to a DataFrame chunk that already has the qubit Hamiltonian parameters.
+
+        Args:
+            - chunk: The DataFrame chunk to which the coupling strength will be added.
+            - Z_0: The characteristic impedance of the transmission line. Default is 50 ohms.
+
+        Returns:
+            - chunk: The DataFrame chunk with the added coupling strength.
+        """
         cross_to_ground_values = chunk['cross_to_ground'].values
         cross_to_claw_values = chunk['cross_to_claw'].values
         EJ_values = chunk['EJ'].values
@@ -448,7 +524,8 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
         """
         Process the DataFrame in parallel.
 
-        This method splits the DataFrame into chunks and processes each chunk in parallel.
+        The qubit Hamiltonian parameters are computed once for the whole DataFrame, so that each distinct qubit is
+        diagonalized only once, then the coupling strengths are computed for each chunk in parallel.
 
         Args:
             - df: The DataFrame to be processed.
@@ -459,10 +536,11 @@ class TransmonCrossHamiltonian(QubitHamiltonian):
             - df: The DataFrame with the added parameters.
 
         """
+        df = self.add_qubit_H_params_chunk(df)
         chunks = np.array_split(df, num_chunks)
 
         with Parallel(n_jobs=num_chunks) as parallel:
-            results = parallel(delayed(self.add_cavity_coupled_H_params_chunk)(chunk, Z_0) for chunk in chunks)
+            results = parallel(delayed(self.add_g_chunk)(chunk, Z_0) for chunk in chunks)
 
         return pd.concat(results)
 
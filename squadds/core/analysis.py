@@ -1,3 +1,4 @@
+import copy
 import multiprocessing
 import time
 from typing import Any, Dict, List, Optional
@@ -9,13 +10,20 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import psutil
+import pyarrow as pa
+import pyarrow.parquet as pq
 import seaborn as sns
 from matplotlib.patches import Patch
 
 from squadds.calcs.transmon_cross import TransmonCrossHamiltonian
+from squadds.core.index import DesignIndex
+from squadds.core.join import FactorizedJoin
 from squadds.core.metrics import *
 from squadds.core.processing import merge_dfs, unify_columns
-from squadds.core.utils import create_unified_design_options
+from squadds.core.stats import FrameStats
+from squadds.core.utils import (create_unified_design_options,
+                                extract_unified_design_fields,
+                                materialize_design_options)
 
 """
 =====================================================================================
@@ -53,8 +61,12 @@ class Analyzer:
         _get_H_param_keys(): Gets the parameter keys for the Hamiltonian based on the selected system.
         target_param_keys(): Returns the target parameter keys.
         set_metric_strategy(strategy: MetricStrategy): Sets the metric strategy to use for calculating the distance metric.
+        with_df(df, **attributes): Returns a copy of the analyzer searching another DataFrame.
         _outside_bounds(df: pd.DataFrame, params: dict, display=True) -> bool: Checks if entered parameters are outside the bounds of a dataframe.
         find_closest(target_params: dict, num_top: int, metric: str = 'Euclidean', display: bool = True): Finds the closest designs in the library based on the target parameters.
+        find_closest_many(targets_df: pd.DataFrame, num_top: int, metric: str = 'Euclidean', display: bool = True): Finds the closest designs for every row of a DataFrame of targets.
+        find_closest_in_parquet(path: str, target_params: dict, num_top: int, metric: str = 'Euclidean', display: bool = True): Finds the closest designs in a parquet file read one batch of rows at a time.
+        take_rows(labels): Returns rows of the library as a DataFrame.
         get_interpolated_design(target_params: dict, metric: str = 'Euclidean', display: bool = True): Gets the interpolated design based on the target parameters.
         get_design(df): Extracts the design parameters from the dataframe and returns a dict.
     """
@@ -107,6 +119,9 @@ class Analyzer:
         self.selected_coupler = self.db.selected_coupler
         self.selected_system = self.db.selected_system
         self.df = self.db.selected_df
+        if isinstance(self.df, FactorizedJoin):
+            # the Hamiltonian columns are added to the copy, not to the join held by the database
+            self.df = self.df.copy()
         self.qubit_df = self.db.qubit_df
         self.cavity_df = self.db.cavity_df
         self.coupler_df = self.db.coupler_df
@@ -124,14 +139,39 @@ class Analyzer:
         self.custom_metric_func = None
         self.metric_weights = None
         self.target_params = None
+        self._design_indexes = {}  # spatial indexes of self.df, see _design_index
+        self._indexed_df = None
+        self._stats = None  # column statistics of self.df, see _frame_stats
         
         self.H_param_keys = self._get_H_param_keys()
 
     def reload_db(self):
         """
-        Reload the Analyzer with the current singleton SQuADDS_DB object.
+        Reload the Analyzer with the current state of its SQuADDS_DB object.
         """
         self._initialize_attributes()
+
+    def with_df(self, df, **attributes):
+        """
+        Returns a shallow copy of the analyzer that searches `df` instead of its own DataFrame.
+
+        The analyzer itself is left untouched, so a sub-query (e.g. over a filtered set of designs)
+        does not change the state other callers of this analyzer see.
+
+        Args:
+            df (pandas.DataFrame or FactorizedJoin): The designs to search.
+            **attributes: Other attributes to override on the copy, e.g. `H_param_keys`.
+
+        Returns:
+            Analyzer: The copy.
+        """
+        analyzer = copy.copy(self)
+        analyzer.df = df
+        analyzer._design_indexes = {}
+        analyzer._stats = None
+        for name, value in attributes.items():
+            setattr(analyzer, name, value)
+        return analyzer
         
     def _add_target_params_columns(self):
         """
@@ -146,6 +186,9 @@ class Analyzer:
             a ValueError if the selected system is invalid.
         """
         self.params_computed = True
+        # the target columns are recomputed, so the indexes and statistics of the previous ones are stale
+        self._design_indexes = {}
+        self._stats = None
 
         #! TODO: make this more general and read the param keys from the database
         if self.selected_system == "qubit":
@@ -166,6 +209,10 @@ class Analyzer:
             self.df = qubit_H.df 
         else:
             raise ValueError("Invalid system.")
+
+        # bounds and posting lists of the target columns, used by every query on this frame
+        self._stats = FrameStats(self.df)
+        self._stats.precompute([key for key in (self.H_param_keys or []) if key in self.df.columns])
     
     def _fix_cavity_claw_df(self):
         """
@@ -181,17 +228,25 @@ class Analyzer:
         Returns:
             None
         """
-        if ("cavity_frequency" in self.df.columns) or ("kappa" in self.df.columns):
-            self.df = self.df.rename(columns={"cavity_frequency": "cavity_frequency_GHz", "kappa": "kappa_kHz"})
-            self.df["cavity_frequency_GHz"] = self.df["cavity_frequency_GHz"] * 1e-9
-            self.df["kappa_kHz"] = self.df["kappa_kHz"] * 1e-3
-            # drop the units column in place
+        # a FactorizedJoin keeps each cavity once, so only its cavity rows need fixing
+        df = self.df.right if isinstance(self.df, FactorizedJoin) else self.df
+        if ("cavity_frequency" in df.columns) or ("kappa" in df.columns):
+            df = df.rename(columns={"cavity_frequency": "cavity_frequency_GHz", "kappa": "kappa_kHz"})
+            df["cavity_frequency_GHz"] = df["cavity_frequency_GHz"] * 1e-9
+            df["kappa_kHz"] = df["kappa_kHz"] * 1e-3
+            # drop the units column in place (a joined system keeps its suffixed units columns)
             try:
-                self.df.drop(columns=["units"], inplace=True)
+                if not isinstance(self.df, FactorizedJoin):
+                    df.drop(columns=["units"], inplace=True)
             except Exception as e:
                 pass
         else:
             pass
+
+        if isinstance(self.df, FactorizedJoin):
+            self.df.right = df
+        else:
+            self.df = df
     
     def _get_H_param_keys(self):
         """
@@ -237,11 +292,27 @@ class Analyzer:
 
         self.metric_strategy = strategy 
 
+    def _set_metric(self, metric):
+        """Sets the metric strategy from the name of a supported metric."""
+        if metric == 'Euclidean':
+            self.set_metric_strategy(EuclideanMetric())
+        elif metric == 'Manhattan':
+            self.set_metric_strategy(ManhattanMetric())
+        elif metric == 'Chebyshev':
+            self.set_metric_strategy(ChebyshevMetric())
+        elif metric == 'Weighted Euclidean':
+            self.set_metric_strategy(WeightedEuclideanMetric(self.metric_weights))
+        elif metric == 'Custom':
+            self.set_metric_strategy(CustomMetric(self.custom_metric_func))
+
+        if not self.metric_strategy:
+            raise ValueError("Invalid metric.")
+
     def _outside_bounds(self, df: pd.DataFrame, params: dict, display=True) -> bool:
         """
         Check if entered parameters are outside the bounds of a dataframe.
         Args:
-            df (pd.DataFrame): Dataframe to give warning.
+            df (pd.DataFrame or FactorizedJoin): Dataframe to give warning. The statistics of `self.df` are reused across calls.
             params (dict): Keys are column names of `df`. Values are values to check for bounds.
         
         Returns:
@@ -249,25 +320,28 @@ class Analyzer:
         """
         outside_bounds = False
 
-        filtered_df = df.copy()
+        # the bounds and the categorical values come from the statistics of the frame, computed once
+        stats = self._frame_stats() if df is self.df else FrameStats(df)
+        columns = set(df.columns)
 
         for param, value in params.items():
-            if param not in df.columns:
+            if param not in columns:
                 raise ValueError(f"{param} is not a column in dataframe: {df}")
 
             if isinstance(value, (int, float)):
-                if value < df[param].min() or value > df[param].max():
+                low, high = stats.bounds(param)
+                if value < low or value > high:
                     if display:
                         logging.info(f"\033[1mNOTE TO USER:\033[0m the value \033[1m{value} for {param}\033[0m is outside the bounds of our library.\nIf you find a geometry which corresponds to these values, please consider contributing it! 😁🙏\n")
                     outside_bounds = True
 
             elif isinstance(value, str):
-                filtered_df = filtered_df[filtered_df[param] == value]
+                pass
 
             else:
                 raise ValueError(f"Unsupported type {type(value)} for parameter {param}")
 
-        if filtered_df.empty:
+        if len(stats.matching([(param, value) for param, value in params.items() if isinstance(value, str)])) == 0:
             categorical_params = {key: value for key, value in params.items() if isinstance(value, str)}
             if display and categorical_params:
                 logging.info(f"\033[1mNOTE TO USER:\033[0m There are no geometries with the specified categorical parameters - \033[1m{categorical_params}\033[0m.\nIf you find a geometry which corresponds to these values, please consider contributing it! 😁🙏\n")
@@ -319,7 +393,8 @@ class Analyzer:
                          display: bool = True,
                          parallel: bool = False,
                          num_cpu: str ="auto",
-                         skip_df_gen: bool = False):
+                         skip_df_gen: bool = False,
+                         use_index: bool = False):
         """
         Find the closest designs in the library based on the target parameters.
 
@@ -328,9 +403,10 @@ class Analyzer:
             - num_top (int): The number of closest designs to retrieve.
             - metric (str, optional): The distance metric to use for calculating distances. Defaults to 'Euclidean'.
             - display (bool, optional): Whether to display warnings for parameters outside of the library bounds. Defaults to True.
-            - parallell (bool, optional): Whether to run metric calculation in a parallelized way
+            - parallell (bool, optional): Whether to run metric calculation in a parallelized way. Only used by metrics without a batch implementation (see `MetricStrategy.calculate_batch`).
             - num_cpu (str/int, optional): The number of CPUs to run a job over
             - skip_df_gen (bool, optional): Whether to generate the df or run from memory
+            - use_index (bool, optional): Whether to answer the query from a spatial index of the library (see `DesignIndex`), built once per DataFrame, target columns and categorical targets. The results are the same as without it. Defaults to False.
 
         Returns:
             - closest_df (DataFrame): A DataFrame containing the closest designs.
@@ -360,56 +436,268 @@ class Analyzer:
             print("Either `skip_df_gen` flag is set to True or all target params have been precomputed at an earlier step. Using `df` from memory.\nPlease set this to False if `target_parameters` have changed.")
             
         target_params_list = list(self.target_params.keys())
-        filtered_df = self.df[target_params_list]  
-        self._outside_bounds(df=filtered_df, params=target_params, display=display)
+        self._outside_bounds(df=self.df, params=target_params, display=display)
 
         # Set strategy dynamically based on the metric parameter
-        if metric == 'Euclidean':
-            self.set_metric_strategy(EuclideanMetric())
-        elif metric == 'Manhattan':
-            self.set_metric_strategy(ManhattanMetric())
-        elif metric == 'Chebyshev':
-            self.set_metric_strategy(ChebyshevMetric())
-        elif metric == 'Weighted Euclidean':
-            self.set_metric_strategy(WeightedEuclideanMetric(self.metric_weights))
-        elif metric == 'Custom':
-            self.set_metric_strategy(CustomMetric(self.custom_metric_func))
-
-        if not self.metric_strategy:
-            raise ValueError("Invalid metric.")
+        self._set_metric(metric)
 
         # Main logic
+        if use_index:
+            sorted_indices = self._closest_from_index(target_params, num_top)
+            if sorted_indices is not None:
+                return self._select_closest(sorted_indices)
 
-        # Filter DataFrame based on target parameters that are string
-        for param, value in target_params.items():
-            if isinstance(value, str):
-                filtered_df = filtered_df[filtered_df[param] == value]
-
+        # Select the designs that match the target parameters that are string from their posting lists
+        positions = self._partition_positions(tuple((param, value) for param, value in target_params.items() if isinstance(value, str)))
 
-        # if the filtered_df is empty, raise a User input error
-        if filtered_df.empty:
+        # if no design matches, raise a User input error
+        if len(positions) == 0:
             raise ValueError(f"No geometries found with the specified parameters:\n{target_params}\nPlease double-check your targets (especially ``resonator_type``) and try again.")
 
         # Calculate distances
-        if not parallel:
+        if self.metric_strategy.supports_batch():
+            # one pass of the metric kernel over a contiguous matrix of the numerical target columns
+            columns = self.metric_strategy.batch_columns(target_params)
+            matrix = np.column_stack([self._df_column(column, positions).astype(np.float64) for column in columns]) if columns else np.empty((len(positions), 0))
+            distances = self.metric_strategy.calculate_batch(target_params, matrix)
+            sorted_indices = self._row_labels(positions[smallest_k(distances, num_top)])
+        elif not parallel:
+            filtered_df = self._target_rows(target_params_list, positions)
             distances = filtered_df.apply(lambda row: self.metric_strategy.calculate(target_params, row), axis=1)
-            sorted_indices = distances.nsmallest(num_top).index
+            sorted_indices = filtered_df.index[smallest_k(distances.to_numpy(dtype=np.float64), num_top)]
         else:
             if num_cpu == "auto":
                 num_cpu = psutil.cpu_count(logical=True)
             elif int(num_cpu) > psutil.cpu_count(logical=True):
                 raise ValueError(f"num_cpu must be less than or equal to {psutil.cpu_count(logical=True)}")
+            elif int(num_cpu) < 1:
+                raise ValueError("`num_cpu` must be an integer greater than 0.")
             else:
-                num_cpu = 2
-                raise UserWarning("`num_chunk`s must be an integer greater than 0. Defaulting to 2.")
+                num_cpu = int(num_cpu)
 
             print(f"Using {num_cpu} CPUs for parallel processing")
+            filtered_df = self._target_rows(target_params_list, positions)
+
+            # every job only returns the closest rows of its chunk
+            sorted_indices = self.metric_strategy.closest_in_parallel(target_params, filtered_df, num_top, num_jobs=num_cpu)
+
+        return self._select_closest(sorted_indices)
+
+    def find_closest_many(self,
+                          targets_df: pd.DataFrame,
+                          num_top: int,
+                          metric: str = 'Euclidean',
+                          display: bool = True,
+                          use_index: bool = True) -> pd.DataFrame:
+        """
+        Find the closest designs in the library for every row of a DataFrame of target parameters.
+
+        The metric, the checks and the Hamiltonian columns are set up once for all targets. As with successive
+        calls to `find_closest`, the Hamiltonian columns are computed from the first target if they have not been
+        computed yet and are reused for the other targets. Every target is answered from the spatial index of the
+        library (see `DesignIndex`) or, for metrics without one, by a single pass of the metric over the designs
+        that match its categorical parameters.
+
+        Args:
+            - targets_df (DataFrame): One row per target and one column per target parameter, e.g. ``qubit_frequency_GHz`` or ``resonator_type``.
+            - num_top (int): The number of closest designs to retrieve per target.
+            - metric (str, optional): The distance metric to use for calculating distances. Defaults to 'Euclidean'.
+            - display (bool, optional): Whether to display warnings for targets outside of the library bounds. Defaults to True.
+            - use_index (bool, optional): Whether to use the spatial index for the metrics that support it. The results are the same either way. Defaults to True.
+
+        Returns:
+            - closest (DataFrame): One row per target and close design, closest first, with the columns ``target_id`` (the label of the target in `targets_df`), ``rank`` (0 for the closest design), ``row_index`` (the label of the design in `self.df`) and ``distance``.
+
+        Raises:
+            - ValueError: If the specified metric is not supported, a target parameter is not a column of the library or no design matches the categorical parameters of a target.
+        """
+        if metric not in self.__supported_metrics__:
+            raise ValueError(f'`metric` must be one of the following: {self.__supported_metrics__}')
 
-            distances = self.metric_strategy.calculate_in_parallel(target_params, filtered_df, num_jobs=num_cpu)
-            sorted_indices = pd.Series(distances).nsmallest(num_top).index
+        targets = targets_df.to_dict("records")
+        if self.selected_resonator_type == "half":
+            targets = [{param: value for param, value in target.items() if param != "resonator_type"} for target in targets]
+        closest = {"target_id": [], "rank": [], "row_index": [], "distance": []}
+        if not targets:
+            return pd.DataFrame(closest)
+
+        if not self.params_computed:
+            self.target_params = dict(targets[0])
+            self._add_target_params_columns()
+        self._set_metric(metric)
+        for param in targets[0]:
+            if param not in self.df.columns:
+                raise ValueError(f"{param} is not a column in dataframe: {self.df}")
+        self._outside_bounds_many(targets, display=display)
+
+        scans = {}
+        for target_id, target in zip(targets_df.index, targets):
+            # as in `find_closest`, a target without designs is an input error rather than a missing row
+            partition = tuple((param, value) for param, value in target.items() if isinstance(value, str))
+            if len(self._partition_positions(partition)) == 0:
+                raise ValueError(f"No geometries found for target {target_id!r} with the specified parameters:\n{target}\nPlease double-check your targets (especially ``resonator_type``) and try again.")
+
+            found = None
+            if use_index and self.metric_strategy.supports_batch() and self.metric_strategy.index_norm(target) is not None:
+                index = self._design_index(target)
+                if index is not None:
+                    found = index.query(self.metric_strategy, target, num_top, return_distance=True)
+            if found is None:
+                found = self._scan_closest(target, num_top, scans)
+
+            positions, distances = found
+            closest["target_id"] += [target_id] * len(positions)
+            closest["rank"] += range(len(positions))
+            closest["row_index"] += list(self._row_labels(positions))
+            closest["distance"] += list(distances)
+
+        return pd.DataFrame(closest)
+
+    def find_closest_in_parquet(self,
+                                path: str,
+                                target_params: dict,
+                                num_top: int,
+                                metric: str = 'Euclidean',
+                                display: bool = True,
+                                batch_size: int = 65536) -> pd.DataFrame:
+        """
+        Find the closest designs in a parquet file of designs that holds the target parameters as columns,
+        e.g. a system DataFrame saved after `get_complete_df`, without loading the file in memory.
+
+        The file is read one batch of rows at a time and only the target columns are read to compute distances.
+        The closest rows of every batch are merged into the closest rows so far, and only the closest rows are
+        read in full at the end, so the memory used is bounded by `batch_size` rather than by the size of the file.
+
+        Args:
+            - path (str): The parquet file.
+            - target_params (dict): A dictionary containing the target parameters.
+            - num_top (int): The number of closest designs to retrieve.
+            - metric (str, optional): The distance metric to use for calculating distances. Defaults to 'Euclidean'.
+            - display (bool, optional): Whether to display warnings for parameters outside of the bounds of the file. Defaults to True.
+            - batch_size (int, optional): The number of rows read at a time. Defaults to 65536.
 
+        Returns:
+            - closest_df (DataFrame): The closest designs, closest first, indexed by their row number in the file.
+
+        Raises:
+            - ValueError: If the specified metric is not supported, a target parameter is not a column of the file or no design matches the categorical parameters.
+        """
+        if metric not in self.__supported_metrics__:
+            raise ValueError(f'`metric` must be one of the following: {self.__supported_metrics__}')
+        self._set_metric(metric)
+
+        parquet_file = pq.ParquetFile(path)
+        for param in target_params:
+            if param not in parquet_file.schema_arrow.names:
+                raise ValueError(f"{param} is not a column in {path}")
+        numeric_params = [param for param, value in target_params.items() if isinstance(value, (int, float))]
+        bounds = {param: (np.inf, -np.inf) for param in numeric_params}
+
+        closest = (np.empty(0), np.empty(0, dtype=np.int64))
+        start = 0
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=list(target_params)):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            for param in numeric_params:
+                low, high = bounds[param]
+                if chunk[param].notna().any():
+                    bounds[param] = (min(low, chunk[param].min()), max(high, chunk[param].max()))
+            for param, value in target_params.items():
+                if isinstance(value, str):
+                    chunk = chunk[chunk[param] == value]
+            if chunk.empty:
+                continue
+            closest = merge_smallest([closest, self.metric_strategy.closest(target_params, chunk, num_top)], num_top)
+
+        for param, (low, high) in bounds.items():
+            if display and (target_params[param] < low or target_params[param] > high):
+                logging.info(f"\033[1mNOTE TO USER:\033[0m the value \033[1m{target_params[param]} for {param}\033[0m is outside the bounds of our library.\nIf you find a geometry which corresponds to these values, please consider contributing it! 😁🙏\n")
+        if len(closest[1]) == 0:
+            raise ValueError(f"No geometries found with the specified parameters:\n{target_params}\nPlease double-check your targets (especially ``resonator_type``) and try again.")
+
+        # read the closest rows in full, one row group at a time
+        rows = closest[1].astype(np.int64)
+        group_starts = np.cumsum([0] + [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)])
+        groups = np.searchsorted(group_starts, rows, side="right") - 1
+        tables = []
+        for group in np.unique(groups):
+            table = parquet_file.read_row_group(int(group))
+            tables.append(table.take(pa.array(rows[groups == group] - group_starts[group])))
+        closest_df = pa.concat_tables(tables).to_pandas()
+        closest_df.index = pd.Index(np.concatenate([rows[groups == group] for group in np.unique(groups)]))
+        return closest_df.loc[rows]
+
+    def _scan_closest(self, target_params, num_top, scans):
+        """
+        Returns the positions and distances of the `num_top` designs closest to one target, computing the metric
+        for every design that matches its categorical parameters. The matching designs are gathered once per
+        categorical parameters and target columns in `scans`.
+        """
+        partition = tuple((param, value) for param, value in target_params.items() if isinstance(value, str))
+        batch = self.metric_strategy.supports_batch()
+        columns = self.metric_strategy.batch_columns(target_params) if batch else list(target_params)
+        if (partition, tuple(columns), batch) not in scans:
+            positions = self._partition_positions(partition)
+            if batch:
+                rows = np.column_stack([self._df_column(column, positions).astype(np.float64) for column in columns]) if columns else np.empty((len(positions), 0))
+            else:
+                rows = self._target_rows(columns, positions)
+            scans[(partition, tuple(columns), batch)] = (positions, rows)
+        positions, rows = scans[(partition, tuple(columns), batch)]
+
+        if batch:
+            distances = self.metric_strategy.calculate_batch(target_params, rows)
+        else:
+            distances = rows.apply(lambda row: self.metric_strategy.calculate(target_params, row), axis=1).to_numpy(dtype=np.float64)
+        selected = smallest_k(distances, num_top)
+        return positions[selected], distances[selected]
+
+    def _outside_bounds_many(self, targets, display=True):
+        """
+        Checks a list of targets against the bounds of `self.df`, like `_outside_bounds` but with one note per parameter.
+
+        Args:
+            targets (list): The target parameters, one dictionary per target.
+            display (bool, optional): Whether to display the notes. Defaults to True.
+
+        Returns:
+            numpy.ndarray: True for the targets with a value outside the bounds or no matching design.
+        """
+        outside = np.zeros(len(targets), dtype=bool)
+        for param in targets[0]:
+            values = [target[param] for target in targets]
+            if isinstance(values[0], (int, float)):
+                low, high = self._frame_stats().bounds(param)
+                values = np.asarray(values, dtype=np.float64)
+                outside_param = (values < low) | (values > high)
+                if display and outside_param.any():
+                    logging.info(f"\033[1mNOTE TO USER:\033[0m the values of \033[1m{int(outside_param.sum())} targets for {param}\033[0m are outside the bounds of our library.\nIf you find a geometry which corresponds to these values, please consider contributing it! 😁🙏\n")
+                outside |= outside_param
+
+        partitions = [tuple((param, value) for param, value in target.items() if isinstance(value, str)) for target in targets]
+        for partition in set(partitions):
+            if partition and len(self._partition_positions(partition)) == 0:
+                if display:
+                    logging.info(f"\033[1mNOTE TO USER:\033[0m There are no geometries with the specified categorical parameters - \033[1m{dict(partition)}\033[0m.\nIf you find a geometry which corresponds to these values, please consider contributing it! 😁🙏\n")
+                outside |= np.array([other == partition for other in partitions])
+        return outside
+
+    def _select_closest(self, sorted_indices):
+        """
+        Expands the closest designs into `closest_df` and stores the best design.
+
+        Args:
+            sorted_indices (pandas.Index): The labels of the closest designs in `self.df`, closest first.
+
+        Returns:
+            - closest_df (DataFrame): A DataFrame containing the closest designs.
+        """
         # Sort distances and get the closest ones
-        self.closest_df = self.df.loc[sorted_indices]
+        self.closest_df = self.take_rows(sorted_indices)
+        if {"design_options_qubit", "design_options_cavity_claw"}.issubset(self.closest_df.columns):
+            # the closest designs get their own dictionaries, which the rows of the system DataFrame share
+            self.closest_df = materialize_design_options(self.closest_df)
 
         # set the closest design found flag
         self.closest_design_found = True
@@ -423,6 +711,14 @@ class Analyzer:
                 self.presimmed_closest_cpw_design = self.closest_df_entry["design_options_cavity_claw"]
                 self.presimmed_closest_qubit_design = self.closest_df_entry["design_options_qubit"]
 
+        elif self.selected_resonator_type == "half" and isinstance(self.df, FactorizedJoin):
+            # the expanded pairs already hold the qubit, the updated cavity and the unified design options
+            self.closest_qubit = self.qubit_df.iloc[self.closest_df.index_qc]
+            self.closest_coupler = self.coupler_df.iloc[self.closest_df.index_cplr]
+            self.closest_cavity = self.get_closest_cavity()
+            self.closest_df_entry = self.closest_df.iloc[0]
+            self.closest_design = self.closest_df_entry["design_options"]
+
         elif self.selected_resonator_type == "half":
             # retrieve the best designs
             self.closest_qubit = self.qubit_df.iloc[self.closest_df.index_qc]
@@ -448,6 +744,107 @@ class Analyzer:
 
         return self.closest_df
 
+    def take_rows(self, labels):
+        """
+        Returns rows of the library as a DataFrame, e.g. the designs found by `find_closest_many`.
+
+        Args:
+            labels (array-like): The labels of the rows in `self.df` (the ``row_index`` column of `find_closest_many`).
+
+        Returns:
+            pd.DataFrame: The rows, in the order of `labels`.
+        """
+        if isinstance(self.df, FactorizedJoin):
+            # only the selected pairs are expanded into full rows
+            return self.df.to_pandas(rows=labels)
+        return self.df.loc[labels]
+
+    def _row_labels(self, positions):
+        """Returns the labels of the rows of `self.df` at the given positions."""
+        return pd.Index(positions) if isinstance(self.df, FactorizedJoin) else self.df.index[positions]
+
+    def _partition_positions(self, partition):
+        """Returns the positions of the rows of `self.df` that match the categorical (param, value) pairs of `partition`."""
+        return self._frame_stats().matching(partition)
+
+    def _frame_stats(self):
+        """
+        Returns the column statistics and posting lists of `self.df` (see `FrameStats`), built once per DataFrame.
+        """
+        if self._stats is None or self._stats.df is not self.df:
+            self._stats = FrameStats(self.df)
+        return self._stats
+
+    def _target_rows(self, columns, positions):
+        """Returns some columns of the rows of `self.df` at the given positions, without copying the other rows."""
+        if isinstance(self.df, FactorizedJoin):
+            return self.df.to_pandas(rows=positions, columns=columns)
+        return pd.DataFrame({column: self.df[column].to_numpy()[positions] for column in columns}, index=self.df.index[positions])
+
+    def _closest_from_index(self, target_params, num_top):
+        """
+        Returns the labels of the closest designs found with the spatial index of `self.df`,
+        or None if the metric cannot be answered by an index.
+        """
+        if not self.metric_strategy.supports_batch() or self.metric_strategy.index_norm(target_params) is None:
+            return None
+        index = self._design_index(target_params)
+        if index is None or len(index) == 0:
+            return None
+        positions = index.query(self.metric_strategy, target_params, num_top)
+        if positions is None:
+            return None
+        return self._row_labels(positions)
+
+    def _design_index(self, target_params):
+        """
+        Returns the spatial index of the designs of `self.df` that match the categorical target parameters
+        (e.g. ``resonator_type``), over its numerical target columns. Indexes are built once per DataFrame and are
+        stored next to the cached system DataFrames, so another session with the same data loads them instead.
+        """
+        if self._indexed_df is not self.df:
+            self._design_indexes = {}
+            self._indexed_df = self.df
+        columns = self.metric_strategy.batch_columns(target_params)
+        partition = tuple((param, value) for param, value in target_params.items() if isinstance(value, str))
+        if not columns:
+            return None
+        # the tree is scaled for the metric, see DesignIndex.build
+        scaling = f"{type(self.metric_strategy).__name__}{getattr(self.metric_strategy, 'weights', '') or ''}"
+        if (tuple(columns), partition, scaling) in self._design_indexes:
+            return self._design_indexes[(tuple(columns), partition, scaling)]
+
+        positions = self._partition_positions(partition)
+        matrix = np.column_stack([self._df_column(column, positions).astype(np.float64) for column in columns])
+
+        store = getattr(self.db, "store", None)
+        name = f"{self.selected_system}-{self.selected_qubit}-{self.selected_cavity}-{self.selected_coupler}-{self.selected_resonator_type}:{','.join(columns)}:{partition}:{scaling}"
+        key = DesignIndex.content_key(matrix, positions, columns + [scaling])
+        index = None
+        if store is not None:
+            try:
+                arrays = store.load_index(name, key)
+                index = None if arrays is None else DesignIndex.from_arrays(**arrays)
+            except Exception as e:
+                print(f"Could not load the stored design index: {e}")
+        if index is None:
+            index = DesignIndex.build(matrix, positions, metric=self.metric_strategy, columns=columns)
+            if store is not None:
+                try:
+                    store.save_index(name, key, index.arrays())
+                except Exception as e:
+                    print(f"Could not store the design index: {e}")
+
+        self._design_indexes[(tuple(columns), partition, scaling)] = index
+        return index
+
+    def _df_column(self, name, rows=None):
+        """Returns a column of `self.df` as a numpy array, or its values at the positions `rows`."""
+        if isinstance(self.df, FactorizedJoin):
+            return self.df.column(name, rows)
+        values = self.df[name].to_numpy()
+        return values if rows is None else values[rows]
+
     def get_closest_cavity(self):
         """
         Returns the closest cavity design.
@@ -541,17 +938,21 @@ class Analyzer:
             ax2.tick_params(axis='both', which='major', labelsize=20)
 
         elif self.selected_resonator_type == "half":
+            df = self.df
+            if isinstance(df, FactorizedJoin):
+                df = df.to_pandas(columns=['cavity_frequency_GHz', 'kappa_kHz', 'anharmonicity_MHz', 'g_MHz'])
+
             # set up canvas objects
-            x1_range = (self.df['cavity_frequency_GHz'].min(), self.df['cavity_frequency_GHz'].max())
-            y1_range = (self.df['kappa_kHz'].min(), self.df['kappa_kHz'].max())
+            x1_range = (df['cavity_frequency_GHz'].min(), df['cavity_frequency_GHz'].max())
+            y1_range = (df['kappa_kHz'].min(), df['kappa_kHz'].max())
 
-            x2_range = (self.df['anharmonicity_MHz'].min(), self.df['anharmonicity_MHz'].max())
-            y2_range = (self.df['g_MHz'].min(), self.df['g_MHz'].max())
+            x2_range = (df['anharmonicity_MHz'].min(), df['anharmonicity_MHz'].max())
+            y2_range = (df['g_MHz'].min(), df['g_MHz'].max())
             
             canvas1 = ds.Canvas(plot_width=800, plot_height=600, x_range=x1_range, y_range=y1_range)
             canvas2 = ds.Canvas(plot_width=800, plot_height=600, x_range=x2_range, y_range=y2_range)
-            agg1 = canvas1.points(self.df, 'cavity_frequency_GHz', 'kappa_kHz')
-            agg2 = canvas2.points(self.df, 'anharmonicity_MHz', 'g_MHz')
+            agg1 = canvas1.points(df, 'cavity_frequency_GHz', 'kappa_kHz')
+            agg2 = canvas2.points(df, 'anharmonicity_MHz', 'g_MHz')
 
             # Create the image using a list of colors from the 'Blues' colormap
             cmap = cm.get_cmap('Blues')
@@ -596,6 +997,17 @@ class Analyzer:
         plt.tight_layout()
         plt.show()
 
+    @staticmethod
+    def _select_design_options(df: pd.DataFrame, paths: Dict[str, tuple]) -> Dict[str, np.ndarray]:
+        """
+        Selects fields of the unified design options of `df` in one columnar pass (see `extract_unified_design_fields`),
+        None where a row does not have a field.
+        """
+        if "design_options" not in df.columns and not {"design_options_qubit", "design_options_cavity_claw"}.issubset(df.columns):
+            print("The dataframe has no 'design_options' column.")
+            return {key: np.full(len(df), None, dtype=object) for key in paths}
+        return {key: values.to_numpy() for key, values in extract_unified_design_fields(df, paths).items()}
+
     def get_qubit_options(self, df: pd.DataFrame) -> Dict[str, List[Any]]:
         """
         Extracts qubit design options from the dataframe.
@@ -606,49 +1018,17 @@ class Analyzer:
         Returns:
         Dict[str, List[Any]]: A dictionary containing lists of the extracted qubit options.
         """
-        qubit_options_dict = {
-            'claw_gap': [],
-            'claw_length': [],
-            'claw_width': [],
-            'ground_spacing': [],
-            'cross_gap': [],
-            'cross_length': [],
-            'cross_width': []
+        readout = ('qubit_options', 'connection_pads', 'readout')
+        paths = {
+            'claw_gap': readout + ('claw_gap',),
+            'claw_length': readout + ('claw_length',),
+            'claw_width': readout + ('claw_width',),
+            'ground_spacing': readout + ('ground_spacing',),
+            'cross_gap': ('qubit_options', 'cross_gap'),
+            'cross_length': ('qubit_options', 'cross_length'),
+            'cross_width': ('qubit_options', 'cross_width'),
         }
-
-        for idx, row in df.iterrows():
-            try:
-                design_options = row.get('design_options', None)
-                if design_options is None:
-                    raise ValueError(f"Row {idx} has no 'design_options'.")
-                qubit_options = design_options.get('qubit_options', {})
-
-                claw_gap = qubit_options.get('connection_pads', {}).get('readout', {}).get('claw_gap')
-                claw_length = qubit_options.get('connection_pads', {}).get('readout', {}).get('claw_length')
-                claw_width = qubit_options.get('connection_pads', {}).get('readout', {}).get('claw_width')
-                ground_spacing = qubit_options.get('connection_pads', {}).get('readout', {}).get('ground_spacing')
-                cross_gap = qubit_options.get('cross_gap')
-                cross_length = qubit_options.get('cross_length')
-                cross_width = qubit_options.get('cross_width')
-
-                if None in [claw_gap, claw_length, claw_width, ground_spacing, cross_gap, cross_length, cross_width]:
-                    raise ValueError(f"Row {idx} has missing qubit parameter(s).")
-
-                qubit_options_dict['claw_gap'].append(claw_gap)
-                qubit_options_dict['claw_length'].append(claw_length)
-                qubit_options_dict['claw_width'].append(claw_width)
-                qubit_options_dict['ground_spacing'].append(ground_spacing)
-                qubit_options_dict['cross_gap'].append(cross_gap)
-                qubit_options_dict['cross_length'].append(cross_length)
-                qubit_options_dict['cross_width'].append(cross_width)
-
-            except Exception as e:
-                print(f"Error processing row {idx}: {str(e)}")
-                for key in qubit_options_dict.keys():
-                    qubit_options_dict[key].append(None)
-
-        return {key: np.array(value) for key, value in qubit_options_dict.items()}
-
+        return self._complete_rows(df, self._select_design_options(df, paths), "qubit")
 
     def get_cpw_options(self, df: pd.DataFrame) -> Dict[str, List[Any]]:
         """
@@ -660,41 +1040,17 @@ class Analyzer:
         Returns:
         Dict[str, List[Any]]: A dictionary containing lists of the extracted CPW options.
         """
-        cpw_options_dict = {
-            'total_length': [],
-            'trace_gap': [],
-            'trace_width': []
-        }
-
-        for idx, row in df.iterrows():
-            try:
-                design_options = row.get('design_options', None)
-                if design_options is None:
-                    raise ValueError(f"Row {idx} has no 'design_options'.")
-                cpw_opts = design_options.get('cavity_claw_options', {}).get('cpw_opts', {}).get('left_options', {})
-
-                total_length = cpw_opts.get('total_length')
-                trace_gap = cpw_opts.get('trace_gap')
-                trace_width = cpw_opts.get('trace_width')
-
-                if None in [total_length, trace_gap, trace_width]:
-                    raise ValueError(f"Row {idx} has missing CPW parameter(s).")
-
-                cpw_options_dict['total_length'].append(total_length)
-                cpw_options_dict['trace_gap'].append(trace_gap)
-                cpw_options_dict['trace_width'].append(trace_width)
-
-            except Exception as e:
-                print(f"Error processing row {idx}: {str(e)}")
-                for key in cpw_options_dict.keys():
-                    cpw_options_dict[key].append(None)
-
-        return {key: np.array(value) for key, value in cpw_options_dict.items()}
-
+        left_options = ('cavity_claw_options', 'cpw_opts', 'left_options')
+        paths = {key: left_options + (key,) for key in ['total_length', 'trace_gap', 'trace_width']}
+        return self._complete_rows(df, self._select_design_options(df, paths), "CPW")
 
     def get_coupler_options(self, df: pd.DataFrame) -> Dict[str, List[Any]]:
         """
         Extracts coupler options from the dataframe.
+
+        The options of the CLT couplers are coupling_length to second_width, those of the NCap and
+        CapNInterdigital couplers are cap_distance to finger_length and orientation. The other options
+        of a row are None.
         
         Parameters:
         df (pd.DataFrame): The dataframe containing design options.
@@ -702,66 +1058,32 @@ class Analyzer:
         Returns:
         Dict[str, List[Any]]: A dictionary containing lists of the extracted coupler options.
         """
-        coupler_options_dict = {
-            'coupling_length': [],
-            'coupling_space': [],
-            'down_length': [],
-            'orientation': [],
-            'prime_gap': [],
-            'prime_width': [],
-            'second_gap': [],
-            'second_width': [],
-            'cap_distance': [],
-            'cap_gap': [],
-            'cap_gap_ground': [],
-            'cap_width': [],
-            'finger_count': [],
-            'finger_length': []
-        }
-
-        for idx, row in df.iterrows():
-            try:
-                design_options = row.get('design_options', None)
-                if design_options is None:
-                    raise ValueError(f"Row {idx} has no 'design_options'.")
-                cavity_claw_options = design_options.get('cavity_claw_options', {})
-                coupler_type = cavity_claw_options.get('coupler_type')
-
-                if coupler_type == 'CLT':
-                    coupler_options = cavity_claw_options.get('coupler_options', {})
-                    extracted_options = {
-                        'coupling_length': coupler_options.get('coupling_length'),
-                        'coupling_space': coupler_options.get('coupling_space'),
-                        'down_length': coupler_options.get('down_length'),
-                        'orientation': coupler_options.get('orientation'),
-                        'prime_gap': coupler_options.get('prime_gap'),
-                        'prime_width': coupler_options.get('prime_width'),
-                        'second_gap': coupler_options.get('second_gap'),
-                        'second_width': coupler_options.get('second_width')
-                    }
-                elif coupler_type in ['NCap', 'CapNInterdigital']:
-                    coupler_options = cavity_claw_options.get('coupler_options', {})
-                    extracted_options = {
-                        'cap_distance': coupler_options.get('cap_distance'),
-                        'cap_gap': coupler_options.get('cap_gap'),
-                        'cap_gap_ground': coupler_options.get('cap_gap_ground'),
-                        'cap_width': coupler_options.get('cap_width'),
-                        'finger_count': coupler_options.get('finger_count'),
-                        'finger_length': coupler_options.get('finger_length'),
-                        'orientation': coupler_options.get('orientation')
-                    }
-                else:
-                    raise ValueError(f"Row {idx} has an unsupported coupler_type: {coupler_type}")
-
-                for key in extracted_options.keys():
-                    coupler_options_dict[key].append(extracted_options.get(key))
-
-            except Exception as e:
-                print(f"Error processing row {idx}: {str(e)}")
-                for key in coupler_options_dict.keys():
-                    coupler_options_dict[key].append(None)
-
-        return {key: np.array(value) for key, value in coupler_options_dict.items()}
+        clt_keys = ['coupling_length', 'coupling_space', 'down_length', 'orientation',
+                    'prime_gap', 'prime_width', 'second_gap', 'second_width']
+        ncap_keys = ['cap_distance', 'cap_gap', 'cap_gap_ground', 'cap_width', 'finger_count', 'finger_length', 'orientation']
+        keys = list(dict.fromkeys(clt_keys + ncap_keys))
+
+        paths = {key: ('cavity_claw_options', 'coupler_options', key) for key in keys}
+        options = self._select_design_options(df, {**paths, 'coupler_type': ('cavity_claw_options', 'coupler_type')})
+        coupler_type = options.pop('coupler_type')
+
+        is_clt = coupler_type == 'CLT'
+        is_ncap = np.isin(coupler_type, ['NCap', 'CapNInterdigital'])
+        for idx in df.index[~(is_clt | is_ncap)]:
+            print(f"Error processing row {idx}: Row {idx} has an unsupported coupler_type: {coupler_type[df.index.get_loc(idx)]}")
+        for key in keys:
+            options[key] = np.where((is_clt & np.isin(key, clt_keys)) | (is_ncap & np.isin(key, ncap_keys)), options[key], None)
+        return {key: np.array(values.tolist()) for key, values in options.items()}
+
+    @staticmethod
+    def _complete_rows(df: pd.DataFrame, options: Dict[str, np.ndarray], name: str) -> Dict[str, np.ndarray]:
+        """Sets every option of the rows that miss one of them to None, as the row-wise extraction did."""
+        missing = np.zeros(len(df), dtype=bool)
+        for values in options.values():
+            missing |= pd.isna(values)
+        for idx in df.index[missing]:
+            print(f"Error processing row {idx}: Row {idx} has missing {name} parameter(s).")
+        return {key: np.array(np.where(missing, None, values).tolist()) for key, values in options.items()}
 
         
     def get_Ljs(self, df: pd.DataFrame):
@@ -0,0 +1,236 @@
+"""
+In-process cache for the Arrow tables and DataFrames behind ``SQuADDS_DB.get_dataset``.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+
+DEFAULT_CACHE_MAX_MB = 2048
+
+
+class TableCache:
+    """
+    A bounded, thread-safe LRU cache of ``pyarrow.Table`` objects (or of other objects with an
+    ``nbytes`` attribute, e.g. the ``GeometryView`` of a table, or of a given size, e.g. a DataFrame).
+
+    Arrow tables are immutable, so a cached table can be handed to any number of callers.
+    Cached DataFrames are not: `SQuADDS_DB.get_dataset` hands out shallow copies of them.
+
+    The memory of a table is accounted by its distinct buffers, each counted once however many cached
+    tables share it, e.g. a projection of a cached table or a column flattened out of a struct. Buffers of
+    memory-mapped tables (see `DatasetStore.load_table`) are counted at their full size, although the
+    operating system only keeps the pages that were read resident and can drop them under memory pressure;
+    for them the budget bounds the mapped size rather than the resident memory.
+
+    Methods:
+        get(key): Get a cached table or None.
+        put(key, table): Insert a table, evicting the least recently used ones if needed.
+        get_or_load(key, loader): Get a cached table or load and insert it.
+        info(): Get the hit/miss counters and memory usage.
+        clear(): Remove every table and reset the counters.
+    """
+
+    def __init__(self, max_bytes=None):
+        """
+        Constructor for the TableCache class.
+
+        Args:
+            max_bytes (int, optional): The memory budget in bytes. Defaults to ``$SQUADDS_CACHE_MAX_MB`` MB or 2048 MB.
+        """
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("SQUADDS_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 ** 2)
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._tables = OrderedDict()
+        self._footprints = {}
+        self._buffers = {}
+        self._loading = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, key):
+        return key in self._tables
+
+    def get(self, key):
+        """
+        Returns the table stored under `key` and marks it as most recently used.
+
+        Args:
+            key (tuple): The cache key.
+
+        Returns:
+            pyarrow.Table: The cached table, or None if it is not cached.
+        """
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._tables.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, key, table, nbytes=None):
+        """
+        Stores a table, evicting the least recently used tables until it fits in the budget.
+
+        Tables larger than the whole budget are not cached.
+
+        Args:
+            key (tuple): The cache key.
+            table (pyarrow.Table): The table to cache.
+            nbytes (int, optional): The size of the value in bytes. Defaults to the size of its
+                distinct buffers for a table and to its ``nbytes`` attribute otherwise.
+        """
+        footprint = _footprint(table) if nbytes is None else {("object", id(table)): nbytes}
+        with self._lock:
+            if key in self._tables:
+                self._release(key)
+            if sum(footprint.values()) > self.max_bytes:
+                return
+            while self._tables and self.current_bytes + self._added_bytes(footprint) > self.max_bytes:
+                self._release(next(iter(self._tables)))
+                self.evictions += 1
+            self._tables[key] = table
+            self._footprints[key] = footprint
+            for buffer, size in footprint.items():
+                entry = self._buffers.setdefault(buffer, [size, 0])
+                if entry[1] == 0:
+                    self.current_bytes += size
+                entry[1] += 1
+
+    def _added_bytes(self, footprint):
+        """Returns the bytes of the buffers in `footprint` that no cached table holds yet."""
+        return sum(size for buffer, size in footprint.items() if buffer not in self._buffers)
+
+    def _release(self, key):
+        """Removes the table stored under `key` and the buffers no other cached table holds."""
+        del self._tables[key]
+        for buffer in self._footprints.pop(key):
+            entry = self._buffers[buffer]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._buffers[buffer]
+                self.current_bytes -= entry[0]
+
+    def get_or_load(self, key, loader, nbytes=None):
+        """
+        Returns the table stored under `key`, calling `loader()` and caching its result on a miss.
+
+        Threads asking for the same missing key concurrently share one call to `loader()`.
+
+        Args:
+            key (tuple): The cache key.
+            loader (callable): A function with no arguments returning a ``pyarrow.Table``.
+            nbytes (callable, optional): A function returning the size in bytes of a loaded value (see `put`).
+
+        Returns:
+            pyarrow.Table: The cached or freshly loaded table.
+        """
+        table = self.get(key)
+        if table is not None:
+            return table
+
+        # concurrent callers of the same key wait for a single load
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            with self._lock:
+                table = self._tables.get(key)
+            if table is None:
+                try:
+                    table = loader()
+                    self.put(key, table, nbytes=None if nbytes is None else nbytes(table))
+                finally:
+                    with self._lock:
+                        self._loading.pop(key, None)
+        return table
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: hits, misses, evictions, entries, current_mb and max_mb.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._tables),
+                "current_mb": self.current_bytes / 1024 ** 2,
+                "max_mb": self.max_bytes / 1024 ** 2,
+            }
+
+    def clear(self):
+        """
+        Removes every cached table and resets the counters.
+        """
+        with self._lock:
+            self._tables.clear()
+            self._footprints.clear()
+            self._buffers.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def _footprint(value):
+    """
+    Returns the sizes of the memory buffers behind a cached value, keyed by buffer address.
+
+    Values that are not Arrow tables are one buffer of their ``nbytes``, keyed by the object.
+    """
+    if not isinstance(value, pa.Table):
+        return {("object", id(value)): value.nbytes}
+    sizes = {}
+    for column in value.columns:
+        for chunk in column.chunks:
+            # the buffers of the child arrays (e.g. struct fields) are listed too
+            for buffer in chunk.buffers():
+                if buffer is not None:
+                    sizes[buffer.address] = max(sizes.get(buffer.address, 0), buffer.size)
+    return sizes
+
+
+def frame_nbytes(df, table):
+    """
+    Estimates the memory held by a DataFrame built from an Arrow table with ``to_pandas``.
+
+    The arrays of the DataFrame are counted at their size. The Python objects of its object columns
+    (strings, dictionaries) cannot be measured without walking every value, so each of these columns
+    is counted at the size of its Arrow data instead.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame.
+        table (pyarrow.Table): The table it was built from.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    objects = [name for name in df.columns[df.dtypes == object] if name in table.column_names]
+    return int(df.memory_usage(index=True, deep=False).sum()) + sum(table.column(name).nbytes for name in objects)
+
+
+_default_cache = None
+
+def get_default_cache():
+    """
+    Returns the process-wide table cache shared by all `SQuADDS_DB` sessions.
+
+    Returns:
+        TableCache: The shared cache.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TableCache()
+    return _default_cache
@@ -1,23 +1,37 @@
 """
 !TODO: add FULL support for half-wave cavity
 """
+import hashlib
 import json
 import os
 import pprint
 import sys
 import warnings
+from functools import partial
 
 import pandas as pd
-import requests
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datasets import get_dataset_config_names, load_dataset
 from huggingface_hub import login
 from tabulate import tabulate
 from tqdm import tqdm
 
+import squadds
+from squadds.core.cache import frame_nbytes, get_default_cache
 from squadds.core.design_patterns import SingletonMeta
+from squadds.core.geometry import GeometryView
+from squadds.core.join import FactorizedJoin
+from squadds.core.prefetch import Prefetch
 from squadds.core.processing import *
+from squadds.core.registry import ConfigRegistry
+from squadds.core.store import DatasetStore
 from squadds.core.utils import *
 
+# Layout of the merged qubit-cavity DataFrames stored by `_create_multi_component_df`: bump it whenever
+# `create_qubit_cavity_df` changes their columns or the order of their rows, so that stored frames are rebuilt.
+SYSTEM_FRAME_FORMAT = 3
+
 #* HANDLE WARNING MESSAGES
 if sys.platform == "darwin":  # Checks if the operating system is macOS
     warnings.filterwarnings("ignore", category=UserWarning, module="pyaedt") # ANSYS is not a mac product
@@ -44,6 +58,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         select_system(components): Select a system based on a list of components or a single component.
         select_qubit(qubit): Select a qubit.
         select_cavity_claw(cavity): Select a cavity.
+        session(): Get a new session sharing the loaded datasets but not the selection.
     """
     
     def __init__(self):
@@ -52,6 +67,10 @@ class SQuADDS_DB(metaclass=SingletonMeta):
 
         Attributes:
             repo_name (str): The name of the repository.
+            store (DatasetStore): The revision-keyed local copy of the repository.
+            registry (ConfigRegistry): Index over the supported configurations (built lazily on first use).
+            cache (TableCache): The in-process LRU cache of loaded dataset tables and their DataFrames.
+            prefetch_on_select (bool): Whether the `select_*` methods start fetching the selected datasets in the background.
             configs (list): List of supported configuration names.
             selected_component_name (str): The name of the selected component.
             selected_component (str): The selected component.
@@ -68,7 +87,21 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             _internal_call (bool): Flag to track internal calls.
         """
         self.repo_name = "SQuADDS/SQuADDS_DB"
-        self.configs = self.supported_config_names()
+        self.store = DatasetStore(self.repo_name)
+        self.cache = get_default_cache()
+        self._registry = None
+        self.measured_device_database = None
+        self.hwc_fname = "half-wave-cavity_df.parquet"
+        self.merged_df_hwc_fname = "qubit_half-wave-cavity_df.parquet"
+        #self.merger_terms = ['claw_width', 'claw_length', 'claw_gap']
+        self.claw_merger_terms = ['claw_length'] # 07/2024 -> claw_length is the only parameter that is common between qubit and cavity
+        self.ncap_merger_terms = ['prime_width', 'prime_gap', 'second_width', 'second_gap']
+        self._init_selection()
+
+    def _init_selection(self):
+        """Sets the per-session selection state: the selected components, the loaded DataFrames and the prefetch."""
+        self.prefetch_on_select = False
+        self._prefetch = None
         self.selected_component_name = None
         self.selected_component = None
         self.selected_data_type = None
@@ -84,13 +117,27 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         self.coupler_df = None
         self.target_param_keys = None
         self.units = None
-        self.measured_device_database = None
         self._internal_call = False  # Flag to track internal calls
-        self.hwc_fname = "half-wave-cavity_df.parquet"
-        self.merged_df_hwc_fname = "qubit_half-wave-cavity_df.parquet"
-        #self.merger_terms = ['claw_width', 'claw_length', 'claw_gap']
-        self.claw_merger_terms = ['claw_length'] # 07/2024 -> claw_length is the only parameter that is common between qubit and cavity
-        self.ncap_merger_terms = ['prime_width', 'prime_gap', 'second_width', 'second_gap']
+
+    def session(self):
+        """
+        Returns a new session of the database, with its own selection and DataFrames.
+
+        `SQuADDS_DB()` always returns the same instance, whose selection is shared by every caller.
+        A session shares the store, the configuration registry and the cache of loaded Arrow tables
+        with this instance (the tables are immutable, and each `get_dataset` call builds its own
+        DataFrame), but selecting a system or building its DataFrame in one session does not affect
+        the others. Sessions can therefore serve different queries from different threads.
+
+        Returns:
+            SQuADDS_DB: The new session.
+        """
+        session = object.__new__(type(self))
+        shared = ["repo_name", "store", "cache", "_registry", "measured_device_database", "hwc_fname",
+                  "merged_df_hwc_fname", "claw_merger_terms", "ncap_merger_terms"]
+        session.__dict__.update({name: getattr(self, name) for name in shared})
+        session._init_selection()
+        return session
 
     def check_login(self):
         """
@@ -141,75 +188,66 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             except Exception as e:
                 print(f"Failed to upload {repo_file_name}: {e}")
 
+    @property
+    def registry(self):
+        """
+        The index over the supported configurations of the pinned dataset revision.
+
+        The registry is built on first access and rebuilt only if the store is pinned to a new revision.
+
+        Returns:
+            ConfigRegistry: The configuration registry.
+        """
+        revision = self.store.resolve_revision()
+        if self._registry is None or self._registry.revision != revision:
+            self._registry = ConfigRegistry(self.supported_config_names(), revision=revision)
+        return self._registry
+
+    @property
+    def configs(self):
+        """
+        list: The supported configuration names.
+        """
+        return self.registry.configs
+
     def supported_components(self):
         """
         Returns a list of supported components based on the configurations.
 
         Returns:
-            list: A list of supported components.
+            list: A list of supported components, one entry per configuration.
         """
-        components = []
-        for config in self.configs:
-            try:
-                components.append(config.split("-")[0])
-            except:
-                pass
-            try:
-                components.append(config.split("-")[0])
-            except:
-                pass
-        return components
+        return [entry[0] for entry in self.registry.entries]
     
     def supported_component_names(self):
         """
         Returns a list of supported component names extracted from the configs.
 
         Returns:
-            list: A list of supported component names.
+            list: A list of supported component names, one entry per configuration.
         """
-        component_names = []
-        for config in self.configs:
-            try:
-                component_names.append(config.split("-")[1])
-            except:
-                pass
-            try:
-                component_names.append(config.split("-")[1])
-            except:
-                pass
-        return component_names
+        return [entry[1] for entry in self.registry.entries]
     
     def supported_data_types(self):
         """
         Returns a list of supported data types.
 
         Returns:
-            list: A list of supported data types.
+            list: A list of supported data types, one entry per configuration.
         """
-        data_types = []
-        for config in self.configs:
-            try:
-                data_types.append(config.split("-")[2])
-            except:
-                pass
-            try:
-                data_types.append(config.split("-")[2])
-            except:
-                pass
-        return data_types
+        return [entry[2] for entry in self.registry.entries]
 
         
     def supported_config_names(self):
         """
         Retrieves the supported configuration names from the repository.
 
+        The names are read from the local store when the repository has not changed upstream.
+
         Returns:
             A list of supported configuration names.
         """
-        delete_HF_cache()
-        configs = get_dataset_config_names(self.repo_name, download_mode='force_redownload')
-        # if there are not two "-" in the config name, remove it (since it does conform to the simulation naming convention)
-        configs = [config for config in configs if config.count('-') == 2]
+        configs = self.store.config_names()
         # if there are not two "-" in the config name, remove it (since it does conform to the simulation naming convention)
         configs = [config for config in configs if config.count('-') == 2]
         return configs
@@ -237,16 +275,12 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         if component is None:
             print("Please specify a component")
             return
-        if component not in self.supported_components():
+        if not self.registry.has_component(component):
             print("Component not supported. Available components are:")
             print(self.supported_components()+["CLT"]) #TODO: handle dynamically
             return
         else:
-            component_names = []
-            for config in self.configs:
-                if component in config:
-                    component_names.append(config.split("-")[1])
-            return component_names+["CLT"]
+            return self.registry.component_names_of(component)+["CLT"]
         
     def view_component_names(self, component=None):
         """
@@ -260,15 +294,11 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         """
         if component is None:
             print("Please specify a component")
-        if component not in self.supported_components():
+        if not self.registry.has_component(component):
             print("Component not supported. Available components are:")
             print(self.supported_components()+["CLT"]) #TODO: handle dynamically
         else:
-            component_names = []
-            for config in self.configs:
-                if component in config:
-                    component_names.append(config.split("-")[1])
-            print(component_names+["CLT"]) #TODO: handle dynamically
+            print(self.registry.component_names_of(component)+["CLT"]) #TODO: handle dynamically
 
 
     def view_datasets(self):
@@ -328,18 +358,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             print("Please specify a data type")
             return
         
-        if component not in self.supported_components():
-            print("Component not supported. Available components are:")
-            print(self.supported_components())
-            return
-        
-        if component_name not in self.supported_component_names():
-            print("Component name not supported. Available component names are:")
-            print(self.supported_component_names())
-            return
-        if data_type not in self.supported_data_types():
-            print("Data type not supported. Available data types are:")
-            print(self.supported_data_types())
+        if not self._check_config(component, component_name, data_type):
             return
         
         # print the table of the dataset configs
@@ -362,6 +381,34 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         print(dataset.size_in_bytes)
         print("="*80)
         
+    def _check_config(self, component, component_name, data_type):
+        """
+        Checks that the configuration `<component>-<component_name>-<data_type>` exists, with a single registry lookup.
+
+        If it does not, the part of the configuration that is not supported is printed with the available choices.
+
+        Args:
+            component (str): The component, e.g. "qubit".
+            component_name (str): The component name, e.g. "TransmonCross".
+            data_type (str): The data type, e.g. "cap_matrix".
+
+        Returns:
+            bool: True if the configuration exists.
+        """
+        if self.registry.has_config(component, component_name, data_type):
+            return True
+
+        if not self.registry.has_component(component):
+            print("Component not supported. Available components are:")
+            print(self.supported_components())
+        elif component_name not in self.registry.component_names_of(component):
+            print(f"Component name not supported. Available component names for `{component}` are:")
+            print(self.registry.component_names_of(component))
+        else:
+            print(f"Data type not supported. Available data types for `{component}-{component_name}` are:")
+            print(self.registry.data_types_of(component, component_name))
+        return False
+
     def view_all_contributors(self):
         """
         View all unique contributors and their relevant information from simulation configurations.
@@ -388,27 +435,15 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         print(f"\n{banner}\n{title.center(80)}\n{banner}\n")
 
         for config in self.configs:
-            dataset = load_dataset(self.repo_name, config)["train"]
-            configs_contrib_info = dataset["contributor"]
-
-            for contrib_info in configs_contrib_info:
-                # Extracting the relevant information
-                relevant_info = {
+            # one row per distinct contributor, answered from the provenance index
+            for contrib_info in self.store.provenance(config)["contributors"]:
+                unique_contributors_info.append({
                     "Uploader": contrib_info.get('uploader', 'N/A'),
                     "PI": contrib_info.get('PI', 'N/A'),
                     "Group": contrib_info.get('group', 'N/A'),
                     "Institution": contrib_info.get('institution', 'N/A'),
                     "Config": config  # Add the config to the relevant info
-                }
-
-                # Check if this combination of info is already in the list
-                if not any(existing_info['Config'] == config and
-                        existing_info['Uploader'] == relevant_info['Uploader'] and
-                        existing_info['PI'] == relevant_info['PI'] and
-                        existing_info['Group'] == relevant_info['Group'] and
-                        existing_info['Institution'] == relevant_info['Institution']
-                        for existing_info in unique_contributors_info):
-                    unique_contributors_info.append(relevant_info)
+                })
 
         print(tabulate(unique_contributors_info, headers="keys", tablefmt="grid"))
         print(f"\n{banner}\n")  # End with a banner
@@ -478,9 +513,17 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         # Print the table with tabulate
         print(tabulate(rows, headers=headers, tablefmt="grid", stralign="left", numalign="left"))
 
+    def _measured_device_columns(self, columns):
+        """
+        Returns some columns of the measured device database as lists, read from the local store
+        (downloaded once per upstream change) instead of through `load_dataset` on every call.
+        """
+        table = pq.read_table(self.store.ensure_table("measured_device_database"), columns=columns)
+        return {column: table.column(column).to_pylist() for column in columns}
+
     def view_contributors_of_config(self, config):
         """
-        View the contributors of a specific configuration.
+        View the contributors of a specific configuration, read from the provenance index of the store.
 
         Args:
             config (str): The name of the configuration.
@@ -488,16 +531,9 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         Returns:
             None
         """
-        dataset = load_dataset(self.repo_name, config)["train"]
-        configs_contrib_info = dataset["contributor"]
-        unique_contributors_info = []
-        
-        for contrib_info in configs_contrib_info:
-            # Extracting the relevant information
-            relevant_info = {key: contrib_info[key] for key in ['uploader', 'PI', 'group', 'institution']}
-            if relevant_info not in unique_contributors_info:
-                unique_contributors_info.append(relevant_info)
-        
+        contributors = self.store.provenance(config)["contributors"]
+        unique_contributors_info = [{key: contrib_info[key] for key in ['uploader', 'PI', 'group', 'institution']} for contrib_info in contributors]
+
         print(tabulate(unique_contributors_info, headers='keys', tablefmt="grid"))
 
     def view_contributors_of(self, component=None, component_name=None, data_type=None, measured_device_name=None):
@@ -561,7 +597,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         Returns:
             dict: a dict of sim results.
         """       
-        dataset = load_dataset(self.repo_name, 'measured_device_database')["train"]
+        dataset = self._measured_device_columns(["contrib_info", "sim_results"])
         configs_contrib_info = dataset["contrib_info"]
         simulation_info = dataset["sim_results"]
             
@@ -586,7 +622,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             return "Component, component_name, and data_type must all be provided."
 
         config = f"{component}-{component_name}-{data_type}"
-        dataset = load_dataset(self.repo_name, 'measured_device_database')["train"]
+        dataset = self._measured_device_columns(["contrib_info", "sim_results"])
         
         for entry in zip(dataset["contrib_info"], dataset["sim_results"]):
             contrib_info, sim_results = entry
@@ -623,7 +659,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             return "Component, component_name, and data_type must all be provided."
 
         config = f"{component}-{component_name}-{data_type}"
-        dataset = load_dataset(self.repo_name, 'measured_device_database')["train"]
+        dataset = self._measured_device_columns(["contrib_info", "sim_results"])
         
         for entry in zip(dataset["contrib_info"], dataset["sim_results"]):
             contrib_info, sim_results = entry
@@ -687,7 +723,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         Returns:
             dict: A dictionary containing foundry and fabrication recipe information.
         """
-        dataset = load_dataset(self.repo_name, 'measured_device_database')["train"]
+        dataset = self._measured_device_columns(["contrib_info", "foundry", "fabrication_recipe", "design_code"])
         
         for contrib_info, foundry, recipe, github_url in zip(dataset["contrib_info"], dataset["foundry"], dataset["fabrication_recipe"], dataset["design_code"],):
             if contrib_info['name'] == device_name:
@@ -713,7 +749,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
 
         """
 
-        dataset = load_dataset(self.repo_name, 'measured_device_database')["train"]
+        dataset = self._measured_device_columns(["contrib_info", "sim_results"])
         configs_contrib_info = dataset["contrib_info"]
         unique_contributors_info = []
 
@@ -766,7 +802,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         # Validation and checks
         if isinstance(components, list):
             for component in components:
-                if component not in self.supported_components():
+                if not self.registry.has_component(component):
                     print(f"Component `{component}` not supported. Available components are:")
                     print(self.supported_components())
                     return
@@ -774,13 +810,15 @@ class SQuADDS_DB(metaclass=SingletonMeta):
                     self.selected_system = components
 
         elif isinstance(components, str):
-            if components not in self.supported_components():
+            if not self.registry.has_component(components):
                 print(f"Component `{components}` not supported. Available components are:")
                 print(self.supported_components())
                 return
             else:
                 self.selected_system = components
                 self.selected_component = components
+
+        self._prefetch_selection()
     
     def select_qubit(self, qubit=None):
         """
@@ -804,11 +842,13 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             raise UserWarning("Selected system is either not specified or does not contain a qubit! Please check `self.selected_system`")
         
         # check if qubit is supported
-        if self.selected_qubit not in self.supported_component_names():
+        if not self.registry.has_component_name(self.selected_qubit):
             print(f"Qubit `{self.selected_qubit}` not supported. Available qubits are:")
             self.view_component_names("qubit")
             return
 
+        self._prefetch_selection()
+
     def select_cavity_claw(self, cavity=None):
         """
         Selects a cavity claw component.
@@ -831,11 +871,13 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             raise UserWarning("Selected system is either not specified or does not contain a cavity! Please check `self.selected_system`")
         
         # check if cavity is supported
-        if self.selected_cavity not in self.supported_component_names():
+        if not self.registry.has_component_name(self.selected_cavity):
             print(f"Cavity `{self.selected_cavity}` not supported. Available cavities are:")
             self.view_component_names("cavity_claw")
             return
 
+        self._prefetch_selection()
+
     def select_cavity(self, cavity=None):
         """
         Selects a cavity and sets the necessary attributes for further operations.
@@ -858,11 +900,13 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             raise UserWarning("Selected system is either not specified or does not contain a cavity! Please check `self.selected_system`")
         
         # check if cavity is supported
-        if self.selected_cavity not in self.supported_component_names():
+        if not self.registry.has_component_name(self.selected_cavity):
             print(f"Cavity `{self.selected_cavity}` not supported. Available cavities are:")
             self.view_component_names("cavity")
             return
-        
+
+        self._prefetch_selection()
+
     def select_resonator_type(self, resonator_type):
         """
         Select the coupler based on the resonator type.
@@ -906,12 +950,55 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         #self.selected_data_type = "cap_matrix" # TODO: handle dynamically
         
         # check if coupler is supported
-        if self.selected_coupler not in self.supported_component_names()+["CLT"]: # TODO: handle dynamically
+        if not (self.registry.has_component_name(self.selected_coupler) or self.selected_coupler == "CLT"): # TODO: handle dynamically
 
             print(f"Coupler `{self.selected_coupler}` not supported. Available couplers are:")
             self.view_component_names("coupler")
             return
 
+        self._prefetch_selection()
+
+    def prefetch(self):
+        """
+        Starts fetching every dataset the current selection needs in background threads.
+
+        The datasets are loaded into the dataset cache, and `create_system_df` waits for them
+        instead of fetching them one after the other. Set `prefetch_on_select` to True to start
+        a prefetch automatically whenever the selection changes.
+
+        Returns:
+            Prefetch: A handle with `done()`, `progress()`, `wait()` and `errors()`.
+        """
+        self._prefetch = Prefetch(self._prefetch_tasks(), previous=self._prefetch)
+        return self._prefetch
+
+    def _prefetch_selection(self):
+        """Starts a prefetch of the current selection if `prefetch_on_select` is enabled."""
+        if self.prefetch_on_select:
+            self.prefetch()
+
+    def _prefetch_tasks(self):
+        """Returns the loading tasks implied by the current selection, keyed by configuration or file name."""
+        configs = []
+        files = []
+        if isinstance(self.selected_system, list):
+            if self.selected_qubit is not None:
+                configs.append(f"qubit-{self.selected_qubit}-cap_matrix")
+            if self.selected_cavity is not None:
+                configs.append(f"cavity_claw-{self.selected_cavity}-eigenmode")
+            if self.selected_coupler == "NCap":
+                configs.append("coupler-NCap-cap_matrix")
+                files += [self.hwc_fname, self.merged_df_hwc_fname]
+        elif isinstance(self.selected_system, str):
+            if self.selected_component_name is not None and self.selected_data_type is not None:
+                configs.append(f"{self.selected_component}-{self.selected_component_name}-{self.selected_data_type}")
+            if self.selected_coupler == "CapNInterdigitalTee":
+                configs.append("coupler-NCap-cap_matrix")
+
+        tasks = {config: partial(self._load_config_table, config) for config in configs if config in self.registry}
+        tasks.update({file_name: partial(self.store.fetch_file, file_name) for file_name in files})
+        return tasks
+
     def see_dataset(self, data_type=None, component=None, component_name=None):
         """
         View a dataset based on the provided data type, component, and component name.
@@ -945,42 +1032,40 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             print("Please specify a data type.")
             return
         
-        # Check if the component is supported
-        if component not in self.supported_components():
-            print("Component not supported. Available components are:")
-            print(self.supported_components())
-            return
-        
-        # Check if the component name is supported
-        if component_name not in self.supported_component_names():
-            print("Component name not supported. Available component names are:")
-            print(self.supported_component_names())
-            return
-        
-        # Check if the data type is supported
-        if data_type not in self.supported_data_types():
-            print("Data type not supported. Available data types are:")
-            print(self.supported_data_types())
+        # Check if the configuration is supported
+        if not self._check_config(component, component_name, data_type):
             return
 
         # Construct the configuration string based on the provided or default values
         config = f"{component}-{component_name}-{data_type}"
         try:
-            df = load_dataset(self.repo_name, config)["train"].to_pandas()
-            return flatten_df_second_level(df)
+            return self._load_config_table(config).to_pandas()
         except Exception as e:
             print(f"An error occurred while loading the dataset: {e}")
             return
 
 
-    def get_dataset(self, data_type=None, component=None, component_name=None):
+    def get_dataset(self, data_type=None, component=None, component_name=None, columns=None, filters=None, compact=False):
         """
         Retrieves a dataset based on the specified data type, component, and component name.
 
+        The column selection and the filters are pushed down into the parquet read, so only the
+        requested columns of the matching rows are converted to pandas. The converted DataFrame is
+        cached with the table, and every call returns a shallow copy of it: columns can be added,
+        replaced or dropped freely, but values (including the dictionaries of `design_options`)
+        must not be modified in place.
+
         Args:
             data_type (str): The type of data to retrieve.
             component (str): The component to retrieve the data from.
             component_name (str): The name of the component to retrieve the data from.
+            columns (list, optional): The (flattened) columns to retrieve. Defaults to all columns.
+            filters (dict, optional): Conditions on the (flattened) columns. A value can be a scalar (equality),
+                a tuple ``(low, high)`` (inclusive range, either bound may be None) or a list (membership),
+                e.g. ``{"coupler_type": "CLT", "cavity_frequency": (5e9, 7e9)}``.
+            compact (bool, optional): Whether to convert the columns to compact dtypes in Arrow before building the
+                DataFrame: float32 floats, the smallest unsigned integers and categorical strings (see `compact_dtype_plan`).
+                Defaults to False.
 
         Returns:
             pandas.DataFrame: The retrieved dataset.
@@ -1006,41 +1091,121 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             print("Please specify a data type.")
             return
         
-        # Check if the component is supported
-        if component not in self.supported_components():
-            print("Component not supported. Available components are:")
-            print(self.supported_components())
-            return
-        
-        # Check if the component name is supported
-        if component_name not in self.supported_component_names():
-            print("Component name not supported. Available component names are:")
-            print(self.supported_component_names())
-            return
-        
-        # Check if the data type is supported
-        if data_type not in self.supported_data_types():
-            print("Data type not supported. Available data types are:")
-            print(self.supported_data_types())
+        # Check if the configuration is supported
+        if not self._check_config(component, component_name, data_type):
             return
 
         # Construct the configuration string based on the provided or default values
         config = f"{component}-{component_name}-{data_type}"
         try:
-            df = load_dataset(self.repo_name, config, cache_dir=None)["train"].to_pandas()
-            self._set_target_param_keys(df)
-            return flatten_df_second_level(df)
+            table = self._load_config_table(config, columns=columns, filters=filters)
+            self._set_target_param_keys(table)
+
+            def to_pandas():
+                return (apply_dtype_plan(table, compact_dtype_plan(table)) if compact else table).to_pandas()
+
+            key = (config, self.store.resolve_revision(), None if columns is None else tuple(columns), freeze_filters(filters), "frame", compact)
+            df = self.cache.get_or_load(key, to_pandas, nbytes=lambda df: frame_nbytes(df, table))
+            return df.copy(deep=False)
         except Exception as e:
             print(f"An error occurred while loading the dataset: {e}")
             return
 
-    def create_system_df(self, parallelize=False, num_cpu=None):
+    def _load_config_table(self, config, columns=None, filters=None):
+        """
+        Returns the flattened Arrow table of a configuration, served from the in-process cache when possible.
+
+        Projected/filtered tables are cached under their own key. They are computed from the cached
+        full table if there is one, and by a pushed-down parquet scan otherwise.
+
+        Args:
+            config (str): The configuration name.
+            columns (list, optional): The flattened column names to keep. Defaults to all columns.
+            filters (dict, optional): The conditions rows must satisfy, see `build_filter_expression`.
+
+        Returns:
+            pyarrow.Table: The configuration table, flattened with `flatten_table_second_level`.
+        """
+        revision = self.store.resolve_revision()
+        full_key = (config, revision, None, None)
+        if columns is None and not filters:
+            return self.cache.get_or_load(full_key, lambda: flatten_table_second_level(self.store.load_table(config)))
+
+        def load():
+            if full_key in self.cache:
+                return filter_flattened_table(self.cache.get(full_key), columns=columns, filters=filters)
+            return self.store.scan_table(config, columns=columns, filters=filters)
+
+        key = (config, revision, None if columns is None else tuple(columns), freeze_filters(filters))
+        return self.cache.get_or_load(key, load)
+
+    def get_geometry(self, data_type=None, component=None, component_name=None):
+        """
+        Returns the typed columnar view of the `design_options` of a dataset (see `GeometryView`).
+
+        The view is built once per configuration from the loaded Arrow table, whose buffers it shares,
+        and is cached with it. Its rows are the rows of `get_dataset` for the same arguments.
+
+        Args:
+            data_type (str): The type of data.
+            component (str): The component. Defaults to the selected system.
+            component_name (str): The name of the component. Defaults to the selected component name.
+
+        Returns:
+            GeometryView: The leaf geometry parameters, e.g. `view.values("claw_length")`.
+
+        Raises:
+            ValueError: If the data type, the component or the component name are not defined.
+        """
+        component = component if component is not None else self.selected_system
+        component_name = component_name if component_name is not None else self.selected_component_name
+        if data_type is None or component is None or component_name is None:
+            raise ValueError("The data type, the component and the component name must be defined.")
+
+        config = f"{component}-{component_name}-{data_type}"
+        key = (config, self.store.resolve_revision(), "geometry")
+        return self.cache.get_or_load(key, lambda: GeometryView.from_design_options(self._load_config_table(config)["design_options"]))
+
+    def _get_filtered_dataset(self, data_type, component, component_name, conditions, columns=None):
+        """
+        Retrieves a dataset with `conditions` pushed down into the read, following the semantics of
+        `filter_df_by_conditions`: conditions on columns the dataset does not have are ignored, and
+        the unfiltered dataset is returned if no row matches.
+        """
+        config = f"{component}-{component_name}-{data_type}"
+        available = self.store.column_names(config)
+        filters = {column: value for column, value in conditions.items() if column in available}
+        df = self.get_dataset(data_type=data_type, component=component, component_name=component_name, columns=columns, filters=filters)
+        if df is not None and df.empty:
+            print("Warning: No rows match the given conditions. Returning the original DataFrame.")
+            # `get_dataset` already validated the configuration and set the target parameter keys
+            df = self._load_config_table(config, columns=columns).to_pandas()
+        return df
+
+    def cache_info(self):
+        """
+        Returns the hit/miss counters and memory usage of the dataset cache.
+
+        Returns:
+            dict: The cache statistics.
+        """
+        return self.cache.info()
+
+    def clear_cache(self):
+        """
+        Empties the in-process dataset cache. The on-disk store is left untouched.
+        """
+        self.cache.clear()
+
+    def create_system_df(self, parallelize=False, num_cpu=None, factorized=False):
         """
         Creates and returns a DataFrame based on the selected system.
 
         Args:
             parallelize (bool): Whether to use multiprocessing to speed up the merging. Defaults to False.
             num_cpu (int): The number of CPU cores to use for multiprocessing. If not specified, the function will use the maximum number of available cores.
+            factorized (bool): For qubit-cavity systems, whether to return a `FactorizedJoin` that keeps the qubit and cavity rows
+                once each plus the indices of every pair, instead of one wide row per pair. Defaults to False.
 
         If the selected system is a single component, it retrieves the dataset based on the selected data type, component, and component name.
         If a coupler is selected, the DataFrame is filtered by the coupler.
@@ -1062,9 +1227,18 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         
         if self.selected_system is None:
             raise UserWarning("Selected system is not defined.")
-        
+
+        # let the background downloads finish rather than starting the same ones again
+        if self._prefetch is not None:
+            self._prefetch.wait()
+            # a failed download is tried again below, where its error is raised if it fails again
+            for name, error in self._prefetch.errors().items():
+                print(f"Prefetching `{name}` failed ({error}). Loading it again.")
+
         if isinstance(self.selected_system, str):
             df = self._create_single_component_df()
+        elif isinstance(self.selected_system, list) and factorized:
+            df = self._create_multi_component_join(parallelize, num_cpu)
         elif isinstance(self.selected_system, list):
             df = self._create_multi_component_df(parallelize, num_cpu)
         else:
@@ -1075,10 +1249,11 @@ class SQuADDS_DB(metaclass=SingletonMeta):
 
     def _create_single_component_df(self):
         """Creates a DataFrame for a single component system."""
-        df = self.get_dataset(data_type=self.selected_data_type, component=self.selected_component, component_name=self.selected_component_name)
+        if not self.selected_coupler:
+            return self.get_dataset(data_type=self.selected_data_type, component=self.selected_component, component_name=self.selected_component_name)
 
-        if self.selected_coupler:
-            df = filter_df_by_conditions(df, {"coupler_type": self.selected_coupler})
+        df = self._get_filtered_dataset(self.selected_data_type, self.selected_component, self.selected_component_name, {"coupler_type": self.selected_coupler})
+        if df is not None:
             if self.selected_coupler == "CapNInterdigitalTee":
                 df = self._update_cap_interdigital_tee_parameters(df)
 
@@ -1088,11 +1263,9 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         """
         !TODO: speed this up!
         """
-        cavity_df = self.get_dataset(data_type="eigenmode", component="cavity_claw", component_name=self.selected_cavity)
-
         assert self.selected_coupler in ["NCap", "CapNInterdigitalTee"], "Selected coupler must be either 'NCap' or 'CapNInterdigitalTee'."
 
-        cavity_df = filter_df_by_conditions(cavity_df, {"coupler_type": "NCap"})
+        cavity_df = self._get_filtered_dataset("eigenmode", "cavity_claw", self.selected_cavity, {"coupler_type": "NCap"})
 
         if not all(cavity_df["coupler_type"] == "NCap"):
             raise ValueError("All entries in the 'coupler_type' column of the cavity_df must be 'NCap'.")
@@ -1102,7 +1275,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         
         return cavity_df
 
-    def generate_qubit_half_wave_cavity_df(self, parallelize=False, num_cpu=None, save_data=False):
+    def generate_qubit_half_wave_cavity_df(self, parallelize=False, num_cpu=None, save_data=False, stream=False, output_path=None, memory_budget_mb=1024):
         """
         Generates a DataFrame that combines the qubit and half-wave cavity data.
 
@@ -1110,40 +1283,56 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             parallelize (bool, optional): Flag indicating whether to parallelize the computation. Defaults to False.
             num_cpu (int, optional): Number of CPUs to use for parallelization. Defaults to None.
             save_data (bool, optional): Flag indicating whether to save the generated data. Defaults to False.
+            stream (bool, optional): Whether to build the combined data chunk by chunk and append it to a parquet file
+                instead of building it in memory. The file holds the same rows, columns and dtypes as the in-memory DataFrame. Defaults to False.
+            output_path (str, optional): The parquet file written in streaming mode. Defaults to "data/qubit_half-wave-cavity_df.parquet".
+            memory_budget_mb (float, optional): The approximate memory used per chunk in streaming mode, in MB. Defaults to 1024.
 
         Returns:
-            pandas.DataFrame: The generated DataFrame.
+            pandas.DataFrame: The generated DataFrame, or the path of the parquet file in streaming mode.
 
         Raises:
             None
 
         Notes:
             - This method generates a DataFrame by combining the qubit and half-wave cavity data.
-            - The qubit and cavity data are obtained from the `get_dataset` and `generate_updated_half_wave_cavity_df` methods, respectively.
+            - The qubit data is read once from the configuration table, as in `get_dataset`, and the cavity data is obtained from the `generate_updated_half_wave_cavity_df` method.
             - The generated DataFrame is optimized to reduce memory usage using various optimization techniques.
-            - If `save_data` is True, the generated DataFrames are saved in the "data" directory.
+            - If `save_data` is True, the generated DataFrames are saved in the "data" directory. In streaming mode only
+              the cavity DataFrame is saved there, next to the streamed file; the uncompressed DataFrame is not built.
 
         TODO:
             - Speed up the generation process.
         """
         print("Generating half-wave-cavity DataFrame...")
-        qubit_df = self.get_dataset(data_type="cap_matrix", component="qubit", component_name=self.selected_qubit)
+        # one read of the qubit table: `self.qubit_df` keeps the dtypes of `get_dataset`, only the merge sees compact ones
+        table = self._load_config_table(f"qubit-{self.selected_qubit}-cap_matrix")
+        self._set_target_param_keys(table)
+        self.qubit_df = table.to_pandas()
+        qubit_df = apply_dtype_plan(table, compact_dtype_plan(table)).to_pandas()
         cavity_df = self.generate_updated_half_wave_cavity_df(parallelize=parallelize, num_cpu=num_cpu)
 
-        self.qubit_df = qubit_df
         self.cavity_df = cavity_df
 
+        if stream:
+            output_path = output_path or os.path.join("data", "qubit_half-wave-cavity_df.parquet")
+            if save_data:
+                # the streamed file is the optimized DataFrame; the uncompressed one is never built
+                os.makedirs("data", exist_ok=True)
+                cavity_df.to_parquet("data/half-wave-cavity_df.parquet")
+            return self._stream_qubit_cavity_df(qubit_df, cavity_df, output_path, memory_budget_mb)
+
         print("Creating qubit-half-wave-cavity DataFrame...")
         df = self.create_qubit_cavity_df(qubit_df, cavity_df, merger_terms=self.claw_merger_terms, parallelize=parallelize, num_cpu=num_cpu)
         
         # process the df to reduce the memory usage
         print("Optimizing the DataFrame...")
         opt_df = process_design_options(df)
-        initial_mem = compute_memory_usage(df)
+        initial_mem = compute_memory_usage(df, deep=False)
         opt_df = optimize_dataframe(opt_df)
         opt_df = delete_object_columns(opt_df)
         opt_df = delete_categorical_columns(opt_df)
-        final_mem = compute_memory_usage(opt_df)
+        final_mem = compute_memory_usage(opt_df, deep=False)
         print(f"Memory usage reduced by {100*(initial_mem - final_mem)/initial_mem:.2f}%")
 
         if save_data:
@@ -1157,29 +1346,126 @@ class SQuADDS_DB(metaclass=SingletonMeta):
 
         return opt_df
 
+    def _stream_qubit_cavity_df(self, qubit_df, cavity_df, output_path, memory_budget_mb):
+        """
+        Writes the optimized qubit-cavity DataFrame to a parquet file one chunk of rows at a time.
+
+        The rows come in the order of `create_qubit_cavity_df`. Each chunk is expanded, processed and downcast
+        before being appended as a row group, so that only one chunk is in memory at a time. The dtypes are decided
+        up front from one row per qubit and per cavity, which hold every value the full DataFrame holds in each
+        column, so every chunk gets the dtypes the in-memory path gives the whole DataFrame.
+
+        Args:
+            qubit_df (pandas.DataFrame): The DataFrame containing qubit data.
+            cavity_df (pandas.DataFrame): The DataFrame containing cavity data.
+            output_path (str): The parquet file to write.
+            memory_budget_mb (float): The approximate memory used per chunk, in MB.
+
+        Returns:
+            str: The path of the parquet file.
+        """
+        print("Matching qubit and half-wave-cavity rows...")
+        join = self.create_qubit_cavity_join(qubit_df, cavity_df, merger_terms=self.claw_merger_terms, merge_order=True)
+
+        # one pair for every qubit and every cavity that takes part in the join
+        _, first_left = np.unique(join.left_index, return_index=True)
+        _, first_right = np.unique(join.right_index, return_index=True)
+        sample = process_design_options(join.to_pandas(rows=np.union1d(first_left, first_right)))
+        dtypes = optimized_dtypes(sample)
+        schema = pa.Schema.from_pandas(sample[list(dtypes)].astype(dtypes), preserve_index=False)
+
+        # the expanded rows and their processed copies are what takes memory
+        row_bytes = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+        chunk_size = max(int(memory_budget_mb * 1024 ** 2 / (3 * row_bytes)), 1)
+        print(f"Writing {len(join)} rows in chunks of {chunk_size} rows to {output_path}...")
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with pq.ParquetWriter(output_path, schema) as writer:
+            for start in tqdm(range(0, len(join), chunk_size), desc="Writing chunks"):
+                chunk = process_design_options(join.to_pandas(rows=np.arange(start, min(start + chunk_size, len(join)))))
+                chunk = chunk[list(dtypes)].astype(dtypes).reset_index(drop=True)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        return output_path
+
     def _create_multi_component_df(self, parallelize, num_cpu):
         """Creates a DataFrame for a multi-component system."""
         qubit_df = self.get_dataset(data_type="cap_matrix", component="qubit", component_name=self.selected_qubit)
-        cavity_df = self.get_dataset(data_type="eigenmode", component="cavity_claw", component_name=self.selected_cavity)
 
         self.qubit_df = qubit_df
 
         if self.selected_coupler == "CLT":
-            cavity_df = filter_df_by_conditions(cavity_df, {"coupler_type": self.selected_coupler})
+            cavity_df = self._get_filtered_dataset("eigenmode", "cavity_claw", self.selected_cavity, {"coupler_type": self.selected_coupler})
             self.cavity_df = cavity_df
+        else:
+            cavity_df = self.get_dataset(data_type="eigenmode", component="cavity_claw", component_name=self.selected_cavity)
         if self.selected_coupler == "NCap":
             self.coupler_df = self.get_dataset(data_type="cap_matrix", component="coupler", component_name=self.selected_coupler)
             self.cavity_df = self.read_parquet_file(self.hwc_fname)
             df = self.read_parquet_file(self.merged_df_hwc_fname)
             return df
-                
+
+        # reuse the merged DataFrame materialized by an earlier build from the same inputs
+        configs = [f"qubit-{self.selected_qubit}-cap_matrix", f"cavity_claw-{self.selected_cavity}-eigenmode"]
+        name = "+".join(configs)
+        key = self._system_key(configs)
+        df = self.store.load_frame(name, key)
+        if df is not None:
+            self._add_merger_columns(qubit_df, cavity_df, self.claw_merger_terms)
+            # the unified design options are rebuilt from the per-component ones rather than stored once per row
+            df['design_options'] = unified_design_options(df, shared=True)
+            return df
+
         df = self.create_qubit_cavity_df(qubit_df, cavity_df, merger_terms=self.claw_merger_terms, parallelize=parallelize, num_cpu=num_cpu)
+        try:
+            self.store.save_frame(name, key, df.drop(columns=['design_options']))
+        except Exception as e:
+            print(f"Could not cache the system DataFrame: {e}")
         return df
 
+    def _create_multi_component_join(self, parallelize, num_cpu):
+        """Creates a FactorizedJoin for a multi-component system."""
+        qubit_df = self.get_dataset(data_type="cap_matrix", component="qubit", component_name=self.selected_qubit)
+        self.qubit_df = qubit_df
+
+        if self.selected_coupler == "NCap":
+            # the half-wave cavities are small, so they are rebuilt here instead of reading the precomputed merged file
+            self.coupler_df = self.get_dataset(data_type="cap_matrix", component="coupler", component_name=self.selected_coupler)
+            cavity_df = self.generate_updated_half_wave_cavity_df()
+        elif self.selected_coupler == "CLT":
+            cavity_df = self._get_filtered_dataset("eigenmode", "cavity_claw", self.selected_cavity, {"coupler_type": self.selected_coupler})
+        else:
+            cavity_df = self.get_dataset(data_type="eigenmode", component="cavity_claw", component_name=self.selected_cavity)
+        self.cavity_df = cavity_df
+
+        return self.create_qubit_cavity_join(qubit_df, cavity_df, merger_terms=self.claw_merger_terms, parallelize=parallelize, num_cpu=num_cpu)
+
+    def _system_key(self, configs):
+        """
+        Hashes everything a merged system DataFrame depends on: the content of its input configurations,
+        the merger terms, the coupler, the resonator type, the layout of the merged frame (`SYSTEM_FRAME_FORMAT`)
+        and the SQuADDS version.
+
+        Args:
+            configs (list): The configurations the DataFrame is built from.
+
+        Returns:
+            str: The SHA-256 hex digest of the inputs.
+        """
+        inputs = {
+            "configs": {config: self.store.config_fingerprint(config) for config in configs},
+            "merger_terms": self.claw_merger_terms,
+            "coupler": self.selected_coupler,
+            "resonator_type": self.selected_resonator_type,
+            "frame_format": SYSTEM_FRAME_FORMAT,
+            "version": squadds.__version__,
+        }
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
     def _update_cap_interdigital_tee_parameters(self, cavity_df):
         """Updates parameters for CapNInterdigitalTee coupler."""
-        ncap_df = self.get_dataset(data_type="cap_matrix", component="coupler", component_name="NCap")
         ncap_sim_cols = ['bottom_to_bottom', 'bottom_to_ground', 'ground_to_ground', 'top_to_bottom', 'top_to_ground', 'top_to_top']
+        # only the design options and the capacitances of the NCap dataset are used for the update
+        ncap_df = self.get_dataset(data_type="cap_matrix", component="coupler", component_name="NCap", columns=["design_options"] + ncap_sim_cols)
         
         df = update_ncap_parameters(cavity_df, ncap_df, self.ncap_merger_terms, ncap_sim_cols)
         return df
@@ -1188,6 +1474,10 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         """
         Creates a merged DataFrame by merging the qubit and cavity DataFrames based on the specified merger terms.
 
+        The merged rows keep the indices of their qubit and cavity rows (`index_qc`, `index_cc`), the
+        per-component `design_options_qubit`/`design_options_cavity_claw` columns and the unified `design_options`.
+        Rows with the same qubit (cavity) share its converted options, see `unified_design_options`.
+
         Args:
             qubit_df (pandas.DataFrame): The DataFrame containing qubit data.
             cavity_df (pandas.DataFrame): The DataFrame containing cavity data.
@@ -1201,28 +1491,73 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         Raises:
             None
         """
-        for merger_term in merger_terms:
-            qubit_df[merger_term] = qubit_df['design_options'].map(lambda x: x['connection_pads']['readout'].get(merger_term))
-            cavity_df[merger_term] = cavity_df['design_options'].map(lambda x: x['claw_opts']['connection_pads']['readout'].get(merger_term))
+        self._add_merger_columns(qubit_df, cavity_df, merger_terms)
+
+        # join on numeric keys so that e.g. "75um" and "75.0um" match; the qubit keeps the original merger columns
+        key_columns = [f"_key_{term}" for term in merger_terms]
+        if 'index_cc' not in cavity_df.columns:
+            cavity_df = cavity_df.reset_index().rename(columns={'index': 'index_cc'})
+        cavity_df = cavity_df.drop(columns=merger_terms).assign(**{key: numeric_join_keys(cavity_df[term]) for key, term in zip(key_columns, merger_terms)})
 
         # Add index column to qubit_df
         qubit_df = qubit_df.reset_index().rename(columns={'index': 'index_qc'})
+        qubit_df = qubit_df.assign(**{key: numeric_join_keys(qubit_df[term]) for key, term in zip(key_columns, merger_terms)})
 
         if parallelize:
+            # the workers only see the join keys in shared memory and send back index pairs; the rows are gathered here
             n_cores = cpu_count() if num_cpu is None else num_cpu
-            qubit_df_splits = np.array_split(qubit_df, n_cores)
-
-            with Pool(n_cores) as pool:
-                merged_df_parts = list(tqdm(pool.starmap(merge_dfs, [(split, cavity_df, merger_terms) for split in qubit_df_splits]), total=n_cores))
-
-            merged_df = pd.concat(merged_df_parts).reset_index(drop=True)
+            join = FactorizedJoin.from_keys(qubit_df, cavity_df.drop(columns=key_columns), [qubit_df[key] for key in key_columns],
+                                            [cavity_df[key] for key in key_columns], suffixes=('_qubit', '_cavity_claw'), num_workers=n_cores,
+                                            merge_order=True)
+            merged_df = join.to_pandas().reset_index(drop=True)
         else:
-            merged_df = merge_dfs(qubit_df, cavity_df, merger_terms)
+            merged_df = merge_dfs(qubit_df, cavity_df, key_columns)
+        merged_df = merged_df.drop(columns=key_columns)
 
-        merged_df['design_options'] = merged_df.apply(create_unified_design_options, axis=1)
+        merged_df['design_options'] = unified_design_options(merged_df, shared=True)
 
         return merged_df
 
+    def create_qubit_cavity_join(self, qubit_df, cavity_df, merger_terms=None, parallelize=False, num_cpu=None, merge_order=False):
+        """
+        Joins the qubit and cavity DataFrames on the specified merger terms without materializing the joined rows.
+
+        The result holds every qubit and cavity row once and the positions of the matching pairs. Its columns are
+        those of `create_qubit_cavity_df` except the unified `design_options`, which `materialize_design_options`
+        builds for the expanded pairs, and any of them can be expanded for all or some of the pairs.
+
+        Args:
+            qubit_df (pandas.DataFrame): The DataFrame containing qubit data.
+            cavity_df (pandas.DataFrame): The DataFrame containing cavity data.
+            merger_terms (list): A list of column names to be used for merging the DataFrames. Defaults to None.
+            parallelize (bool): Whether to match the rows in several processes. Defaults to False.
+            num_cpu (int): The number of processes to use. If not specified, the function will use the maximum number of available cores.
+            merge_order (bool): Whether to order the pairs as the rows of `create_qubit_cavity_df`. Defaults to False.
+
+        Returns:
+            FactorizedJoin: The joined qubit and cavity rows.
+        """
+        merger_terms = self.claw_merger_terms if merger_terms is None else merger_terms
+        self._add_merger_columns(qubit_df, cavity_df, merger_terms)
+
+        if 'index_cc' not in cavity_df.columns:
+            cavity_df = cavity_df.reset_index().rename(columns={'index': 'index_cc'})
+        qubit_df = qubit_df.reset_index().rename(columns={'index': 'index_qc'})
+
+        qubit_keys = [numeric_join_keys(qubit_df[term]) for term in merger_terms]
+        cavity_keys = [numeric_join_keys(cavity_df[term]) for term in merger_terms]
+        num_workers = (cpu_count() if num_cpu is None else num_cpu) if parallelize else 1
+        return FactorizedJoin.from_keys(qubit_df, cavity_df.drop(columns=merger_terms), qubit_keys, cavity_keys,
+                                        suffixes=('_qubit', '_cavity_claw'), num_workers=num_workers, merge_order=merge_order)
+
+    def _add_merger_columns(self, qubit_df, cavity_df, merger_terms):
+        """Adds the merger terms of the claw to the qubit and cavity DataFrames, in place."""
+        qubit_terms = extract_nested_fields(qubit_df['design_options'], {term: ('connection_pads', 'readout', term) for term in merger_terms})
+        cavity_terms = extract_nested_fields(cavity_df['design_options'], {term: ('claw_opts', 'connection_pads', 'readout', term) for term in merger_terms})
+        for merger_term in merger_terms:
+            qubit_df[merger_term] = qubit_terms[merger_term]
+            cavity_df[merger_term] = cavity_terms[merger_term]
+
     def unselect_all(self):
         """
         Clears the selected component, data type, qubit, cavity, coupler, and system.
@@ -1235,6 +1570,7 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         self.selected_coupler = None
         self.selected_system = None
         self.selected_resonator_type = None
+        self._prefetch = None
 
     def show_selections(self):
         """
@@ -1259,12 +1595,12 @@ class SQuADDS_DB(metaclass=SingletonMeta):
             if self.selected_resonator_type is not None:
                 print("Selected resonator type: ", self.selected_resonator_type)
 
-    def _set_target_param_keys(self, df):
+    def _set_target_param_keys(self, table):
         """
-        Sets the target parameter keys based on the provided DataFrame.
+        Sets the target parameter keys based on the provided table.
 
         Args:
-            df (pandas.DataFrame): The DataFrame containing simulation results.
+            table (pyarrow.Table): The flattened table of a configuration (see `flatten_table_second_level`).
 
         Raises:
             UserWarning: If no selected system DataFrame is created or if target_param_keys is not None or a list.
@@ -1275,13 +1611,13 @@ class SQuADDS_DB(metaclass=SingletonMeta):
         else:
             # check if self.target_param_keys is None
             if self.target_param_keys is None:
-                self.target_param_keys = get_sim_results_keys(df)
+                self.target_param_keys = get_table_sim_results_keys(table)
             #check if target_param_keys is type list and system has more than one element
             elif isinstance(self.target_param_keys, list) and len(self.selected_system) == 2:
-                self.target_param_keys += get_sim_results_keys(df)
+                self.target_param_keys += get_table_sim_results_keys(table)
             #check if target_param_keys is type list and system has only one element
             elif isinstance(self.target_param_keys, list) and len(self.selected_system) != 1:
-                self.target_param_keys = get_sim_results_keys(df)
+                self.target_param_keys = get_table_sim_results_keys(table)
             else:
                 raise UserWarning("target_param_keys is not None or a list. Please check `self.target_param_keys`")
 
@@ -1344,17 +1680,13 @@ class SQuADDS_DB(metaclass=SingletonMeta):
     def read_parquet_file(self, file_name):
         """
         Takes in the filename and returns the object to be read as a pandas dataframe.
-        
+
+        The file is downloaded once into the SQuADDS store and memory-mapped on later reads.
+
         Args:
             file_name (str): The name of the parquet file to read.
             
         Returns:
             pandas.DataFrame: The dataframe read from the parquet file.
         """
-        base_url = f"https://huggingface.co/datasets/{self.repo_name}/resolve/main/{file_name}"
-        response = requests.get(base_url)
-        with open(file_name, 'wb') as f:
-            f.write(response.content)
-        df = pd.read_parquet(file_name)
-        os.remove(file_name)  # Cleanup the downloaded file
-        return df
+        return pq.read_table(self.store.fetch_file(file_name), memory_map=True).to_pandas()
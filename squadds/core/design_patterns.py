@@ -1,9 +1,15 @@
+import threading
+
+
 class SingletonMeta(type):
     """
     Metaclass for implementing the Singleton design pattern.
+
+    The instance is created under a lock, so threads constructing the class concurrently get the same instance.
     """
 
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
         """
@@ -21,6 +27,7 @@ class SingletonMeta(type):
 
         """
         if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
+            with cls._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
@@ -0,0 +1,254 @@
+"""
+Typed columnar view of the leaf parameters of a `design_options` column.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from squadds.core.utils import (identity_codes, parse_unit_strings,
+                                to_arrow_array)
+
+
+class GeometryView:
+    """
+    The leaf parameters of a column of (nested) design options dictionaries, one column per leaf.
+
+    Every leaf is addressed by its path, e.g. ("connection_pads", "readout", "claw_length"), by the dotted
+    path "connection_pads.readout.claw_length", or by its last key "claw_length" when no other leaf has it.
+    The raw values are kept as Arrow arrays and the numeric values (strings with units are converted to
+    canonical units, see `parse_unit_strings`) are computed once per leaf.
+
+    Rows that hold the same dictionary object, as the rows of a merged qubit-cavity DataFrame do, are
+    converted once: the view stores the distinct rows and the position of each row among them.
+
+    Methods:
+        from_design_options(values): Build the view of a column of dictionaries or an Arrow struct array.
+        raw(name, rows): Get the values of a leaf as they are stored.
+        values(name, rows, dtype): Get the numeric values of a leaf.
+        column(name, index): Get the values of a leaf as they are stored, as a pandas Series.
+        take(rows): Get the view of some of the rows.
+        to_pandas(names, rows, numeric): Get some leaves as a DataFrame.
+    """
+
+    def __init__(self, leaves, codes=None, length=None):
+        """
+        Constructor for the GeometryView class.
+
+        Args:
+            leaves (dict): A dictionary mapping the path (tuple) of each leaf to an Arrow array over the distinct rows.
+            codes (numpy.ndarray, optional): The position of each row among the distinct rows. Defaults to one distinct row per row.
+            length (int, optional): The number of distinct rows, needed if there are no leaves.
+        """
+        self.leaves = leaves
+        self.codes = codes
+        self._length = length if length is not None else len(next(iter(leaves.values()))) if leaves else 0
+        self._numeric = {}
+        self._names = {}
+        for path in leaves:
+            self._names.setdefault(path[-1], []).append(path)
+
+    @classmethod
+    def from_design_options(cls, values):
+        """
+        Builds the view of a `design_options` column in a single Arrow conversion of its distinct dictionaries.
+
+        Args:
+            values (pandas.Series, list, pyarrow.Array or pyarrow.ChunkedArray): The dictionaries.
+
+        Returns:
+            GeometryView: The view.
+        """
+        codes = None
+        if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+            objects = values.values if isinstance(values, pd.Series) else np.asarray(values, dtype=object)
+            codes, first = identity_codes(objects)
+            if len(first) < len(objects):
+                objects = objects[first]
+            else:
+                codes = None
+            values = objects
+        try:
+            array = to_arrow_array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # the dictionaries do not share a schema
+            return cls(_leaves_from_rows(values), codes=codes, length=len(values))
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+
+        leaves = {}
+        _collect_leaves(array, (), leaves)
+        return cls(leaves, codes=codes, length=len(array))
+
+    def __len__(self):
+        return self._length if self.codes is None else len(self.codes)
+
+    def __contains__(self, name):
+        try:
+            self.resolve(name)
+        except KeyError:
+            return False
+        return True
+
+    @property
+    def paths(self):
+        """The paths of the leaves."""
+        return list(self.leaves)
+
+    @property
+    def nbytes(self):
+        """The memory used by the raw values and the row positions, in bytes."""
+        return sum(array.nbytes for array in self.leaves.values()) + (0 if self.codes is None else self.codes.nbytes)
+
+    def resolve(self, name):
+        """
+        Returns the path of a leaf.
+
+        Args:
+            name (tuple or str): A path, a dotted path or the last key of a path.
+
+        Returns:
+            tuple: The path of the leaf.
+
+        Raises:
+            KeyError: If there is no such leaf or the last key is shared by several leaves.
+        """
+        if isinstance(name, tuple):
+            path = name
+        elif name in self._names and len(self._names[name]) == 1:
+            path = self._names[name][0]
+        elif name in self._names:
+            raise KeyError(f"'{name}' is ambiguous, use one of {['.'.join(path) for path in self._names[name]]}.")
+        else:
+            path = tuple(name.split("."))
+        if path not in self.leaves:
+            raise KeyError(f"No design option '{name if isinstance(name, str) else '.'.join(name)}'.")
+        return path
+
+    def raw(self, name, rows=None):
+        """
+        Returns the values of a leaf as they are stored, e.g. "30um".
+
+        Args:
+            name (tuple or str): The leaf, see `resolve`.
+            rows (array-like, optional): The row positions to return. Defaults to all rows.
+
+        Returns:
+            numpy.ndarray: The values, None where a row does not have the leaf.
+        """
+        array = self.leaves[self.resolve(name)]
+        values = np.asarray(array.to_pylist(), dtype=object) if not _is_numeric(array) else array.to_numpy(zero_copy_only=False)
+        return values[self._positions(rows)]
+
+    def values(self, name, rows=None, dtype=np.float64):
+        """
+        Returns the numeric values of a leaf, with strings with units in canonical units (um, nH, fF, GHz).
+
+        Args:
+            name (tuple or str): The leaf, see `resolve`.
+            rows (array-like, optional): The row positions to return. Defaults to all rows.
+            dtype (numpy.dtype, optional): The type of the result. Defaults to numpy.float64.
+
+        Returns:
+            numpy.ndarray: The values, NaN where a row does not have the leaf or its value is not a number.
+        """
+        path = self.resolve(name)
+        if path not in self._numeric:
+            self._numeric[path] = parse_unit_strings(self.leaves[path])
+        return self._numeric[path][self._positions(rows)].astype(dtype, copy=False)
+
+    def column(self, name, index=None):
+        """
+        Returns the values of a leaf as they are stored, as a pandas Series in the dtype Arrow converts them to.
+
+        Args:
+            name (tuple or str): The leaf, see `resolve`.
+            index (pandas.Index, optional): The index of the Series. Defaults to a RangeIndex.
+
+        Returns:
+            pandas.Series: The values, None (NaN in numeric columns) where a row does not have the leaf.
+            All None if there is no such leaf.
+        """
+        try:
+            array = self.leaves[self.resolve(name)]
+        except KeyError:
+            array = pa.nulls(self._length)
+        if self.codes is not None:
+            array = array.take(pa.array(self.codes))
+        series = array.to_pandas()
+        if pa.types.is_null(array.type):
+            series = series.astype(object)
+        if index is not None:
+            series.index = index
+        return series
+
+    def take(self, rows):
+        """
+        Returns the view of some of the rows. The raw values are shared, not copied.
+
+        Args:
+            rows (array-like): The row positions.
+
+        Returns:
+            GeometryView: The view of the rows.
+        """
+        positions = np.arange(self._length)[self._positions(rows)] if self.codes is None else self._positions(rows)
+        view = GeometryView(self.leaves, codes=positions, length=self._length)
+        view._numeric = self._numeric
+        return view
+
+    def to_pandas(self, names=None, rows=None, numeric=True):
+        """
+        Returns some leaves as a DataFrame, with one column per leaf named after the requested name.
+
+        Args:
+            names (list, optional): The leaves, see `resolve`. Defaults to every leaf, named by their dotted paths.
+            rows (array-like, optional): The row positions to return. Defaults to all rows.
+            numeric (bool, optional): Whether to return the numeric values instead of the raw ones. Defaults to True.
+
+        Returns:
+            pandas.DataFrame: The leaves.
+        """
+        names = [".".join(path) for path in self.leaves] if names is None else names
+        get = self.values if numeric else self.raw
+        return pd.DataFrame({name if isinstance(name, str) else ".".join(name): get(name, rows) for name in names})
+
+    def _positions(self, rows):
+        if self.codes is None:
+            return slice(None) if rows is None else np.asarray(rows)
+        return self.codes if rows is None else self.codes[np.asarray(rows)]
+
+
+def _collect_leaves(array, path, leaves):
+    if pa.types.is_struct(array.type):
+        for i, field in enumerate(array.type):
+            _collect_leaves(pc.struct_field(array, [i]), path + (field.name,), leaves)
+    elif path:
+        leaves[path] = array
+
+
+def _leaves_from_rows(rows):
+    flattened = [_flatten_dict(row) if isinstance(row, dict) else {} for row in rows]
+    paths = list(dict.fromkeys(path for row in flattened for path in row))
+    leaves = {}
+    for path in paths:
+        column = [row.get(path) for row in flattened]
+        try:
+            leaves[path] = pa.array(column, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            leaves[path] = pa.array([None if value is None else str(value) for value in column])
+    return leaves
+
+
+def _flatten_dict(row, path=()):
+    leaves = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            leaves.update(_flatten_dict(value, path + (key,)))
+        else:
+            leaves[path + (key,)] = value
+    return leaves
+
+
+def _is_numeric(array):
+    return pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_boolean(array.type)
@@ -0,0 +1,177 @@
+"""
+Spatial index over the Hamiltonian parameters of a system, for exact nearest-design queries.
+"""
+import hashlib
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class DesignIndex:
+    """
+    A KD-tree over the rows of a matrix of target columns, e.g. qubit_frequency_GHz, g_MHz and cavity_frequency_GHz.
+
+    The tree is built once in a normalized space, where every column is scaled like the metric scales a typical
+    target (e.g. divided by the median of its absolute values for the relative-error Euclidean metric), so that the
+    distances of the metric and of the tree are close for any target.
+    Queries are exact: they return the same designs, in the same order, as computing the metric for every row
+    and keeping the `k` smallest. Rows with a missing (NaN) or infinite value are not indexed, since their
+    distance is never finite.
+
+    Methods:
+        build(matrix, positions, metric, columns): Build the index of the rows of a matrix.
+        from_arrays(values, positions, scales): Rebuild an index from the arrays it was stored as.
+        arrays(): Get the arrays to store the index as.
+        content_key(matrix, positions, columns): Hash the data an index is built from.
+        query(metric, target_params, k, return_distance): Get the positions of the `k` closest rows.
+    """
+
+    def __init__(self, values, positions, scales, tree):
+        """
+        Constructor for the DesignIndex class.
+
+        Args:
+            values (numpy.ndarray): The indexed rows, in their original units.
+            positions (numpy.ndarray): The position of every indexed row in the DataFrame it comes from.
+            scales (numpy.ndarray): The factor applied to every column to build the tree.
+            tree (scipy.spatial.cKDTree): The tree over `values * scales`.
+        """
+        self.values = values
+        self.positions = positions
+        self.scales = scales
+        self.tree = tree
+
+    @classmethod
+    def build(cls, matrix, positions, metric=None, columns=None):
+        """
+        Builds the index of the rows of a matrix.
+
+        Args:
+            matrix (numpy.ndarray): One row per design and one column per target parameter.
+            positions (numpy.ndarray): The position of every row in the DataFrame it comes from.
+            metric (MetricStrategy, optional): The metric the index will be queried with. The tree is scaled like
+                this metric scales a typical target (the median of every column), so that its queries visit few rows.
+                Defaults to dividing every column by the median of its absolute values.
+            columns (list, optional): The target parameters of the columns, needed with `metric`.
+
+        Returns:
+            DesignIndex: The index.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(len(matrix), -1)
+        finite = np.isfinite(matrix).all(axis=1)
+        values = np.ascontiguousarray(matrix[finite])
+        positions = np.asarray(positions)[finite]
+
+        medians = np.median(np.abs(values), axis=0) if len(values) else np.ones(values.shape[1])
+        scales = np.where((medians > 0) & np.isfinite(medians), 1 / np.where(medians > 0, medians, 1), 1.0)
+        norm = metric.index_norm(dict(zip(columns, medians.tolist()))) if metric is not None else None
+        if norm is not None and np.isfinite(norm[1]).all() and (np.asarray(norm[1]) > 0).all():
+            scales = np.asarray(norm[1], dtype=np.float64)
+        return cls(values, positions, scales, cKDTree(values * scales))
+
+    @classmethod
+    def from_arrays(cls, values, positions, scales):
+        """
+        Rebuilds an index from the arrays returned by `arrays`, e.g. after loading them from disk.
+
+        Args:
+            values (numpy.ndarray): The indexed rows, in their original units.
+            positions (numpy.ndarray): The position of every indexed row.
+            scales (numpy.ndarray): The factor applied to every column to build the tree.
+
+        Returns:
+            DesignIndex: The index, with the same tree as the stored one.
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        scales = np.asarray(scales, dtype=np.float64)
+        return cls(values, np.asarray(positions), scales, cKDTree(values * scales))
+
+    def arrays(self):
+        """
+        Returns the arrays the index is stored as. The tree is not stored, `from_arrays` rebuilds it.
+
+        The rows are kept in their original units rather than scaled, since queries rank the candidates with
+        the metric itself; the scaled matrix of the tree is recomputed exactly from them.
+
+        Returns:
+            dict: The values, positions and scales of the index.
+        """
+        return {"values": self.values, "positions": self.positions, "scales": self.scales}
+
+    @staticmethod
+    def content_key(matrix, positions, columns):
+        """
+        Hashes the data an index is built from, to find a stored index again.
+
+        Args:
+            matrix (numpy.ndarray): The matrix passed to `build`.
+            positions (numpy.ndarray): The positions passed to `build`.
+            columns (list): The names of the columns of the matrix.
+
+        Returns:
+            str: The content key.
+        """
+        digest = hashlib.sha1()
+        digest.update(repr(list(columns)).encode())
+        digest.update(memoryview(np.ascontiguousarray(matrix, dtype=np.float64)))
+        digest.update(memoryview(np.ascontiguousarray(positions, dtype=np.int64)))
+        return digest.hexdigest()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def query(self, metric, target_params, k, return_distance=False):
+        """
+        Returns the positions of the `k` rows closest to the target parameters, closest first.
+
+        The `k` nearest rows in the tree give an upper bound of the k-th smallest distance. Every row
+        that can be closer than this bound under `metric` lies within a ball of the tree space, and only
+        the rows of that ball are ranked with the metric itself.
+
+        Args:
+            metric (MetricStrategy): A metric with `index_norm`, e.g. EuclideanMetric.
+            target_params (dict): The target parameters, whose numerical values are the columns of the index.
+            k (int): The number of rows to return.
+            return_distance (bool, optional): Whether to also return the distances of the rows. Defaults to False.
+
+        Returns:
+            numpy.ndarray: The positions, or (positions, distances) with `return_distance`.
+            None if the metric cannot be answered by the index.
+        """
+        norm = metric.index_norm(target_params) if metric.supports_batch() else None
+        if norm is None:
+            return None
+        p, weights = norm
+        columns = metric.batch_columns(target_params)
+        targets = np.array([target_params[key] for key in columns], dtype=np.float64)
+        # weight of every axis of the tree space in the metric
+        axis_weights = np.asarray(weights, dtype=np.float64) / self.scales
+        if not np.isfinite(axis_weights).all() or axis_weights.min() <= 0 or not np.isfinite(targets).all():
+            return None
+
+        k = min(k, len(self))
+        if k == 0:
+            return (self.positions[:0], np.empty(0)) if return_distance else self.positions[:0]
+        query_point = targets * self.scales
+        _, nearest = self.tree.query(query_point, k=k, p=p)
+        nearest = np.atleast_1d(nearest)
+        bound = np.sort(_weighted_norm(self.values[nearest] - targets, weights, p))[k - 1]
+
+        # the ball holds the k nearest rows of the tree, so at least k rows
+        candidates = np.array(self.tree.query_ball_point(query_point, bound / axis_weights.min() * (1 + 1e-9), p=p, return_sorted=False), dtype=np.int64)
+        distances = metric.calculate_batch(target_params, self.values[candidates])
+        # rank like pandas.Series.nsmallest: by distance, ties in order of appearance
+        selected = np.flatnonzero(distances <= np.partition(distances, k - 1)[k - 1])
+        order = selected[np.lexsort((self.positions[candidates[selected]], distances[selected]))][:k]
+        if return_distance:
+            return self.positions[candidates[order]], distances[order]
+        return self.positions[candidates[order]]
+
+
+def _weighted_norm(differences, weights, p):
+    weighted = np.abs(differences) * weights
+    if p == np.inf:
+        return weighted.max(axis=1)
+    if p == 1:
+        return weighted.sum(axis=1)
+    return np.sqrt((weighted ** 2).sum(axis=1))
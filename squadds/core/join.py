@@ -0,0 +1,344 @@
+"""
+Factorized representation of the join between two component DataFrames.
+"""
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def join_pairs(left_keys, right_keys, num_workers=1, merge_order=False):
+    """
+    Computes the row pairs of an inner equi-join without building the joined rows.
+
+    Missing keys match each other, as they do in `pandas.merge`.
+
+    Args:
+        left_keys (list): One array of join keys per join column, for the left rows.
+        right_keys (list): One array of join keys per join column, for the right rows, in the same order.
+        num_workers (int, optional): The number of processes matching the left rows. Defaults to 1.
+        merge_order (bool, optional): Whether to order the pairs as `pandas.merge` orders the rows of an inner join,
+            i.e. grouped by key in order of first appearance on the left. Defaults to False.
+
+    Returns:
+        tuple: Two int32 arrays with the left and right row positions of every matching pair,
+        ordered by left row and then by right row unless `merge_order` is True.
+    """
+    left_codes, right_codes = _join_codes(left_keys, right_keys)
+    order = np.argsort(right_codes, kind="stable")
+    sorted_codes = right_codes[order]
+
+    if num_workers is None or num_workers <= 1 or len(left_codes) < 2 * num_workers:
+        left_index, right_index = _pairs_from_codes(left_codes, sorted_codes, order)
+    else:
+        left_index, right_index = _parallel_pairs_from_codes(left_codes, sorted_codes, order, num_workers)
+
+    if merge_order:
+        # the codes are numbered in order of first appearance on the left
+        by_key = np.argsort(left_codes[left_index], kind="stable")
+        left_index, right_index = left_index[by_key], right_index[by_key]
+    return left_index, right_index
+
+
+def _join_codes(left_keys, right_keys):
+    """Returns one integer code per row and distinct combination of keys, shared by both sides."""
+    n_left = len(left_keys[0]) if left_keys else 0
+    n_right = len(right_keys[0]) if right_keys else 0
+
+    codes = np.zeros(n_left + n_right, dtype=np.int64)
+    for left, right in zip(left_keys, right_keys):
+        column_codes, uniques = pd.factorize(np.concatenate([np.asarray(left), np.asarray(right)]), use_na_sentinel=False)
+        codes = codes * len(uniques) + column_codes
+        codes = pd.factorize(codes)[0].astype(np.int64)
+    return codes[:n_left], codes[n_left:]
+
+
+def _pairs_from_codes(left_codes, sorted_codes, order):
+    """Matches the left rows against the sorted right codes."""
+    starts = np.searchsorted(sorted_codes, left_codes, side="left")
+    counts = np.searchsorted(sorted_codes, left_codes, side="right") - starts
+    left_index = np.empty(counts.sum(), dtype=np.int32)
+    right_index = np.empty(counts.sum(), dtype=np.int32)
+    _fill_pairs(starts, counts, order, left_index, right_index, 0, len(counts), 0)
+    return left_index, right_index
+
+
+def _fill_pairs(starts, counts, order, left_index, right_index, start, stop, offset):
+    """Writes the pairs of the left rows [start, stop) into the output arrays, from position `offset` on."""
+    row_counts = counts[start:stop]
+    n_pairs = int(row_counts.sum())
+    within = np.arange(n_pairs) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    left_index[offset:offset + n_pairs] = np.repeat(np.arange(start, stop, dtype=np.int32), row_counts)
+    right_index[offset:offset + n_pairs] = order[np.repeat(starts[start:stop], row_counts) + within]
+
+
+def _share(array):
+    """Copies an array into a new shared memory block and returns the block and its description."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _pairs_worker(specs, start, stop, offset):
+    """Writes the pairs of the left rows [start, stop) into the output arrays published in shared memory."""
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=block.buf) for block, (_, shape, dtype) in zip(blocks, specs)]
+    _fill_pairs(*arrays, start, stop, offset)
+
+    # the views must go before the blocks can be closed
+    del arrays
+    for block in blocks:
+        block.close()
+
+
+def _parallel_pairs_from_codes(left_codes, sorted_codes, order, num_workers):
+    """
+    Matches the left rows in `num_workers` processes.
+
+    The parent finds where each left row's matches start and how many there are. The workers then write the
+    pairs straight into preallocated output arrays in shared memory, each into its own slice. Nothing is pickled
+    per row or per pair and the DataFrames never leave the parent process.
+    """
+    starts = np.searchsorted(sorted_codes, left_codes, side="left")
+    counts = np.searchsorted(sorted_codes, left_codes, side="right") - starts
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    n_pairs = int(offsets[-1])
+
+    # split the left rows so that every worker writes about the same number of pairs
+    bounds = np.searchsorted(offsets, np.linspace(0, n_pairs, num_workers + 1), side="left")
+    bounds[0], bounds[-1] = 0, len(left_codes)
+    bounds = np.unique(bounds)
+
+    shared = [_share(array) for array in (starts, counts, order, np.empty(n_pairs, dtype=np.int32), np.empty(n_pairs, dtype=np.int32))]
+    specs = [spec for _, spec in shared]
+    try:
+        with Pool(num_workers) as pool:
+            pool.starmap(_pairs_worker, [(specs, start, stop, offsets[start]) for start, stop in zip(bounds[:-1], bounds[1:])])
+        left_index, right_index = (np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy() for shm, (_, shape, dtype) in shared[3:])
+    finally:
+        for shm, _ in shared:
+            shm.close()
+            shm.unlink()
+    return left_index, right_index
+
+
+class FactorizedJoin:
+    """
+    The join of two DataFrames kept as the two source frames plus the row positions of every pair.
+
+    Every source row is stored once, however many pairs it takes part in, so the memory used grows
+    with the number of source rows instead of the number of pairs. Columns computed per pair (e.g. the
+    coupling strength of a qubit-cavity pair) are stored once per pair as plain arrays.
+
+    Columns are named as `pandas.merge` would name them: a column present in both sources gets the
+    left or right suffix, every other column keeps its name.
+
+    Methods:
+        from_keys(left, right, left_keys, right_keys, suffixes): Joins two DataFrames on precomputed keys.
+        column(name): Get one column for every pair.
+        filter(mask): Keep the pairs where `mask` is True.
+        take(rows): Keep the given pairs.
+        to_pandas(rows, columns): Expand (some of) the pairs into a DataFrame.
+        memory_usage(): Get the memory used by the sources, the pairs and the derived columns.
+    """
+
+    def __init__(self, left, right, left_index, right_index, suffixes=("_qubit", "_cavity_claw"), derived=None):
+        """
+        Constructor for the FactorizedJoin class.
+
+        Args:
+            left (pandas.DataFrame): The left source rows.
+            right (pandas.DataFrame): The right source rows.
+            left_index (numpy.ndarray): The position in `left` of each pair.
+            right_index (numpy.ndarray): The position in `right` of each pair.
+            suffixes (tuple, optional): The suffixes of the columns present in both sources. Defaults to ("_qubit", "_cavity_claw").
+            derived (dict, optional): Columns computed per pair, as arrays aligned with the pairs. Defaults to None.
+        """
+        if len(left_index) != len(right_index):
+            raise ValueError("`left_index` and `right_index` must have the same length.")
+        self.left = left if left.index.equals(pd.RangeIndex(len(left))) else left.reset_index(drop=True)
+        self.right = right if right.index.equals(pd.RangeIndex(len(right))) else right.reset_index(drop=True)
+        self.left_index = np.asarray(left_index, dtype=np.int32)
+        self.right_index = np.asarray(right_index, dtype=np.int32)
+        self.suffixes = tuple(suffixes)
+        self.derived = dict(derived) if derived else {}
+
+    @classmethod
+    def from_keys(cls, left, right, left_keys, right_keys, suffixes=("_qubit", "_cavity_claw"), num_workers=1, merge_order=False):
+        """
+        Joins two DataFrames on precomputed join keys.
+
+        Args:
+            left (pandas.DataFrame): The left source rows.
+            right (pandas.DataFrame): The right source rows.
+            left_keys (list): One array of join keys per join column, aligned with `left`.
+            right_keys (list): One array of join keys per join column, aligned with `right`.
+            suffixes (tuple, optional): The suffixes of the columns present in both sources. Defaults to ("_qubit", "_cavity_claw").
+            num_workers (int, optional): The number of processes computing the pairs. Defaults to 1.
+            merge_order (bool, optional): Whether to order the pairs as the rows of `pandas.merge`. Defaults to False.
+
+        Returns:
+            FactorizedJoin: The join of the two DataFrames.
+        """
+        left_index, right_index = join_pairs(left_keys, right_keys, num_workers=num_workers, merge_order=merge_order)
+        return cls(left, right, left_index, right_index, suffixes=suffixes)
+
+    def __len__(self):
+        return len(self.left_index)
+
+    def __repr__(self):
+        return f"FactorizedJoin({len(self)} pairs of {len(self.left)} x {len(self.right)} rows, {len(self.columns)} columns)"
+
+    @property
+    def shape(self):
+        return len(self), len(self.columns)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        """The column names, in the order `pandas.merge` would produce them, followed by the derived columns."""
+        return pd.Index([name for name, _, _ in self._layout()] + [name for name in self.derived if name not in self._source_names()])
+
+    def _layout(self):
+        """Returns (name, side, source column) for every source column."""
+        shared = set(self.left.columns) & set(self.right.columns)
+        layout = [(f"{c}{self.suffixes[0]}" if c in shared else c, "left", c) for c in self.left.columns]
+        layout += [(f"{c}{self.suffixes[1]}" if c in shared else c, "right", c) for c in self.right.columns]
+        return layout
+
+    def _source_names(self):
+        return {name for name, _, _ in self._layout()}
+
+    def _resolve(self, name):
+        """Returns the side ("left", "right" or "derived") and the source column of a column name."""
+        if name in self.derived:
+            return "derived", name
+        for column_name, side, source in self._layout():
+            if column_name == name:
+                return side, source
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        try:
+            self._resolve(name)
+        except KeyError:
+            return False
+        return True
+
+    def column(self, name, rows=None):
+        """
+        Returns one column for every pair, or for the given pairs.
+
+        Args:
+            name (str): The column name.
+            rows (numpy.ndarray, optional): The positions of the pairs. Defaults to every pair.
+
+        Returns:
+            numpy.ndarray: The column values.
+        """
+        side, source = self._resolve(name)
+        if side == "derived":
+            values = self.derived[source]
+            return values if rows is None else values[rows]
+        index = self.left_index if side == "left" else self.right_index
+        if rows is not None:
+            index = index[rows]
+        frame = self.left if side == "left" else self.right
+        return frame[source].to_numpy()[index]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return pd.Series(self.column(key), name=key)
+        if isinstance(key, (list, pd.Index)):
+            return self.to_pandas(columns=list(key))
+        return self.filter(key)
+
+    def __setitem__(self, name, values):
+        """Stores a column computed per pair."""
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(len(self), values)
+        if len(values) != len(self):
+            raise ValueError(f"Length of values ({len(values)}) does not match the number of pairs ({len(self)}).")
+        self.derived[name] = values
+
+    def copy(self):
+        """Returns a join whose columns can be added or replaced without changing this one. The data itself is shared."""
+        return FactorizedJoin(self.left.copy(deep=False), self.right.copy(deep=False), self.left_index.copy(), self.right_index.copy(), self.suffixes,
+                              {name: values.copy() for name, values in self.derived.items()})
+
+    def take(self, rows):
+        """
+        Keeps the given pairs. The source frames are shared with this join.
+
+        Args:
+            rows (array-like): The positions of the pairs to keep.
+
+        Returns:
+            FactorizedJoin: The selected pairs.
+        """
+        rows = np.asarray(rows)
+        return FactorizedJoin(self.left, self.right, self.left_index[rows], self.right_index[rows], self.suffixes,
+                              {name: values[rows] for name, values in self.derived.items()})
+
+    def filter(self, mask):
+        """
+        Keeps the pairs where `mask` is True. The source frames are shared with this join.
+
+        Args:
+            mask (array-like): A boolean per pair.
+
+        Returns:
+            FactorizedJoin: The selected pairs.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if len(mask) != len(self):
+            raise ValueError(f"Length of the mask ({len(mask)}) does not match the number of pairs ({len(self)}).")
+        return self.take(np.flatnonzero(mask))
+
+    def to_pandas(self, rows=None, columns=None):
+        """
+        Expands pairs into a DataFrame with one row per pair.
+
+        Args:
+            rows (array-like, optional): The positions of the pairs to expand. Defaults to every pair.
+            columns (list, optional): The columns to expand. Defaults to every column.
+
+        Returns:
+            pandas.DataFrame: The expanded pairs, indexed by their position in the join.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        columns = list(self.columns) if columns is None else list(columns)
+        resolved = [(name, *self._resolve(name)) for name in columns]
+
+        parts = []
+        for side, frame, index in (("left", self.left, self.left_index), ("right", self.right, self.right_index)):
+            names = [(name, source) for name, s, source in resolved if s == side]
+            if names:
+                part = frame[[source for _, source in names]].iloc[index[rows]]
+                part.columns = [name for name, _ in names]
+                parts.append(part.reset_index(drop=True))
+        derived = {name: self.derived[source][rows] for name, s, source in resolved if s == "derived"}
+        if derived:
+            parts.append(pd.DataFrame(derived))
+
+        df = pd.concat(parts, axis=1) if parts else pd.DataFrame(index=range(len(rows)))
+        df.index = pd.Index(rows)
+        return df[columns]
+
+    def memory_usage(self):
+        """
+        Returns the memory used by the join, in bytes.
+
+        Returns:
+            dict: The bytes used by the left rows, the right rows, the pair indices and the derived columns.
+        """
+        return {
+            "left": int(self.left.memory_usage(deep=True).sum()),
+            "right": int(self.right.memory_usage(deep=True).sum()),
+            "pairs": int(self.left_index.nbytes + self.right_index.nbytes),
+            "derived": int(sum(values.nbytes for values in self.derived.values())),
+        }
@@ -1,15 +1,109 @@
+import heapq
+import itertools
 import logging
 from abc import ABC, abstractmethod
 
 import numpy as np
 import pandas as pd
 from joblib import Parallel, delayed
+from numba import jit
 from numpy import linalg as LA
 
 logging.basicConfig(level=logging.INFO)
 
+
+@jit(nopython=True, cache=True)
+def _relative_squared_kernel(matrix, targets, weights):
+    """sum_i w_i * (x_i - t_i)^2 / t_i^2 for every row of `matrix`, in the order the per-row metrics add the terms."""
+    distances = np.empty(matrix.shape[0])
+    for row in range(matrix.shape[0]):
+        distance = 0.0
+        for column in range(matrix.shape[1]):
+            difference = matrix[row, column] - targets[column]
+            distance += weights[column] * (difference * difference) / (targets[column] * targets[column])
+        distances[row] = distance
+    return distances
+
+
+@jit(nopython=True, cache=True)
+def _manhattan_kernel(matrix, targets):
+    distances = np.empty(matrix.shape[0])
+    for row in range(matrix.shape[0]):
+        distance = 0.0
+        for column in range(matrix.shape[1]):
+            distance += abs(targets[column] - matrix[row, column])
+        distances[row] = distance
+    return distances
+
+
+@jit(nopython=True, cache=True)
+def _chebyshev_kernel(matrix, targets):
+    distances = np.empty(matrix.shape[0])
+    for row in range(matrix.shape[0]):
+        distance = 0.0
+        for column in range(matrix.shape[1]):
+            difference = abs(targets[column] - matrix[row, column])
+            if np.isnan(difference):
+                distance = np.nan
+                break
+            if difference > distance:
+                distance = difference
+        distances[row] = distance
+    return distances
+
+
+def _as_matrix(matrix):
+    """Returns `matrix` as a C-contiguous 2D float64 array, without copying if it already is one."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    return matrix.reshape(len(matrix), -1)
+
+
+def smallest_k(distances, k):
+    """Returns the positions of the `k` smallest distances, in the order of `pandas.Series.nsmallest`.
+
+    The k-th smallest distance is found with a partial sort in O(n), and only the distances up to it are sorted.
+    Like `nsmallest`, NaN distances are never selected and ties are kept in order of appearance.
+
+    Args:
+        distances (np.ndarray): The distances.
+        k (int): The number of positions to return.
+
+    Returns:
+        np.ndarray: The positions of the smallest distances, smallest first.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    positions = np.flatnonzero(~np.isnan(distances))
+    if k <= 0:
+        return positions[:0]
+    if len(positions) > k:
+        kth = np.partition(distances[positions], k - 1)[k - 1]
+        positions = positions[distances[positions] <= kth]
+    return positions[np.lexsort((positions, distances[positions]))][:k]
+
+
+def merge_smallest(chunks, k):
+    """Merges the smallest distances of consecutive chunks of rows into the `k` smallest of all of them.
+
+    Args:
+        chunks (list): One (distances, labels) pair per chunk, in the order of the rows, each sorted as returned by `smallest_k`.
+        k (int): The number of rows to return.
+
+    Returns:
+        tuple: The `k` smallest distances and their labels, smallest first. Ties are kept in order of appearance.
+    """
+    merged = heapq.merge(*[zip(distances, itertools.repeat(chunk), range(len(distances)), labels)
+                           for chunk, (distances, labels) in enumerate(chunks)])
+    closest = list(itertools.islice(merged, k))
+    return np.array([distance for distance, _, _, _ in closest], dtype=np.float64), np.array([label for _, _, _, label in closest])
+
+
 class MetricStrategy(ABC):
-    """Abstract class for metric strategies."""
+    """Abstract class for metric strategies.
+
+    Subclasses implement `calculate` for one row. Subclasses that can also compute every distance
+    in one pass over a matrix of the target columns implement `calculate_batch`, which `Analyzer.find_closest`
+    uses instead of calling `calculate` row by row.
+    """
 
     @abstractmethod
     def calculate(self, target_params: dict, row: pd.Series) -> float:
@@ -24,6 +118,55 @@ class MetricStrategy(ABC):
         """
         raise NotImplementedError("This method should be overridden by subclass")
 
+    def batch_columns(self, target_params: dict) -> list:
+        """The target parameters that make up the columns of the matrix passed to `calculate_batch`.
+
+        Args:
+            target_params (dict): Dictionary of target parameters.
+
+        Returns:
+            list: The numerical target parameters, in the order of `target_params`.
+        """
+        return [key for key, value in target_params.items() if isinstance(value, (int, float))]
+
+    def calculate_batch(self, target_params: dict, matrix: np.ndarray) -> np.ndarray:
+        """Calculate the distance metric between target parameters and every row of a matrix.
+
+        Args:
+            target_params (dict): Dictionary of target parameters.
+            matrix (np.ndarray): One row per design and one column per key of `batch_columns(target_params)`.
+
+        Returns:
+            np.ndarray: The distance of every row.
+        """
+        raise NotImplementedError("This metric only supports `calculate`.")
+
+    def supports_batch(self) -> bool:
+        """Whether `calculate_batch` computes the same distances as `calculate`.
+
+        This is the case if the class that implements `calculate_batch` is the class that implements `calculate`
+        or one of its subclasses, so a subclass that only overrides `calculate` keeps being used row by row.
+
+        Returns:
+            bool: True if the metric can be calculated in batch.
+        """
+        def owner(name):
+            return next(cls for cls in type(self).__mro__ if name in vars(cls))
+
+        return owner("calculate_batch") is not MetricStrategy and issubclass(owner("calculate_batch"), owner("calculate"))
+
+    def index_norm(self, target_params: dict):
+        """The norm the metric ranks rows by, for answering queries with a `DesignIndex`.
+
+        Args:
+            target_params (dict): Dictionary of target parameters.
+
+        Returns:
+            tuple: (p, weights) if `calculate` increases with the p-norm of weights * (row - target) over
+            `batch_columns(target_params)`, or None if the metric cannot be answered by an index.
+        """
+        return None
+
     def calculate_in_parallel(self, target_params: dict, df: pd.DataFrame, num_jobs: int = 4) -> pd.Series:
         """Calculate distances in parallel.
 
@@ -48,6 +191,48 @@ class MetricStrategy(ABC):
         """Helper method to calculate distances for a chunk of DataFrame rows."""
         return chunk.apply(lambda row: self.calculate(target_params, row), axis=1)
 
+    def closest_in_parallel(self, target_params: dict, df: pd.DataFrame, num_top: int, num_jobs: int = 4) -> pd.Index:
+        """Find the rows with the smallest distances in parallel.
+
+        Every job selects the `num_top` closest rows of its chunk, so only these cross process boundaries,
+        and they are merged into the `num_top` closest rows of `df`.
+
+        Args:
+            target_params (dict): Dictionary of target parameters.
+            df (pd.DataFrame): The DataFrame containing rows to calculate distances for.
+            num_top (int): The number of rows to return.
+            num_jobs (int): Number of jobs for parallel processing.
+
+        Returns:
+            pd.Index: The labels of the closest rows, closest first.
+        """
+        chunk_size = max(int(np.ceil(len(df) / num_jobs)), 1)
+        chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+
+        closest = Parallel(n_jobs=num_jobs)(
+            delayed(self.closest)(target_params, chunk, num_top) for chunk in chunks
+        )
+
+        return pd.Index(merge_smallest(closest, num_top)[1])
+
+    def closest(self, target_params: dict, df: pd.DataFrame, num_top: int) -> tuple:
+        """Find the rows of a DataFrame with the smallest distances, in batch if the metric supports it.
+
+        Args:
+            target_params (dict): Dictionary of target parameters.
+            df (pd.DataFrame): The DataFrame containing rows to calculate distances for.
+            num_top (int): The number of rows to return.
+
+        Returns:
+            tuple: The distances and the labels of the closest rows, closest first (see `merge_smallest`).
+        """
+        if self.supports_batch():
+            distances = self.calculate_batch(target_params, df[self.batch_columns(target_params)].to_numpy(dtype=np.float64))
+        else:
+            distances = self._calculate_chunk(target_params, df).to_numpy(dtype=np.float64)
+        selected = smallest_k(distances, num_top)
+        return distances[selected], df.index.to_numpy()[selected]
+
 
 class EuclideanMetric(MetricStrategy):
     """Implements the specific Euclidean metric strategy as per your definition."""
@@ -71,6 +256,25 @@ class EuclideanMetric(MetricStrategy):
                 distance += ((df_row[column] - target_value)**2 / target_value**2)
         return np.sqrt(distance)
 
+    def calculate_batch(self, target_params, matrix):
+        """Calculate the custom Euclidean distance between target_params and every row of a matrix.
+
+        Parameters:
+            target_params (dict): The target parameters as a dictionary.
+            matrix (np.ndarray): One row per design and one column per key of `batch_columns(target_params)`.
+
+        Returns:
+            np.ndarray: The custom Euclidean distances.
+        """
+        targets = np.array([target_params[key] for key in self.batch_columns(target_params)], dtype=np.float64)
+        return np.sqrt(_relative_squared_kernel(_as_matrix(matrix), targets, np.ones_like(targets)))
+
+    def index_norm(self, target_params):
+        """The custom Euclidean distance is the 2-norm of (row - target) / |target|."""
+        targets = np.array([target_params[key] for key in self.batch_columns(target_params)], dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            return 2, 1 / np.abs(targets)
+
 class ManhattanMetric(MetricStrategy):
     """Implements the Manhattan metric strategy."""
 
@@ -88,6 +292,23 @@ class ManhattanMetric(MetricStrategy):
         row_vector = np.array([df_row[key] for key in target_params])
         return LA.norm(target_vector - row_vector, ord=1)
 
+    def calculate_batch(self, target_params, matrix):
+        """Calculate the Manhattan distance between target_params and every row of a matrix.
+
+        Parameters:
+            target_params (dict): The target parameters as a dictionary.
+            matrix (np.ndarray): One row per design and one column per key of `batch_columns(target_params)`.
+
+        Returns:
+            np.ndarray: The Manhattan distances.
+        """
+        targets = np.array([target_params[key] for key in self.batch_columns(target_params)], dtype=np.float64)
+        return _manhattan_kernel(_as_matrix(matrix), targets)
+
+    def index_norm(self, target_params):
+        """The Manhattan distance is the 1-norm of (row - target)."""
+        return 1, np.ones(len(self.batch_columns(target_params)))
+
 
 class ChebyshevMetric(MetricStrategy):
     """Implements the Chebyshev metric strategy."""
@@ -106,6 +327,23 @@ class ChebyshevMetric(MetricStrategy):
         row_vector = np.array([df_row[key] for key in target_params])
         return LA.norm(target_vector - row_vector, ord=np.inf)
 
+    def calculate_batch(self, target_params, matrix):
+        """Calculate the Chebyshev distance between target_params and every row of a matrix.
+
+        Parameters:
+            target_params (dict): The target parameters as a dictionary.
+            matrix (np.ndarray): One row per design and one column per key of `batch_columns(target_params)`.
+
+        Returns:
+            np.ndarray: The Chebyshev distances.
+        """
+        targets = np.array([target_params[key] for key in self.batch_columns(target_params)], dtype=np.float64)
+        return _chebyshev_kernel(_as_matrix(matrix), targets)
+
+    def index_norm(self, target_params):
+        """The Chebyshev distance is the infinity-norm of (row - target)."""
+        return np.inf, np.ones(len(self.batch_columns(target_params)))
+
 
 class WeightedEuclideanMetric(MetricStrategy):
     """Concrete class for weighted Euclidean metric."""
@@ -139,6 +377,34 @@ class WeightedEuclideanMetric(MetricStrategy):
                 distance += weight * ((target_value - simulated_value) ** 2) / target_value**2
         return distance
 
+    def calculate_batch(self, target_params: dict, matrix: np.ndarray) -> np.ndarray:
+        """Calculate the weighted Euclidean distance between target parameters and every row of a matrix.
+
+        Args:
+            target_params (dict): Dictionary of target parameters.
+            matrix (np.ndarray): One row per design and one column per key of `batch_columns(target_params)`.
+
+        Returns:
+            np.ndarray: Calculated weighted Euclidean distances.
+        """
+        if self.weights is None:
+            self.weights = {key: 1 for key in target_params.keys()}
+            logging.info(f"\033[1mNOTE TO USER:\033[0m No metric weights provided. Using default weights of 1 for all parameters.")
+        columns = self.batch_columns(target_params)
+        targets = np.array([target_params[key] for key in columns], dtype=np.float64)
+        weights = np.array([self.weights.get(key, 1) for key in columns], dtype=np.float64)
+        return _relative_squared_kernel(_as_matrix(matrix), targets, weights)
+
+    def index_norm(self, target_params: dict):
+        """The weighted Euclidean distance is the square of the 2-norm of sqrt(weight) * (row - target) / |target|."""
+        columns = self.batch_columns(target_params)
+        weights = np.array([1 if self.weights is None else self.weights.get(key, 1) for key in columns], dtype=np.float64)
+        if (weights < 0).any():
+            return None
+        targets = np.array([target_params[key] for key in columns], dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            return 2, np.sqrt(weights) / np.abs(targets)
+
 class CustomMetric(MetricStrategy):
     """Implements a custom metric strategy using a user-defined function.
 
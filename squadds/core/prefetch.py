@@ -0,0 +1,96 @@
+"""
+Background loading of the datasets a selected system needs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+from tqdm import tqdm
+
+
+class Prefetch:
+    """
+    A handle on datasets being fetched in background threads.
+
+    Each task runs in its own thread, so the time to fetch everything is the time of the
+    slowest task rather than the sum of all of them.
+
+    Methods:
+        done(): Check whether every task has finished.
+        progress(): Get the number of finished tasks and the total number of tasks.
+        wait(timeout, show_progress): Block until every task has finished.
+        errors(): Get the exceptions raised by the failed tasks.
+    """
+
+    def __init__(self, tasks, previous=None):
+        """
+        Constructor for the Prefetch class. The tasks start running immediately.
+
+        Args:
+            tasks (dict): A dictionary mapping a task name to a function with no arguments.
+            previous (Prefetch, optional): An earlier prefetch whose running or successful tasks are reused instead of being started again.
+        """
+        reusable = {}
+        if previous is not None:
+            for name, future in previous.futures.items():
+                if not future.cancelled() and not (future.done() and future.exception() is not None):
+                    reusable[name] = future
+
+        new_tasks = {name: task for name, task in tasks.items() if name not in reusable}
+        started = {}
+        if new_tasks:
+            executor = ThreadPoolExecutor(max_workers=len(new_tasks), thread_name_prefix="squadds-prefetch")
+            started = {name: executor.submit(task) for name, task in new_tasks.items()}
+            executor.shutdown(wait=False)
+
+        self.futures = {name: reusable.get(name) or started[name] for name in tasks}
+
+    def __repr__(self):
+        completed, total = self.progress()
+        return f"Prefetch({completed}/{total} done: {', '.join(self.futures)})"
+
+    def done(self):
+        """Returns True if every task has finished (successfully or not)."""
+        return all(future.done() for future in self.futures.values())
+
+    def progress(self):
+        """
+        Returns the progress of the prefetch.
+
+        Returns:
+            tuple: (number of finished tasks, total number of tasks).
+        """
+        return sum(future.done() for future in self.futures.values()), len(self.futures)
+
+    def wait(self, timeout=None, show_progress=False):
+        """
+        Blocks until every task has finished. Failures are not raised here, see `errors()`.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Defaults to no limit.
+            show_progress (bool, optional): Whether to display a progress bar. Defaults to False.
+
+        Returns:
+            bool: True if every task has finished.
+        """
+        if not show_progress:
+            wait_futures(list(self.futures.values()), timeout=timeout)
+            return self.done()
+
+        completed, total = self.progress()
+        with tqdm(total=total, initial=completed, desc="Fetching datasets") as bar:
+            pending = {future for future in self.futures.values() if not future.done()}
+            while pending:
+                finished, pending = wait_futures(pending, timeout=timeout, return_when="FIRST_COMPLETED")
+                if not finished:
+                    break
+                bar.update(len(finished))
+        return self.done()
+
+    def errors(self):
+        """
+        Returns the exceptions raised by the tasks that failed.
+
+        Returns:
+            dict: A dictionary mapping a task name to its exception.
+        """
+        return {name: future.exception() for name, future in self.futures.items() if future.done() and future.exception() is not None}
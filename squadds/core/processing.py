@@ -3,6 +3,9 @@ from multiprocessing import Pool, cpu_count
 import numpy as np
 import pandas as pd
 
+from squadds.core.join import join_pairs
+from squadds.core.utils import extract_nested_fields, numeric_join_keys
+
 
 def unify_columns(df):
     # Find all columns with _x and _y suffixes
@@ -42,55 +45,57 @@ def merge_dfs(qubit_df_split, cavity_df, merger_terms):
 def update_ncap_parameters(cavity_df, ncap_df, merger_terms, ncap_sim_cols):
     """
     Updates the kappa and frequency of the cavity based on the results of the CapNInterdigitalTee simulations.
+
+    Each cavity is paired with every NCap simulation sharing its coupler geometry. The pairs are found on the
+    numeric join keys and only the columns that are needed are gathered for them.
     """
-    for term in merger_terms:
-        cavity_df[f'temp_{term}'] = cavity_df['design_options'].map(lambda x: x['cplr_opts'].get(term))
-        ncap_df[f'temp_{term}'] = ncap_df['design_options'].map(lambda x: x.get(term))
-    
-    # Add index columns to cavity_df and ncap_df
-    cavity_df = cavity_df.reset_index().rename(columns={'index': 'index_cc'})
+    # numeric join keys, so that e.g. "5um" and "5.0um" match
+    cavity_terms = extract_nested_fields(cavity_df['design_options'], {term: ('cplr_opts', term) for term in merger_terms})
+    ncap_terms = extract_nested_fields(ncap_df['design_options'], {term: (term,) for term in merger_terms})
+    cavity_index, ncap_index = join_pairs([numeric_join_keys(cavity_terms[term]) for term in merger_terms],
+                                          [numeric_join_keys(ncap_terms[term]) for term in merger_terms], merge_order=True)
+
+    # the cavity rows with their index, followed by the NCap columns that are kept (see below)
+    merged_df = cavity_df.iloc[cavity_index].reset_index().rename(columns={'index': 'index_cc'})
     ncap_df = ncap_df.reset_index().rename(columns={'index': 'index_cplr'})
-
-    # Perform the merge on the specific common terms
-    merged_df = pd.merge(cavity_df, ncap_df, 
-                         left_on=[f'temp_{term}' for term in merger_terms], 
-                         right_on=[f'temp_{term}' for term in merger_terms],
-                         suffixes=('_cavity_claw', '_ncap'))
+    # NCap columns sharing a name with a cavity column, and the simulation results, are not kept
+    kept_ncap_cols = [col for col in ncap_df.columns if col == 'index_cplr' or (col not in merged_df.columns and col not in ncap_sim_cols)]
+    for col in kept_ncap_cols:
+        merged_df[col] = ncap_df[col].to_numpy()[ncap_index]
 
     # Update the cavity resonator frequency and kappa
-    cavity_frequency_updated, kappa = update_cavity_frequency_and_kappa(merged_df)
-    merged_df.loc[:, "cavity_frequency"] = cavity_frequency_updated
-    merged_df.loc[:, "kappa"] = kappa
-
-    # Update the cavity_df with the ncap parameters
-    def update_cpw_cplr_opts(row):
-        ncap_opts = row["design_options_ncap"]
-        cpw_cplr_opts = row["design_options_cavity_claw"]["cplr_opts"]
-        common_terms = set(ncap_opts.keys()) & set(cpw_cplr_opts.keys())
-        updated_cplr_opts = cpw_cplr_opts.copy()  # Make a copy to update
-        for term in common_terms:
-            updated_cplr_opts[term] = ncap_opts[term]
-        return updated_cplr_opts
-
-    merged_df["design_options_cavity_claw"] = merged_df.apply(
-        lambda row: {**row["design_options_cavity_claw"], "cplr_opts": update_cpw_cplr_opts(row)}, axis=1)
-
-    # Remove the temporary columns
-    merged_df = merged_df.drop(columns=[f'temp_{term}' for term in merger_terms])
-    
-    # Remove all the columns with "_ncap" suffix except 'index_cplr'
-    columns_to_drop = [col for col in merged_df.columns if col.endswith("_ncap") and col != 'index_cplr']
-    merged_df = merged_df.drop(columns=columns_to_drop)
-
-    # Remove all the columns with ncap_sim_cols
-    merged_df = merged_df.drop(columns=ncap_sim_cols)
-    
-    # Rename the columns with "_cavity_claw" suffix to remove the suffix
-    merged_df = merged_df.rename(columns={col: col.replace("_cavity_claw", "") for col in merged_df.columns})
+    sim_results = pd.DataFrame({'cavity_frequency': merged_df['cavity_frequency'].to_numpy(),
+                                'top_to_ground': ncap_df['top_to_ground'].to_numpy()[ncap_index],
+                                'top_to_bottom': ncap_df['top_to_bottom'].to_numpy()[ncap_index]})
+    cavity_frequency_updated, kappa = update_cavity_frequency_and_kappa(sim_results)
+    merged_df["cavity_frequency"] = cavity_frequency_updated.to_numpy()
+    merged_df["kappa"] = kappa.to_numpy()
+
+    # Update the coupler options of the cavities with the NCap design options they share
+    ncap_options = ncap_df['design_options'].to_numpy()[ncap_index]
+    merged_df['design_options'] = [override_cplr_opts(cavity_options, options)
+                                   for cavity_options, options in zip(merged_df['design_options'].to_numpy(), ncap_options)]
 
     return merged_df
 
 
+def override_cplr_opts(cavity_options, ncap_options):
+    """
+    Returns a copy of the design options of a cavity whose coupler options take the values of the NCap design
+    options for the terms they have in common.
+
+    Parameters:
+    - cavity_options: The design options of the cavity.
+    - ncap_options: The design options of the NCap coupler.
+
+    Returns:
+    - options: The updated design options.
+    """
+    cplr_opts = cavity_options["cplr_opts"]
+    overrides = {term: ncap_options[term] for term in cplr_opts if term in ncap_options}
+    return {**cavity_options, "cplr_opts": {**cplr_opts, **overrides}}
+
+
 def update_cavity_frequency_and_kappa(merged_df, Z0=50):
     """
     Updates the cavity frequency and kappa based on the given merged_df DataFrame.
@@ -0,0 +1,91 @@
+"""
+Index over the simulation configurations of a SQuADDS dataset revision.
+"""
+
+
+class ConfigRegistry:
+    """
+    An immutable index over the ``<component>-<component_name>-<data_type>`` configurations of a dataset revision.
+
+    The names are split once when the registry is built. All membership checks are set lookups.
+
+    Methods:
+        has_component(component): Check whether a component is supported.
+        has_component_name(component_name): Check whether a component name is supported.
+        has_data_type(data_type): Check whether a data type is supported.
+        has_config(component, component_name, data_type): Check whether a configuration exists.
+        component_names_of(component): Get the component names available for a component.
+        data_types_of(component, component_name): Get the data types available for a component and component name.
+    """
+
+    def __init__(self, configs, revision=None):
+        """
+        Constructor for the ConfigRegistry class.
+
+        Args:
+            configs (list): The configuration names. Names that do not follow the simulation naming convention are ignored.
+            revision (str, optional): The dataset revision the configurations were read from.
+        """
+        self.revision = revision
+        self.configs = [config for config in configs if config.count('-') == 2]
+        self.entries = [tuple(config.split("-")) for config in self.configs]
+
+        self.components = frozenset(entry[0] for entry in self.entries)
+        self.component_names = frozenset(entry[1] for entry in self.entries)
+        self.data_types = frozenset(entry[2] for entry in self.entries)
+        self._configs = frozenset(self.configs)
+
+        self._names_by_component = {}
+        self._data_types_by_name = {}
+        for component, component_name, data_type in self.entries:
+            names = self._names_by_component.setdefault(component, [])
+            if component_name not in names:
+                names.append(component_name)
+            self._data_types_by_name.setdefault((component, component_name), []).append(data_type)
+
+    def __len__(self):
+        return len(self.configs)
+
+    def __contains__(self, config):
+        return config in self._configs
+
+    def has_component(self, component):
+        """Returns True if `component` appears in at least one configuration."""
+        return component in self.components
+
+    def has_component_name(self, component_name):
+        """Returns True if `component_name` appears in at least one configuration."""
+        return component_name in self.component_names
+
+    def has_data_type(self, data_type):
+        """Returns True if `data_type` appears in at least one configuration."""
+        return data_type in self.data_types
+
+    def has_config(self, component, component_name, data_type):
+        """Returns True if the configuration `<component>-<component_name>-<data_type>` exists."""
+        return f"{component}-{component_name}-{data_type}" in self._configs
+
+    def component_names_of(self, component):
+        """
+        Returns the component names available for a component, in configuration order.
+
+        Args:
+            component (str): The component, e.g. "qubit".
+
+        Returns:
+            list: A list of component names.
+        """
+        return list(self._names_by_component.get(component, []))
+
+    def data_types_of(self, component, component_name):
+        """
+        Returns the data types available for a component and component name.
+
+        Args:
+            component (str): The component, e.g. "qubit".
+            component_name (str): The component name, e.g. "TransmonCross".
+
+        Returns:
+            list: A list of data types.
+        """
+        return list(self._data_types_by_name.get((component, component_name), []))
@@ -0,0 +1,129 @@
+"""
+Column statistics and categorical posting lists of a system DataFrame, for bounds checks and filtering.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.join import FactorizedJoin
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class FrameStats:
+    """
+    Statistics of the columns of a DataFrame or a FactorizedJoin, computed once per column.
+
+    Numeric columns get their minimum, maximum and quantiles. Categorical columns (e.g. ``resonator_type``) get a
+    posting list: the positions of the rows that hold each value. Once computed, a bounds check is O(1) and the rows
+    that match categorical values are found in O(matching rows), without filtering or copying the frame.
+
+    Methods:
+        precompute(names): Compute the statistics of some columns now.
+        summary(name): Get the minimum, maximum and quantiles of a numeric column.
+        bounds(name): Get the minimum and maximum of a numeric column.
+        positions(name, value): Get the positions of the rows where a column holds a value.
+        matching(params): Get the positions of the rows that match several (column, value) pairs.
+    """
+
+    def __init__(self, df):
+        """
+        Constructor for the FrameStats class.
+
+        Args:
+            df (pandas.DataFrame or FactorizedJoin): The frame. It is not copied, so the statistics describe it as long as it is not modified.
+        """
+        self.df = df
+        self._summaries = {}
+        self._postings = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def _column(self, name):
+        return self.df.column(name) if isinstance(self.df, FactorizedJoin) else self.df[name].to_numpy()
+
+    def precompute(self, names):
+        """
+        Computes the statistics of some columns now: the summary of the numeric columns and the posting lists of the others.
+
+        Args:
+            names (list): The column names.
+        """
+        for name in names:
+            values = self._column(name)
+            if np.issubdtype(values.dtype, np.number) or np.issubdtype(values.dtype, np.bool_):
+                self.summary(name)
+            else:
+                self._posting_list(name)
+
+    def summary(self, name):
+        """
+        Returns the minimum, maximum and quantiles of a numeric column, ignoring missing values.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            dict: "min", "max" and "quantiles", a dictionary from each of `QUANTILES` to its value. NaN if the column has no values.
+        """
+        if name not in self._summaries:
+            values = self._column(name).astype(np.float64)
+            values = values[~np.isnan(values)]
+            if len(values):
+                quantiles = np.quantile(values, QUANTILES)
+                self._summaries[name] = {"min": values.min(), "max": values.max(), "quantiles": dict(zip(QUANTILES, quantiles))}
+            else:
+                self._summaries[name] = {"min": np.nan, "max": np.nan, "quantiles": dict.fromkeys(QUANTILES, np.nan)}
+        return self._summaries[name]
+
+    def bounds(self, name):
+        """
+        Returns the minimum and maximum of a numeric column.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            tuple: (minimum, maximum).
+        """
+        summary = self.summary(name)
+        return summary["min"], summary["max"]
+
+    def _posting_list(self, name):
+        if name not in self._postings:
+            codes, uniques = pd.factorize(self._column(name))
+            order = np.argsort(codes, kind="stable")
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            # the rows without a value (code -1) come first in `order`
+            ends = np.cumsum(counts) + np.count_nonzero(codes < 0)
+            self._postings[name] = {value: order[end - count:end] for value, count, end in zip(uniques, counts, ends)}
+        return self._postings[name]
+
+    def positions(self, name, value):
+        """
+        Returns the positions of the rows where a column holds a value.
+
+        Args:
+            name (str): The column name.
+            value: The value.
+
+        Returns:
+            numpy.ndarray: The positions, in increasing order.
+        """
+        return self._posting_list(name).get(value, np.empty(0, dtype=np.intp))
+
+    def matching(self, params):
+        """
+        Returns the positions of the rows that hold every (column, value) pair of `params`.
+
+        Args:
+            params (list): (column name, value) pairs, e.g. [("resonator_type", "quarter")].
+
+        Returns:
+            numpy.ndarray: The positions, in increasing order. Every row if `params` is empty.
+        """
+        positions = None
+        for name, value in params:
+            found = self.positions(name, value)
+            positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+        return np.arange(len(self)) if positions is None else positions
@@ -0,0 +1,672 @@
+"""
+Persistent, revision-keyed on-disk store for the SQuADDS HuggingFace dataset.
+
+The store keeps the list of configurations and one parquet file per configuration
+under ``~/.cache/squadds`` (or ``$SQUADDS_CACHE_DIR``). Everything is keyed by the
+commit hash of the HuggingFace dataset repository, so a new Python process only
+needs a single metadata request to know whether its local copy is still current,
+and only the configurations whose data files changed upstream are downloaded again.
+"""
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import requests
+from datasets import (get_dataset_config_names, load_dataset,
+                      load_dataset_builder)
+from huggingface_hub import HfApi, HfFileSystem
+
+from squadds.core.utils import flattened_field_paths, read_flattened_parquet
+
+
+DOWNLOAD_CHUNK_SIZE = 1024 ** 2
+
+
+def get_squadds_cache_dir():
+    """
+    Returns the root directory used by SQuADDS to persist downloaded data.
+
+    The location can be overridden with the ``SQUADDS_CACHE_DIR`` environment variable.
+
+    Returns:
+        str: The path to the SQuADDS cache directory.
+    """
+    cache_dir = os.environ.get("SQUADDS_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    if platform.system() == "Windows":
+        return os.path.join(os.path.expanduser("~"), "AppData", "Local", "squadds")
+    return os.path.join(os.path.expanduser("~"), ".cache", "squadds")
+
+def is_offline():
+    """
+    Checks whether the user asked SQuADDS (or HuggingFace) to work without network access.
+
+    Returns:
+        bool: True if any of ``SQUADDS_OFFLINE``, ``HF_DATASETS_OFFLINE`` or ``HF_HUB_OFFLINE`` is set to 1.
+    """
+    return any(os.environ.get(var, "0") == "1" for var in ["SQUADDS_OFFLINE", "HF_DATASETS_OFFLINE", "HF_HUB_OFFLINE"])
+
+def _sha256_of(path, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+def _write_atomic(table, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".parquet")
+    os.close(fd)
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+def _to_json(value):
+    # numpy arrays and scalars that pandas leaves inside dictionaries
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def download_file(url, path, sha256=None, chunk_size=DOWNLOAD_CHUNK_SIZE, timeout=60):
+    """
+    Streams a file to disk, resuming an interrupted download and verifying its checksum.
+
+    The body is written chunk by chunk to ``<path>.part``, so it is never held in memory.
+    If a partial file is left over from a previous attempt, only the missing bytes are
+    requested with an HTTP ``Range`` header. The file is moved to `path` once it is complete
+    and its SHA-256 matches.
+
+    Args:
+        url (str): The URL of the file.
+        path (str): The destination path.
+        sha256 (str, optional): The expected SHA-256 hex digest. Not verified if None.
+        chunk_size (int, optional): The number of bytes written at a time. Defaults to 1 MiB.
+        timeout (float, optional): The connection/read timeout in seconds. Defaults to 60.
+
+    Returns:
+        str: The SHA-256 hex digest of the downloaded file.
+
+    Raises:
+        IOError: If the downloaded file does not match `sha256`.
+        requests.HTTPError: If the server answers with an error status.
+    """
+    part_path = f"{path}.part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if offset and response.status_code == 416:
+            # the partial file is already complete
+            digest = _sha256_of(part_path)
+        else:
+            response.raise_for_status()
+            if offset and response.status_code == 206:
+                digest = _sha256_of(part_path)
+                mode = "ab"
+            else:
+                # the server ignored the range request, start over
+                digest = hashlib.sha256()
+                mode = "wb"
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+
+    checksum = digest.hexdigest()
+    if sha256 is not None and checksum != sha256:
+        os.remove(part_path)
+        raise IOError(f"Checksum mismatch for {url}: expected {sha256}, got {checksum}.")
+    os.replace(part_path, path)
+    return checksum
+
+
+CONTRIBUTOR_FIELDS = ["uploader", "PI", "group", "institution"]
+
+
+def summarize_contributors(contributors):
+    """
+    Returns the distinct contributors of a `contributor` column, in order of first appearance.
+
+    Args:
+        contributors (pyarrow.Array or pyarrow.ChunkedArray): The struct column of contributor information.
+
+    Returns:
+        list: One dictionary per distinct (uploader, PI, group, institution), with the number of its rows under "rows".
+    """
+    if isinstance(contributors, pa.ChunkedArray):
+        contributors = contributors.combine_chunks()
+    fields = [field.name for field in contributors.type] if pa.types.is_struct(contributors.type) else []
+    df = pd.DataFrame({
+        key: pc.struct_field(contributors, [fields.index(key)]).to_pandas() if key in fields else pd.Series([None] * len(contributors), dtype=object)
+        for key in CONTRIBUTOR_FIELDS
+    })
+    counts = df.groupby(CONTRIBUTOR_FIELDS, sort=False, dropna=False).size()
+    return [{**dict(zip(CONTRIBUTOR_FIELDS, [None if pd.isna(value) else value for value in key])), "rows": int(rows)}
+            for key, rows in counts.items()]
+
+
+class DatasetStore:
+    """
+    A versioned on-disk copy of a HuggingFace dataset repository.
+
+    Methods:
+        resolve_revision(refresh): Get the commit hash the store is pinned to.
+        config_names(): Get the configuration names available at the pinned revision.
+        load_table(config): Get a configuration as a memory-mapped ``pyarrow.Table``.
+        scan_table(config, columns, filters): Get the flattened columns and rows of a configuration that match filters.
+        column_names(config): Get the flattened column names of a configuration.
+        ensure_table(config): Make sure the local copy of a configuration is current.
+        fetch_file(file_name): Get the local path of a file of the repository, downloading it if needed.
+        config_fingerprint(config): Get the content fingerprint of a configuration.
+        provenance(config): Get the distinct contributors and row count of a configuration from the persisted index.
+        load_frame(name, key): Get a DataFrame materialized under `name` if it was built from `key`.
+        save_frame(name, key, df): Materialize a DataFrame under `name`, replacing older versions.
+        load_index(name, key): Get a search index stored under `name` if it was built from `key`.
+        save_index(name, key, index): Store a search index under `name`, replacing older versions.
+        table_path(config): Get the local parquet path of a configuration.
+        clear(): Delete everything stored for the repository.
+    """
+
+    manifest_name = "manifest.json"
+
+    def __init__(self, repo_name, cache_dir=None, endpoint=None):
+        """
+        Constructor for the DatasetStore class.
+
+        Args:
+            repo_name (str): The HuggingFace dataset repository, e.g. "SQuADDS/SQuADDS_DB".
+            cache_dir (str, optional): The root cache directory. Defaults to `get_squadds_cache_dir()`.
+            endpoint (str, optional): The HuggingFace Hub URL. Defaults to ``$HF_ENDPOINT`` or "https://huggingface.co".
+        """
+        self.repo_name = repo_name
+        self.endpoint = (endpoint or os.environ.get("HF_ENDPOINT", "https://huggingface.co")).rstrip("/")
+        self.root = os.path.join(cache_dir or get_squadds_cache_dir(), repo_name.replace("/", "___"))
+        self.config_dir = os.path.join(self.root, "configs")
+        self.file_dir = os.path.join(self.root, "files")
+        self.frame_dir = os.path.join(self.root, "frames")
+        os.makedirs(self.config_dir, exist_ok=True)
+        os.makedirs(self.file_dir, exist_ok=True)
+        os.makedirs(self.frame_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.root, self.manifest_name)
+        self.manifest = self._read_manifest()
+        self._revision = None
+        self._file_hashes = None
+        self._lfs_hashes = {}
+        # the manifest is updated from the prefetch threads as well
+        self._lock = threading.RLock()
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"revision": None, "configs": None, "entries": {}, "files": {}, "frames": {}, "provenance": {}, "indexes": {}}
+        try:
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {"revision": None, "configs": None, "entries": {}, "files": {}, "frames": {}, "provenance": {}, "indexes": {}}
+        manifest.setdefault("entries", {})
+        manifest.setdefault("files", {})
+        manifest.setdefault("frames", {})
+        manifest.setdefault("provenance", {})
+        manifest.setdefault("indexes", {})
+        return manifest
+
+    def _write_manifest(self):
+        # write to a temporary file first so that a concurrent reader never sees a partial manifest
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".json")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+
+    def resolve_revision(self, refresh=False):
+        """
+        Resolves the commit hash of the dataset repository.
+
+        The Hub is queried once per store (or again with ``refresh=True``). If the Hub cannot
+        be reached, or offline mode is enabled, the revision recorded in the local manifest is used.
+
+        Args:
+            refresh (bool): Whether to query the Hub again. Defaults to False.
+
+        Returns:
+            str: The commit hash the store is pinned to.
+
+        Raises:
+            RuntimeError: If the Hub cannot be reached and nothing has been stored locally yet.
+        """
+        if self._revision is not None and not refresh:
+            return self._revision
+
+        if not is_offline():
+            try:
+                info = HfApi().dataset_info(self.repo_name, files_metadata=True)
+                self._file_hashes = {
+                    sibling.rfilename: (sibling.lfs.sha256 if sibling.lfs else sibling.blob_id)
+                    for sibling in info.siblings
+                }
+                self._lfs_hashes = {sibling.rfilename: sibling.lfs.sha256 for sibling in info.siblings if sibling.lfs}
+                self._revision = info.sha
+                return self._revision
+            except Exception as e:
+                print(f"Could not reach the HuggingFace Hub ({e}). Using the local SQuADDS store.")
+
+        self._revision = self.manifest.get("revision")
+        if self._revision is None:
+            raise RuntimeError(f"The HuggingFace Hub is unreachable and no local copy of {self.repo_name} exists in {self.root}.")
+        return self._revision
+
+    def config_names(self):
+        """
+        Returns the configuration names of the dataset at the pinned revision.
+
+        Returns:
+            list: A list of configuration names.
+        """
+        revision = self.resolve_revision()
+        if self.manifest.get("revision") == revision and self.manifest.get("configs") is not None:
+            return list(self.manifest["configs"])
+
+        configs = get_dataset_config_names(self.repo_name, revision=revision)
+        with self._lock:
+            self.manifest["revision"] = revision
+            self.manifest["configs"] = configs
+            self._write_manifest()
+        return list(configs)
+
+    def table_path(self, config):
+        """
+        Returns the local parquet path of a configuration.
+
+        Args:
+            config (str): The configuration name.
+
+        Returns:
+            str: The path to the parquet file.
+        """
+        return os.path.join(self.config_dir, f"{config}.parquet")
+
+    def _config_fingerprint(self, config, revision):
+        """
+        Hashes the data files backing a configuration so that unrelated commits do not invalidate it.
+        Falls back to the repository revision if the data files cannot be resolved.
+        """
+        if self._file_hashes is None:
+            return revision
+        try:
+            files = self._data_files(config, revision)
+        except Exception:
+            return revision
+        digest = hashlib.sha256()
+        for file in files:
+            digest.update(file.encode())
+            digest.update(str(self._file_hashes.get(file, revision)).encode())
+        return digest.hexdigest()
+
+    def _data_files(self, config, revision):
+        """Returns the paths of the data files behind a configuration in the repository, e.g. "{config}/train.parquet"."""
+        builder = load_dataset_builder(self.repo_name, config, revision=revision)
+        return sorted(str(f).split(f"@{revision}/", 1)[-1] for split in builder.config.data_files.values() for f in split)
+
+    def _is_current(self, config, revision):
+        """
+        Checks whether the stored copy of a configuration matches its data files at `revision`.
+
+        Returns:
+            tuple: (is_current, fingerprint) where fingerprint is the upstream fingerprint if it was computed.
+        """
+        entry = self.manifest["entries"].get(config)
+        if entry is None or not os.path.exists(self.table_path(config)):
+            return False, None
+        if entry["revision"] == revision or self._file_hashes is None:
+            return True, entry["fingerprint"]
+        fingerprint = self._config_fingerprint(config, revision)
+        return fingerprint == entry["fingerprint"], fingerprint
+
+    def ensure_table(self, config):
+        """
+        Makes sure the local copy of a configuration is current and returns its path.
+
+        The configuration is downloaded only if it is missing locally or if its data files
+        changed upstream since it was stored.
+
+        Args:
+            config (str): The configuration name.
+
+        Returns:
+            str: The path to the parquet file.
+        """
+        revision = self.resolve_revision()
+        entry = self.manifest["entries"].get(config)
+        if entry is not None and entry["revision"] == revision and os.path.exists(self.table_path(config)):
+            return self.table_path(config)
+
+        is_current, fingerprint = self._is_current(config, revision)
+        if not is_current:
+            fingerprint = fingerprint or self._config_fingerprint(config, revision)
+            self._download_config(config, revision)
+
+        with self._lock:
+            self.manifest["entries"][config] = {"revision": revision, "fingerprint": fingerprint}
+            self._write_manifest()
+        return self.table_path(config)
+
+    def load_table(self, config):
+        """
+        Returns a configuration as a memory-mapped ``pyarrow.Table``.
+
+        Args:
+            config (str): The configuration name.
+
+        Returns:
+            pyarrow.Table: The ``train`` split of the configuration.
+        """
+        return pq.read_table(self.ensure_table(config), memory_map=True)
+
+    def scan_table(self, config, columns=None, filters=None):
+        """
+        Returns the flattened columns and rows of a configuration that match `filters`.
+
+        The projection and the filters are pushed down into the parquet scan, so the
+        unused columns are never decoded. See `read_flattened_parquet`.
+
+        Args:
+            config (str): The configuration name.
+            columns (list, optional): The flattened column names to read. Defaults to all columns.
+            filters (dict, optional): The conditions rows must satisfy, e.g. {"coupler_type": "CLT"}.
+
+        Returns:
+            pyarrow.Table: The flattened table.
+        """
+        return read_flattened_parquet(self.ensure_table(config), columns=columns, filters=filters)
+
+    def column_names(self, config):
+        """
+        Returns the flattened column names of a configuration, read from the parquet footer.
+
+        Args:
+            config (str): The configuration name.
+
+        Returns:
+            list: The column names.
+        """
+        return list(flattened_field_paths(pq.read_schema(self.ensure_table(config))))
+
+    def _download_config(self, config, revision):
+        # download into a throwaway HF cache so the data is not stored twice on disk
+        tmp_cache = tempfile.mkdtemp(dir=self.root)
+        try:
+            dataset = load_dataset(self.repo_name, config, revision=revision, cache_dir=tmp_cache)["train"]
+            fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, suffix=".parquet")
+            os.close(fd)
+            table = dataset.data.table
+            # parquet cannot store structs without fields (e.g. empty `notes`), and they hold no data
+            empty = [field.name for field in table.schema if pa.types.is_struct(field.type) and field.type.num_fields == 0]
+            pq.write_table(table.drop(empty), tmp_path)
+            os.replace(tmp_path, self.table_path(config))
+            del dataset
+        finally:
+            shutil.rmtree(tmp_cache, ignore_errors=True)
+
+    def fetch_file(self, file_name):
+        """
+        Returns the local path of a file of the repository, downloading it if needed.
+
+        The file is streamed into the store (see `download_file`) and verified against the
+        SHA-256 published by the Hub for LFS files. It is downloaded again only if it changed upstream.
+
+        Args:
+            file_name (str): The path of the file in the repository, e.g. "half-wave-cavity_df.parquet".
+
+        Returns:
+            str: The path to the local copy of the file.
+        """
+        revision = self.resolve_revision()
+        path = os.path.join(self.file_dir, file_name)
+        expected = self._lfs_hashes.get(file_name)
+        entry = self.manifest["files"].get(file_name)
+        if entry is not None and os.path.exists(path):
+            if entry["revision"] == revision or self._file_hashes is None or entry["sha256"] == expected:
+                return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        url = f"{self.endpoint}/datasets/{self.repo_name}/resolve/{revision}/{file_name}"
+        checksum = download_file(url, path, sha256=expected)
+        with self._lock:
+            self.manifest["files"][file_name] = {"revision": revision, "sha256": checksum}
+            self._write_manifest()
+        return path
+
+    def config_fingerprint(self, config):
+        """
+        Returns the fingerprint of the data files behind a configuration, storing the configuration if needed.
+
+        Args:
+            config (str): The configuration name.
+
+        Returns:
+            str: The fingerprint. It changes only when the configuration changes upstream.
+        """
+        self.ensure_table(config)
+        return self.manifest["entries"][config]["fingerprint"]
+
+    def provenance(self, config):
+        """
+        Returns the provenance of a configuration: its distinct contributors, its row count and the revision it was read at.
+
+        The provenance index is persisted in the manifest next to the fingerprint of each configuration.
+        An entry is read from the `contributor` column only: from the stored configuration if it is current,
+        and otherwise from the data files on the Hub with range requests, without downloading the configuration
+        (see `_read_remote_column`). It is read again only when the configuration changes upstream, so
+        repeated lookups do not touch the data.
+
+        Args:
+            config (str): The configuration name.
+
+        Returns:
+            dict: "revision", "fingerprint", "rows" and "contributors", a list of the distinct
+            (uploader, PI, group, institution) dictionaries, each with the number of rows it contributed.
+        """
+        revision = self.resolve_revision()
+        entry = self.manifest["provenance"].get(config)
+        if entry is not None and (entry["revision"] == revision or self._file_hashes is None):
+            return entry
+
+        is_current, fingerprint = self._is_current(config, revision)
+        fingerprint = fingerprint or self._config_fingerprint(config, revision)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            remote = None if is_current else self._read_remote_column(config, revision, "contributor")
+            if remote is None:
+                path = self.ensure_table(config)
+                fingerprint = self.manifest["entries"][config]["fingerprint"]
+                remote = pq.read_table(path, columns=["contributor"]).column("contributor"), pq.read_metadata(path).num_rows
+            contributors, rows = remote
+            entry = {"fingerprint": fingerprint, "rows": rows, "contributors": summarize_contributors(contributors)}
+        entry = {**entry, "revision": revision}
+        with self._lock:
+            self.manifest["provenance"][config] = entry
+            self._write_manifest()
+        return entry
+
+    def _read_remote_column(self, config, revision, column):
+        """
+        Reads one column of a configuration from its parquet data files on the Hub.
+
+        Only the footers and the pages of the column are fetched, with range requests through `HfFileSystem`.
+
+        Returns:
+            tuple: The column (pyarrow.ChunkedArray) and the number of rows, or None if the data files are not
+            parquet files or cannot be read.
+        """
+        try:
+            files = self._data_files(config, revision)
+            if not files or not all(file.endswith(".parquet") for file in files):
+                return None
+            fs = HfFileSystem()
+            chunks, rows = [], 0
+            for file in files:
+                with fs.open(f"datasets/{self.repo_name}@{revision}/{file}", "rb") as f:
+                    parquet = pq.ParquetFile(f)
+                    chunks.extend(parquet.read(columns=[column]).column(column).chunks)
+                    rows += parquet.metadata.num_rows
+            return pa.chunked_array(chunks), rows
+        except Exception as e:
+            print(f"Could not read the `{column}` column of {config} from the Hub ({e}). Downloading it.")
+            return None
+
+    def frame_path(self, key):
+        """
+        Returns the local parquet path of a materialized DataFrame.
+
+        Args:
+            key (str): The content key of the DataFrame.
+
+        Returns:
+            str: The path to the parquet file.
+        """
+        return os.path.join(self.frame_dir, f"{key}.parquet")
+
+    def load_frame(self, name, key):
+        """
+        Returns the DataFrame materialized under `name`, if it was built from the inputs hashed in `key`.
+
+        Args:
+            name (str): The name of the materialized DataFrame, e.g. the configurations it was built from.
+            key (str): The content key of the inputs, see `save_frame`.
+
+        Returns:
+            pandas.DataFrame: The DataFrame read from the memory-mapped parquet file, or None if it is missing or stale.
+        """
+        path = self.frame_path(key)
+        if self.manifest["frames"].get(name) != key or not os.path.exists(path):
+            return None
+        table = pq.read_table(path, memory_map=True)
+        df = table.to_pandas()
+
+        dict_columns = json.loads((table.schema.metadata or {}).get(b"squadds_dict_columns", b"[]"))
+        if dict_columns:
+            documents = pq.read_table(f"{path[:-len('.parquet')]}.dicts.parquet", memory_map=True)
+            for column in dict_columns:
+                uniques = [json.loads(doc) for doc in documents.column(column).drop_null().to_pylist()]
+                # rows that shared a dictionary before saving share it again
+                df[column] = pd.Series(uniques + [None], dtype=object).values.take(df[column].values)
+        return df
+
+    def save_frame(self, name, key, df):
+        """
+        Materializes a DataFrame under `name`. The file previously stored under `name`, if any, is deleted.
+
+        Columns of dictionaries are stored as JSON, once per distinct dictionary object, so that
+        their key order is kept and dictionaries shared by many rows (e.g. after a merge) are decoded once.
+
+        Args:
+            name (str): The name of the materialized DataFrame.
+            key (str): The content key of the inputs the DataFrame was built from.
+            df (pandas.DataFrame): The DataFrame.
+        """
+        columns = {}
+        documents = {}
+        for column in df.columns:
+            values = df[column]
+            first = values.dropna().iloc[0] if values.dtype == object and values.notna().any() else None
+            if not isinstance(first, dict):
+                columns[column] = values
+                continue
+            codes, uniques = pd.factorize(values.map(lambda x: None if x is None else id(x)))
+            _, positions = np.unique(codes[codes >= 0], return_index=True)
+            documents[column] = [json.dumps(values.iat[i], default=_to_json) for i in np.flatnonzero(codes >= 0)[positions]]
+            codes[codes < 0] = len(uniques)
+            columns[column] = codes.astype(np.int32)
+
+        encoded = pd.DataFrame(columns, index=df.index)
+        table = pa.Table.from_pandas(encoded)
+        table = table.replace_schema_metadata({**table.schema.metadata, b"squadds_dict_columns": json.dumps(list(documents)).encode()})
+
+        base = self.frame_path(key)[:-len(".parquet")]
+        if documents:
+            longest = max(len(docs) for docs in documents.values())
+            docs_table = pa.table({column: docs + [None] * (longest - len(docs)) for column, docs in documents.items()})
+            _write_atomic(docs_table, f"{base}.dicts.parquet")
+        _write_atomic(table, self.frame_path(key))
+
+        with self._lock:
+            previous = self.manifest["frames"].get(name)
+            self.manifest["frames"][name] = key
+            self._write_manifest()
+        if previous is not None and previous != key and previous not in self.manifest["frames"].values():
+            for path in [self.frame_path(previous), f"{self.frame_path(previous)[:-len('.parquet')]}.dicts.parquet"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def index_path(self, key):
+        """
+        Returns the local path of a stored search index. Indexes are kept next to the materialized DataFrames.
+
+        Args:
+            key (str): The content key of the index.
+
+        Returns:
+            str: The path to the ``.npz`` file.
+        """
+        return os.path.join(self.frame_dir, f"{key}.index.npz")
+
+    def load_index(self, name, key):
+        """
+        Returns the arrays of the search index stored under `name`, if it was built from the data hashed in `key`.
+
+        The arrays are read without unpickling anything, so a shared cache directory cannot run code on load.
+
+        Args:
+            name (str): The name of the index, e.g. the system and the columns it covers.
+            key (str): The content key of the indexed data, see `save_index`.
+
+        Returns:
+            dict: The arrays of the index by name, or None if it is missing or stale.
+        """
+        path = self.index_path(key)
+        if self.manifest["indexes"].get(name) != key or not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+
+    def save_index(self, name, key, arrays):
+        """
+        Stores the arrays of a search index under `name`. The index previously stored under `name`, if any, is deleted.
+
+        Args:
+            name (str): The name of the index.
+            key (str): The content key of the indexed data.
+            arrays (dict): The numeric numpy arrays of the index by name, e.g. `DesignIndex.arrays()`.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.frame_dir, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.index_path(key))
+
+        with self._lock:
+            previous = self.manifest["indexes"].get(name)
+            self.manifest["indexes"][name] = key
+            self._write_manifest()
+        if previous is not None and previous != key and previous not in self.manifest["indexes"].values():
+            if os.path.exists(self.index_path(previous)):
+                os.remove(self.index_path(previous))
+
+    def clear(self):
+        """
+        Deletes every file stored for the repository.
+        """
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.config_dir, exist_ok=True)
+        os.makedirs(self.file_dir, exist_ok=True)
+        os.makedirs(self.frame_dir, exist_ok=True)
+        self.manifest = {"revision": None, "configs": None, "entries": {}, "files": {}, "frames": {}, "provenance": {}, "indexes": {}}
+        self._revision = None
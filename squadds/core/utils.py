@@ -1,13 +1,18 @@
 import getpass
+import json
 import os
 import platform
 import re
 import shutil
+import threading
 import urllib.parse
 import webbrowser
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 import requests
 from huggingface_hub import HfApi, HfFolder
 from squadds.core.globals import ENV_FILE_PATH
@@ -29,15 +34,15 @@ def float_to_string(value, units):
 
 def string_to_float(string):
     """
-    Converts a string representation of a number to a float.
+    Converts a string representation of a number with units, e.g. "30um", to a float in canonical units.
 
     Args:
-        string (str): The string representation of the number.
+        string (str or array-like): The string representation of the number, or a column of them.
 
     Returns:
-        float: The converted float value.
+        float or numpy.ndarray: The converted float value(s), see `parse_unit_strings`.
     """
-    return float(string[:-2])
+    return parse_unit_strings(string)
 
 def view_contributors_from_rst(rst_url):
     """
@@ -425,11 +430,495 @@ def create_unified_design_options(row):
 
     return device_dict
 
+def materialize_design_options(df, shared=False):
+    """
+    Returns a copy of a merged qubit-cavity DataFrame with the unified `design_options` column, see `unified_design_options`.
+
+    Args:
+        df (pandas.DataFrame): A merged qubit-cavity DataFrame, or a subset of its rows.
+        shared (bool, optional): Whether rows may share converted dictionaries, see `unified_design_options`. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: A copy of `df` with the `design_options` column.
+    """
+    df = df.copy()
+    df["design_options"] = unified_design_options(df, shared=shared)
+    return df
+
+def unified_design_options(df, shared=False):
+    """
+    Builds the unified `design_options` dictionaries (see `create_unified_design_options`) of the rows of a merged
+    qubit-cavity DataFrame from its per-component `design_options_qubit` and `design_options_cavity_claw` columns.
+
+    Args:
+        df (pandas.DataFrame): A merged qubit-cavity DataFrame, or a subset of its rows.
+        shared (bool, optional): Whether to convert each distinct qubit and cavity dictionary once and let the rows
+            share the converted `qubit_options` and `cavity_claw_options`, as they share their per-component
+            dictionaries. This is what makes the column cheap to build for a whole system DataFrame.
+            Defaults to False, which gives every row its own dictionaries.
+
+    Returns:
+        list: One dictionary per row.
+    """
+    qubits = df["design_options_qubit"].to_numpy()
+    cavities = df["design_options_cavity_claw"].to_numpy()
+    coupler_types = df["coupler_type"].to_numpy()
+    if not shared or len(df) == 0:
+        return [create_unified_design_options({"design_options_qubit": qubit, "design_options_cavity_claw": cavity, "coupler_type": coupler_type})
+                for qubit, cavity, coupler_type in zip(qubits, cavities, coupler_types)]
+
+    qubit_codes, qubit_first = identity_codes(qubits)
+    qubit_options = [_unified_qubit_options(qubits[i]) for i in qubit_first]
+    # the cavity options also hold the coupler type of the row
+    cavity_codes, _ = identity_codes(cavities)
+    coupler_codes, _ = pd.factorize(coupler_types, use_na_sentinel=False)
+    _, cavity_first, cavity_codes = np.unique(cavity_codes * (coupler_codes.max() + 1) + coupler_codes, return_index=True, return_inverse=True)
+    cavity_options = [_unified_cavity_options(cavities[i], coupler_types[i]) for i in cavity_first]
+
+    return [{"cavity_claw_options": cavity_options[cavity], "qubit_options": qubit_options[qubit]}
+            for qubit, cavity in zip(qubit_codes, cavity_codes.reshape(-1))]
+
+def _unified_qubit_options(qubit_options):
+    qubit_dict = convert_numpy(qubit_options)
+    # setting the `claw_cpw_*` params to zero
+    qubit_dict['connection_pads']['readout']['claw_cpw_width'] = "0um"
+    qubit_dict['connection_pads']['readout']['claw_cpw_length'] = "0um"
+    return qubit_dict
+
+def _unified_cavity_options(cavity_options, coupler_type):
+    cavity_dict = convert_numpy(cavity_options)
+    return {
+        "coupler_type": coupler_type,
+        "coupler_options": cavity_dict.get("cplr_opts", {}),
+        "cpw_opts": {
+            "left_options": cavity_dict.get("cpw_opts", {})
+        }
+    }
+
+def extract_unified_design_fields(df, paths):
+    """
+    Extracts fields of the unified `design_options` dictionaries (see `create_unified_design_options`) in one pass.
+    The fields are read from the per-component columns the unified dictionaries are built from when the
+    DataFrame has them, and from the unified `design_options` column otherwise, through the `GeometryView`
+    of each column.
+
+    Args:
+        df (pandas.DataFrame): A merged qubit-cavity DataFrame.
+        paths (dict): A dictionary mapping an output name to a path in the unified dictionary,
+            e.g. {"cross_length": ("qubit_options", "cross_length")}.
+
+    Returns:
+        dict: A dictionary mapping each output name to a pandas.Series.
+    """
+    # geometry.py imports this module
+    from squadds.core.geometry import GeometryView
+
+    # the per-component dictionaries are shared by many rows, so they are read rather than the unified ones
+    if not {"design_options_qubit", "design_options_cavity_claw"}.issubset(df.columns):
+        view = GeometryView.from_design_options(df["design_options"])
+        return {name: view.column(path, index=df.index) for name, path in paths.items()}
+
+    qubit_paths, cavity_paths, fields = {}, {}, {}
+    for name, path in paths.items():
+        if path[0] == "qubit_options":
+            if path[1:] in [("connection_pads", "readout", "claw_cpw_width"), ("connection_pads", "readout", "claw_cpw_length")]:
+                fields[name] = pd.Series("0um", index=df.index, dtype=object)
+            else:
+                qubit_paths[name] = path[1:]
+        elif path[:2] == ("cavity_claw_options", "coupler_type"):
+            fields[name] = df["coupler_type"]
+        elif path[:2] == ("cavity_claw_options", "coupler_options"):
+            cavity_paths[name] = ("cplr_opts",) + path[2:]
+        elif path[:3] == ("cavity_claw_options", "cpw_opts", "left_options"):
+            cavity_paths[name] = ("cpw_opts",) + path[3:]
+        else:
+            raise KeyError(f"Unknown design option path {path}.")
+
+    for column, component_paths in [("design_options_qubit", qubit_paths), ("design_options_cavity_claw", cavity_paths)]:
+        if component_paths:
+            view = GeometryView.from_design_options(df[column])
+            fields.update({name: view.column(path, index=df.index) for name, path in component_paths.items()})
+    return {name: fields[name] for name in paths}
+
+
+def flatten_table_second_level(table):
+    """
+    Flattens an Arrow table by promoting the fields of its struct columns to top-level columns.
+
+    This is the Arrow-native counterpart of `flatten_df_second_level`: the fields are extracted
+    with `pyarrow.compute.struct_field`, which reuses the child buffers instead of visiting every row.
+    Columns are named and ordered exactly as `flatten_df_second_level` would name and order them.
+    The names of the `sim_results` fields are recorded in the schema metadata under `sim_results_keys`.
+
+    Args:
+        table (pyarrow.Table): The table to be flattened.
+
+    Returns:
+        pyarrow.Table: A new table with the flattened data.
+    """
+    flattened_data = {}
+    sim_results_keys = []
+
+    for name, column in zip(table.column_names, table.columns):
+        if pa.types.is_struct(column.type):
+            field_names = [field.name for field in column.type]
+            if name == "sim_results":
+                sim_results_keys = field_names
+            for i, key in enumerate(field_names):
+                flattened_data[key] = pc.struct_field(column, [i])
+        else:
+            flattened_data[name] = column
+
+    new_table = pa.table(flattened_data)
+    return new_table.replace_schema_metadata({"sim_results_keys": json.dumps(sim_results_keys)})
+
+def get_table_sim_results_keys(table):
+    """
+    Get the keys of the 'sim_results' column recorded by `flatten_table_second_level`.
+
+    Args:
+        table (pyarrow.Table): A table returned by `flatten_table_second_level`.
+
+    Returns:
+        list: A list of the 'sim_results' keys.
+    """
+    metadata = table.schema.metadata or {}
+    return json.loads(metadata.get(b"sim_results_keys", b"[]"))
+
+def flattened_field_paths(schema):
+    """
+    Maps the column names produced by `flatten_table_second_level` to their field paths in the nested schema.
+
+    Args:
+        schema (pyarrow.Schema): The schema of the nested table.
+
+    Returns:
+        dict: A dictionary mapping each flattened column name to a tuple of field names, e.g. {"kappa": ("sim_results", "kappa")}.
+    """
+    paths = {}
+    for field in schema:
+        if pa.types.is_struct(field.type):
+            for child in field.type:
+                paths[child.name] = (field.name, child.name)
+        else:
+            paths[field.name] = (field.name,)
+    return paths
+
+def build_filter_expression(filters, paths):
+    """
+    Builds an Arrow dataset expression from a dictionary of conditions.
+
+    A condition value can be a scalar (equality), a tuple ``(low, high)`` (inclusive range, either bound
+    may be None) or a list/set (membership).
+
+    Args:
+        filters (dict): A dictionary containing column-condition pairs.
+        paths (dict): The field path of each column, as returned by `flattened_field_paths`.
+
+    Returns:
+        pyarrow.compute.Expression: The conjunction of all conditions, or None if there are none.
+
+    Raises:
+        KeyError: If a condition refers to an unknown column.
+    """
+    expression = None
+    for column, value in filters.items():
+        if column not in paths:
+            raise KeyError(f"Unknown column `{column}`.")
+        field = pc.field(*paths[column])
+        if isinstance(value, tuple):
+            low, high = value
+            conditions = []
+            if low is not None:
+                conditions.append(field >= low)
+            if high is not None:
+                conditions.append(field <= high)
+            if not conditions:
+                continue
+            condition = conditions[0] if len(conditions) == 1 else conditions[0] & conditions[1]
+        elif isinstance(value, (list, set, frozenset)):
+            condition = field.isin(list(value))
+        else:
+            condition = field == value
+        expression = condition if expression is None else expression & condition
+    return expression
+
+def freeze_filters(filters):
+    """
+    Converts a dictionary of conditions into a hashable value, e.g. to use it in a cache key.
+
+    Args:
+        filters (dict): A dictionary containing column-condition pairs, see `build_filter_expression`.
+
+    Returns:
+        frozenset: The conditions, or None if there are none.
+    """
+    if not filters:
+        return None
+    return frozenset(
+        (column, frozenset(value) if isinstance(value, (list, set, frozenset)) else value)
+        for column, value in filters.items()
+    )
+
+def _scan_flattened(dataset, paths, columns, filters):
+    if columns is None:
+        columns = list(paths)
+    unknown = [column for column in columns if column not in paths]
+    if unknown:
+        raise KeyError(f"Unknown columns {unknown}.")
+    projection = {column: pc.field(*paths[column]) for column in columns}
+    return dataset.to_table(columns=projection, filter=build_filter_expression(filters or {}, paths))
+
+def read_flattened_parquet(path, columns=None, filters=None):
+    """
+    Reads a nested parquet file as if it had been flattened with `flatten_table_second_level`,
+    pushing the column projection and the filters down into the parquet scan.
+
+    Only the requested columns (and the ones the filters need) are read, and row groups whose
+    statistics rule out the filters are skipped.
+
+    Args:
+        path (str): The path to the parquet file.
+        columns (list, optional): The flattened column names to read. Defaults to all columns.
+        filters (dict, optional): The conditions rows must satisfy, see `build_filter_expression`.
+
+    Returns:
+        pyarrow.Table: The flattened table, with the `sim_results` keys recorded in its metadata.
+    """
+    dataset = ds.dataset(path, format="parquet")
+    table = _scan_flattened(dataset, flattened_field_paths(dataset.schema), columns, filters)
+
+    sim_results_keys = []
+    if "sim_results" in dataset.schema.names and pa.types.is_struct(dataset.schema.field("sim_results").type):
+        sim_results_keys = [field.name for field in dataset.schema.field("sim_results").type]
+    return table.replace_schema_metadata({"sim_results_keys": json.dumps(sim_results_keys)})
+
+def filter_flattened_table(table, columns=None, filters=None):
+    """
+    Applies a column projection and filters to a table returned by `flatten_table_second_level`.
+
+    Args:
+        table (pyarrow.Table): The flattened table.
+        columns (list, optional): The column names to keep. Defaults to all columns.
+        filters (dict, optional): The conditions rows must satisfy, see `build_filter_expression`.
+
+    Returns:
+        pyarrow.Table: The projected and filtered table, with the metadata of `table`.
+    """
+    paths = {name: (name,) for name in table.column_names}
+    result = _scan_flattened(ds.dataset(table), paths, columns, filters)
+    return result.replace_schema_metadata(table.schema.metadata)
+
+SI_PREFIXES = {"": 1.0, "f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "M": 1e6, "G": 1e9}
+SI_UNITS = ["m", "H", "F", "Hz", "s"]
+UNIT_SCALES = {"": 1.0, **{prefix + unit: scale for unit in SI_UNITS for prefix, scale in SI_PREFIXES.items() if prefix}, **{unit: 1.0 for unit in SI_UNITS}}
+_UNIT_PATTERN = r"^\s*(?P<value>[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)\s*(?P<unit>[a-zA-Z]*)\s*$"
+CANONICAL_UNITS = {"m": "um", "H": "nH", "F": "fF", "Hz": "GHz", "s": "s"}
+# The factors are powers of ten, rounded so that e.g. "30um" is exactly 30.0 in canonical units.
+UNIT_FACTORS = {
+    "SI": UNIT_SCALES,
+    "canonical": {"": 1.0, **{prefix + unit: 10.0 ** round(np.log10(scale / UNIT_SCALES[CANONICAL_UNITS[unit]]))
+                              for unit in SI_UNITS for prefix, scale in SI_PREFIXES.items()}},
+}
+# parsed values of the distinct strings seen so far, per unit system; the lock guards updates from several threads
+_PARSED_UNIT_STRINGS = {units: {} for units in UNIT_FACTORS}
+_PARSED_UNIT_STRINGS_LIMIT = 100_000
+_PARSED_UNIT_STRINGS_LOCK = threading.Lock()
+
+def to_arrow_array(values):
+    """
+    Converts a column of (nested) dictionaries or scalars to an Arrow array in a single native pass.
+
+    Args:
+        values (pandas.Series, list, pyarrow.Array or pyarrow.ChunkedArray): The values to convert.
+
+    Returns:
+        pyarrow.Array or pyarrow.ChunkedArray: The values as an Arrow array.
+
+    Raises:
+        pyarrow.ArrowInvalid, pyarrow.ArrowTypeError: If the values do not share a common type.
+    """
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values
+    if isinstance(values, pd.Series):
+        values = values.values
+    return pa.array(values, from_pandas=True)
+
+def extract_nested_fields(values, paths):
+    """
+    Extracts nested fields from a column of dictionaries, e.g. the `design_options` column.
+
+    The column is converted to an Arrow struct array once and every path is then read with
+    `pyarrow.compute.struct_field`. Rows holding the same dictionary object are converted once.
+    If the dictionaries do not share a schema, the fields are extracted row by row instead.
+
+    Args:
+        values (pandas.Series, pyarrow.Array or pyarrow.ChunkedArray): The column of dictionaries.
+        paths (dict): A dictionary mapping an output name to a tuple of keys,
+            e.g. {"claw_length": ("connection_pads", "readout", "claw_length")}.
+
+    Returns:
+        dict: A dictionary mapping each output name to a pandas.Series (None where a key is missing).
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    codes = None
+    if isinstance(values, pd.Series) and values.dtype == object and len(values):
+        # merged frames repeat the same dictionary objects, which are converted once
+        codes, first = identity_codes(values.values)
+        values = values.iloc[first] if len(first) < len(values) else values
+        codes = codes if len(first) < len(codes) else None
+    try:
+        array = to_arrow_array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        rows = values.tolist() if isinstance(values, pd.Series) else list(values)
+        rows = rows if codes is None else [rows[code] for code in codes]
+        return {name: pd.Series([_get_path(row, path) for row in rows], index=index, dtype=object) for name, path in paths.items()}
+
+    fields = {}
+    for name, path in paths.items():
+        field = array
+        for key in path:
+            if not pa.types.is_struct(field.type) or field.type.get_field_index(key) < 0:
+                field = pa.nulls(len(array))
+                break
+            field = pc.struct_field(field, [field.type.get_field_index(key)])
+        if codes is not None:
+            field = field.take(pa.array(codes))
+        series = field.to_pandas()
+        if pa.types.is_null(field.type):
+            series = series.astype(object)
+        if index is not None:
+            series.index = index
+        fields[name] = series
+    return fields
+
+def identity_codes(objects):
+    """
+    Factorizes objects by identity, e.g. the dictionaries a merged DataFrame shares between its rows.
+
+    Args:
+        objects (numpy.ndarray): An object array.
+
+    Returns:
+        tuple: The position of each object among the distinct objects, and the first position of each distinct object.
+    """
+    codes, _ = pd.factorize(np.fromiter(map(id, objects), dtype=np.int64, count=len(objects)))
+    _, first = np.unique(codes, return_index=True)
+    return codes, first
+
+def _get_path(row, path):
+    for key in path:
+        if not isinstance(row, dict):
+            return None
+        row = row.get(key)
+    return row
+
+def parse_unit_strings(values, units="canonical", dtype=np.float64):
+    """
+    Converts strings with units, e.g. "30um", "0.5 mm", "10nH" or "5.1GHz", to numbers in one vectorized pass.
+
+    The column is dictionary-encoded and only its distinct strings are parsed (with Arrow compute kernels).
+    The parsed values are cached, so the geometry columns, which repeat a few values over many rows,
+    cost one lookup per row. Numbers without units are returned as they are.
+
+    Args:
+        values (str, pandas.Series, list, numpy.ndarray, pyarrow.Array or pyarrow.ChunkedArray): The values to convert.
+        units (str, optional): "canonical" for the units used in the database (um, nH, fF, GHz and s) or "SI". Defaults to "canonical".
+        dtype (numpy.dtype, optional): The float type of the result. Defaults to numpy.float64.
+
+    Returns:
+        numpy.ndarray: The converted values, NaN where a value cannot be parsed. A float if `values` is a single string.
+
+    Raises:
+        ValueError: If `units` is not "canonical" or "SI".
+    """
+    if units not in UNIT_FACTORS:
+        raise ValueError(f"Unknown unit system {units!r}, expected one of {list(UNIT_FACTORS)}.")
+    cache = _PARSED_UNIT_STRINGS[units]
+    if isinstance(values, str):
+        with _PARSED_UNIT_STRINGS_LOCK:
+            value = cache.get(values)
+        return float(parse_unit_strings([values], units)[0] if value is None else value)
+
+    try:
+        array = to_arrow_array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # mixed types, e.g. 5 and "5um"
+        array = pa.array([None if value is None else str(value) for value in values])
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if pa.types.is_null(array.type):
+        return np.full(len(array), np.nan, dtype=dtype)
+    if not pa.types.is_string(array.type) and not pa.types.is_large_string(array.type):
+        return array.cast(pa.float64()).to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+
+    encoded = pc.dictionary_encode(array)
+    distinct = encoded.dictionary.to_pylist()
+    # the values are read from a local copy, which another thread clearing the cache cannot touch
+    with _PARSED_UNIT_STRINGS_LOCK:
+        known = {string: cache[string] for string in distinct if string in cache}
+    missing = [string for string in distinct if string not in known]
+    if missing:
+        known.update(zip(missing, _parse_distinct_unit_strings(pa.array(missing, pa.string()), units)))
+        with _PARSED_UNIT_STRINGS_LOCK:
+            if len(cache) + len(missing) > _PARSED_UNIT_STRINGS_LIMIT:
+                cache.clear()
+            cache.update((string, known[string]) for string in missing)
+    parsed = np.array([known[string] for string in distinct], dtype=dtype)
+    indices = encoded.indices.fill_null(0).to_numpy(zero_copy_only=False)
+    result = parsed[indices] if len(parsed) else np.full(len(array), np.nan, dtype=dtype)
+    if array.null_count:
+        result[array.is_null().to_numpy(zero_copy_only=False)] = np.nan
+    return result
+
+def _parse_distinct_unit_strings(array, units):
+    parts = pc.extract_regex(array, _UNIT_PATTERN)
+    numbers = pc.struct_field(parts, [0]).cast(pa.float64())
+    unit_names = pc.struct_field(parts, [1])
+    factors = UNIT_FACTORS[units]
+    scales = pc.take(pa.array(list(factors.values()), pa.float64()), pc.index_in(unit_names, pa.array(list(factors))))
+    return pc.multiply(numbers, scales).to_numpy(zero_copy_only=False)
+
+def unit_strings_to_si(values):
+    """
+    Converts strings with units, e.g. "75um", "0.075 mm" or "5.1GHz", to floats in SI units.
+
+    See `parse_unit_strings`. Numbers without units are returned as they are.
+
+    Args:
+        values (pandas.Series, list, pyarrow.Array or pyarrow.ChunkedArray): The values to convert.
+
+    Returns:
+        numpy.ndarray: The values as float64 in SI units, NaN where a value cannot be parsed.
+    """
+    return parse_unit_strings(values, units="SI")
+
+def numeric_join_keys(values):
+    """
+    Converts values with units to numeric keys that compare equal for equal physical quantities,
+    e.g. "75um", "75.0um" and "0.075mm" all give the same key.
+
+    The SI values are rounded to 12 significant digits to absorb the floating point error of the unit scaling.
+
+    Args:
+        values (pandas.Series, list, pyarrow.Array or pyarrow.ChunkedArray): The values to convert.
+
+    Returns:
+        numpy.ndarray: The keys as float64, NaN where a value cannot be parsed.
+    """
+    si = unit_strings_to_si(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = 10.0 ** (np.floor(np.log10(np.abs(si))) - 11)
+        keys = np.round(si / scale) * scale
+    return np.where(si == 0, 0.0, keys)
 
 def flatten_df_second_level(df):
     """
     Flattens a DataFrame by expanding dictionary-like data in the second level of columns.
 
+    This is the row-wise fallback for DataFrames whose dictionaries do not share a schema.
+    Tables loaded from the database are flattened with `flatten_table_second_level` instead.
+
     Args:
         df (pandas.DataFrame): The DataFrame to be flattened.
 
@@ -563,17 +1052,19 @@ def send_email_via_client(dataset_name, institute, pi_name, date, dataset_link):
     mailto_link = create_mailto_link(recipients, subject, body)
     webbrowser.open(mailto_link)
 
-def compute_memory_usage(df):
+def compute_memory_usage(df, deep=True):
     """
     Compute the memory usage of the given DataFrame.
 
     Args:
         df (pandas.DataFrame): The DataFrame to compute the memory usage for.
+        deep (bool, optional): Whether to measure every Python object in the object columns. A shallow estimate
+            only counts their pointers but does not walk the rows. Defaults to True.
 
     Returns:
         float: The memory usage of the DataFrame in megabytes.
     """
-    mem = df.memory_usage(deep=True).sum() / 1024 ** 2
+    mem = df.memory_usage(deep=deep).sum() / 1024 ** 2
     print(f"Memory usage: {mem} MB")
     return mem
 
@@ -601,7 +1092,11 @@ def can_be_categorical(column):
     Check if all elements in the column are hashable.
     """
     try:
-        hashable = all(isinstance(item, (str, int, float, tuple)) or item is None for item in column)
+        # columns of strings (and missing values) are recognized without a Python loop
+        if pd.api.types.infer_dtype(column, skipna=True) in ("string", "empty"):
+            hashable = True
+        else:
+            hashable = all(isinstance(item, (str, int, float, tuple)) or item is None for item in column)
         if hashable:
             pd.Categorical(column)
             return True
@@ -614,6 +1109,9 @@ def optimize_dataframe(df):
     """
     Optimize the memory usage of a pandas DataFrame by downcasting data types.
 
+    The input is not copied: the optimized DataFrame shares the columns that are not converted.
+    The memory figures printed are shallow estimates, which do not walk the Python objects of object columns.
+
     Parameters:
     - df (pandas.DataFrame): The DataFrame to be optimized.
 
@@ -621,68 +1119,140 @@ def optimize_dataframe(df):
     - df_optimized (pandas.DataFrame): The optimized DataFrame.
 
     """
-    df_optimized = df.copy()
-    
-    # Calculate initial memory usage
-    initial_memory_usage = df_optimized.memory_usage(deep=True).sum() / (1024**2)
-    
-    # Memory usage before optimization
-    memory_before_floats = df_optimized.memory_usage(deep=True).sum() / (1024**2)
-    
-    # Optimize float columns
-    for col in df_optimized.select_dtypes(include=['float']):
-        df_optimized[col] = df_optimized[col].astype('float32')
-    
-    # Memory usage after optimizing floats
-    memory_after_floats = df_optimized.memory_usage(deep=True).sum() / (1024**2)
-    
-    # Optimize integer columns
-    for col in df_optimized.select_dtypes(include=['int']):
-        df_optimized[col] = pd.to_numeric(df_optimized[col], downcast='unsigned')
-    
-    # Memory usage after optimizing integers
-    memory_after_ints = df_optimized.memory_usage(deep=True).sum() / (1024**2)
-    
-    # Memory usage before optimizing object columns
-    memory_before_objects = df_optimized.memory_usage(deep=True).sum() / (1024**2)
-    
-    # Optimize object columns
-    for col in df_optimized.select_dtypes(include=['object']):
-        if can_be_categorical(df_optimized[col]):
-            df_optimized[col] = df_optimized[col].astype('category')
-    
-    # Memory usage after optimizing object columns
-    memory_after_objects = df_optimized.memory_usage(deep=True).sum() / (1024**2)
-    
+    column_memory = df.memory_usage(deep=False) / (1024**2)
+    initial_memory_usage = column_memory.sum()
+
+    # decide every conversion first, then apply them all at once
+    converted = {}
+    for col in df.select_dtypes(include=['float']):
+        converted[col] = df[col].astype('float32')
+    for col in df.select_dtypes(include=['int']):
+        converted[col] = pd.to_numeric(df[col], downcast='unsigned')
+    for col in df.select_dtypes(include=['object']):
+        if can_be_categorical(df[col]):
+            converted[col] = df[col].astype('category')
+
+    savings = {"float": 0.0, "int": 0.0, "object": 0.0}
+    kinds = {col: "float" for col in df.select_dtypes(include=['float'])}
+    kinds.update({col: "int" for col in df.select_dtypes(include=['int'])})
+    kinds.update({col: "object" for col in df.select_dtypes(include=['object'])})
+    for col, values in converted.items():
+        savings[kinds[col]] += column_memory[col] - values.memory_usage(index=False, deep=False) / (1024**2)
+
+    df_optimized = df.copy(deep=False)
+    for col, values in converted.items():
+        if values.dtype != df[col].dtype:
+            df_optimized[col] = values
+
     # Calculate memory savings and percentages
-    float_savings = memory_before_floats - memory_after_floats
-    int_savings = memory_after_floats - memory_after_ints
-    object_savings = memory_before_objects - memory_after_objects
-    total_memory_usage = df_optimized.memory_usage(deep=True).sum() / (1024**2)
+    memory_after_floats = initial_memory_usage - savings["float"]
+    memory_after_ints = memory_after_floats - savings["int"]
+    memory_after_objects = memory_after_ints - savings["object"]
+    total_memory_usage = df_optimized.memory_usage(deep=False).sum() / (1024**2)
     total_savings = initial_memory_usage - total_memory_usage
-    percentage_saved = (total_savings / initial_memory_usage) * 100
+    percentage_saved = (total_savings / initial_memory_usage) * 100 if initial_memory_usage else 0.0
 
-    float_savings_percentage = (float_savings / initial_memory_usage) * 100
-    int_savings_percentage = (int_savings / initial_memory_usage) * 100
-    object_savings_percentage = (object_savings / initial_memory_usage) * 100
+    float_savings_percentage = (savings["float"] / initial_memory_usage) * 100 if initial_memory_usage else 0.0
+    int_savings_percentage = (savings["int"] / initial_memory_usage) * 100 if initial_memory_usage else 0.0
+    object_savings_percentage = (savings["object"] / initial_memory_usage) * 100 if initial_memory_usage else 0.0
 
     print(f"Initial memory usage: {initial_memory_usage:.2f} MB")
     print(f"Memory usage after optimizing floats: {memory_after_floats:.2f} MB")
     print(f"Memory usage after optimizing integers: {memory_after_ints:.2f} MB")
     print(f"Memory usage after optimizing objects: {memory_after_objects:.2f} MB")
     print(f"Total memory usage after optimization: {total_memory_usage:.2f} MB")
-    print(f"Memory saved by float optimization: {float_savings:.2f} MB ({float_savings_percentage:.2f}%)")
-    print(f"Memory saved by integer optimization: {int_savings:.2f} MB ({int_savings_percentage:.2f}%)")
-    print(f"Memory saved by object optimization: {object_savings:.2f} MB ({object_savings_percentage:.2f}%)")
+    print(f"Memory saved by float optimization: {savings['float']:.2f} MB ({float_savings_percentage:.2f}%)")
+    print(f"Memory saved by integer optimization: {savings['int']:.2f} MB ({int_savings_percentage:.2f}%)")
+    print(f"Memory saved by object optimization: {savings['object']:.2f} MB ({object_savings_percentage:.2f}%)")
     print(f"Total memory saved: {total_savings:.2f} MB")
     print(f"Memory efficiency: {percentage_saved:.2f}%")
     
     return df_optimized
 
 
+def compact_dtype_plan(table):
+    """
+    Returns the compact Arrow types of the columns of a table, following the rules of `optimize_dataframe`:
+    64-bit floats become float32, non-negative integers the smallest unsigned type that holds them, and
+    strings are dictionary-encoded (categoricals in pandas). Other columns are left as they are.
+
+    The plan is read from the schema; only the integer columns need their minimum and maximum,
+    which Arrow computes without converting them.
+
+    Args:
+        table (pyarrow.Table): The table to plan for.
+
+    Returns:
+        dict: A dictionary mapping a column name to its compact type.
+    """
+    plan = {}
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_float64(field.type):
+            plan[field.name] = pa.float32()
+        elif pa.types.is_signed_integer(field.type):
+            bounds = pc.min_max(column).as_py()
+            if bounds["min"] is not None and bounds["min"] >= 0:
+                plan[field.name] = next(t for t in (pa.uint8(), pa.uint16(), pa.uint32(), pa.uint64())
+                                        if bounds["max"] <= np.iinfo(t.to_pandas_dtype()).max)
+        elif pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            plan[field.name] = pa.dictionary(pa.int32(), field.type)
+    return plan
+
+
+def apply_dtype_plan(table, plan):
+    """
+    Converts the columns of a table to the types of a dtype plan (see `compact_dtype_plan`).
+
+    Args:
+        table (pyarrow.Table): The table to convert.
+        plan (dict): A dictionary mapping a column name to its new type.
+
+    Returns:
+        pyarrow.Table: The converted table. Columns missing from the plan are shared with `table`.
+    """
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        target = plan.get(name)
+        if target is None or column.type == target:
+            columns.append(column)
+        elif pa.types.is_dictionary(target):
+            columns.append(pc.dictionary_encode(column).cast(target))
+        else:
+            columns.append(column.cast(target))
+    return pa.Table.from_arrays(columns, names=table.column_names).replace_schema_metadata(table.schema.metadata)
+
+
+def optimized_dtypes(df):
+    """
+    Returns the dtypes that `optimize_dataframe` followed by `delete_object_columns` and
+    `delete_categorical_columns` would give the columns of `df`, without copying it.
+
+    Parameters:
+    - df (pandas.DataFrame): The DataFrame to plan for.
+
+    Returns:
+    - dtypes (dict): The dtype of every column that would be kept, in column order.
+    """
+    float_columns = set(df.select_dtypes(include=['float']).columns)
+    int_columns = set(df.select_dtypes(include=['int']).columns)
+    dropped_columns = set(df.select_dtypes(include=['object', 'category']).columns)
+
+    dtypes = {}
+    for col in df.columns:
+        if col in float_columns:
+            dtypes[col] = np.dtype('float32')
+        elif col in int_columns:
+            dtypes[col] = pd.to_numeric(df[col], downcast='unsigned').dtype
+        elif col not in dropped_columns:
+            dtypes[col] = df[col].dtype
+    return dtypes
+
 def process_design_options(merged_df):
     """
     Processes the 'design_options' column in merged_df, appends new columns, converts values, and drops 'design_options'.
+
+    The values are read from the unified 'design_options' column if there is one, and from the
+    per-component design options columns otherwise (see `extract_unified_design_fields`).
     
     Parameters:
     - merged_df: DataFrame containing the 'design_options' column.
@@ -690,29 +1260,31 @@ def process_design_options(merged_df):
     Returns:
     - merged_df: Modified DataFrame with new columns added and 'design_options' dropped.
     """
-    def convert_value(value):
-        if value is None:
-            return value
-        if isinstance(value, str) and value.endswith("um"):
-            return np.float16(value[:-2])
-        return np.int16(value)
-    
-    design_options = merged_df["design_options"]
-
-    merged_df["finger_count"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["coupler_options"]["finger_count"]))
-    merged_df["finger_length"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["coupler_options"]["finger_length"]))
-    merged_df["cap_gap"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["coupler_options"]["cap_gap"]))
-    merged_df["cap_width"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["coupler_options"]["cap_width"]))
-    merged_df["total_length"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["cpw_opts"]["left_options"]["total_length"]))
-    merged_df["meander_spacing"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["cpw_opts"]["left_options"]["meander"]["spacing"]))
-    merged_df["meander_asymmetry"] = design_options.apply(lambda x: convert_value(x["cavity_claw_options"]["cpw_opts"]["left_options"]["meander"]["asymmetry"]))
-    merged_df["claw_length"] = design_options.apply(lambda x: convert_value(x["qubit_options"]["connection_pads"]["readout"]["claw_length"]))
-    merged_df["claw_width"] = design_options.apply(lambda x: convert_value(x["qubit_options"]["connection_pads"]["readout"]["claw_width"]))
-    merged_df["ground_spacing"] = design_options.apply(lambda x: convert_value(x["qubit_options"]["connection_pads"]["readout"]["ground_spacing"]))
-    merged_df["cross_length"] = design_options.apply(lambda x: convert_value(x["qubit_options"]["cross_length"]))
+    def convert_values(values):
+        # integer options (e.g. finger_count) stay integers, lengths are parsed to float32 um
+        if pd.api.types.is_integer_dtype(values.dtype):
+            return values.astype(np.int16)
+        return pd.Series(parse_unit_strings(values, dtype=np.float32), index=values.index)
+
+    fields = extract_unified_design_fields(merged_df, {
+        "finger_count": ("cavity_claw_options", "coupler_options", "finger_count"),
+        "finger_length": ("cavity_claw_options", "coupler_options", "finger_length"),
+        "cap_gap": ("cavity_claw_options", "coupler_options", "cap_gap"),
+        "cap_width": ("cavity_claw_options", "coupler_options", "cap_width"),
+        "total_length": ("cavity_claw_options", "cpw_opts", "left_options", "total_length"),
+        "meander_spacing": ("cavity_claw_options", "cpw_opts", "left_options", "meander", "spacing"),
+        "meander_asymmetry": ("cavity_claw_options", "cpw_opts", "left_options", "meander", "asymmetry"),
+        "claw_length": ("qubit_options", "connection_pads", "readout", "claw_length"),
+        "claw_width": ("qubit_options", "connection_pads", "readout", "claw_width"),
+        "ground_spacing": ("qubit_options", "connection_pads", "readout", "ground_spacing"),
+        "cross_length": ("qubit_options", "cross_length"),
+    })
+    for column, values in fields.items():
+        merged_df[column] = convert_values(values)
 
     # Drop the 'design_options' column
-    merged_df.drop(columns=["design_options"], inplace=True)
+    if "design_options" in merged_df.columns:
+        merged_df.drop(columns=["design_options"], inplace=True)
     
     return merged_df
 
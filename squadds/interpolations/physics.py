@@ -1,3 +1,5 @@
+import copy
+
 import pandas as pd
 from pyEPR.calcs import Convert
 
@@ -60,22 +62,16 @@ class ScalingInterpolator(Interpolator):
             filtered_df = self.df[(self.df['cross_to_claw_closest'] >= (1 - threshold) * cross_to_claw_cap_chosen) &
                                     (self.df['cross_to_claw_closest'] <= (1 + threshold) * cross_to_claw_cap_chosen)]
 
-        # Find the closest cavity-coupler design
-        merged_df = self.analyzer.df.copy()
-        system_chosen = self.analyzer.selected_system
-        H_params_chosen = self.analyzer.H_param_keys
-
-        self.analyzer.df = filtered_df
-        self.analyzer.selected_system = 'cavity_claw' 
-        self.analyzer.H_param_keys = ['resonator_type','cavity_frequency_GHz', 'kappa_kHz']
-        self.analyzer.target_params = {'cavity_frequency_GHz': f_res_target, 'kappa_kHz': kappa_target, 'resonator_type': res_type}
-
+        # Find the closest cavity-coupler design among the filtered designs, on a copy of the analyzer
         target_params_cavity = {'cavity_frequency_GHz': f_res_target, 'kappa_kHz': kappa_target, 'resonator_type': res_type}
+        cavity_analyzer = self.analyzer.with_df(filtered_df, selected_system='cavity_claw',
+                                                H_param_keys=['resonator_type','cavity_frequency_GHz', 'kappa_kHz'],
+                                                target_params=dict(target_params_cavity))
 
         if self.analyzer.selected_resonator_type == 'half':
-            closest_cavity_cpw_design = self.analyzer.find_closest(target_params_cavity,parallel=True, num_cpu="auto", num_top=1)
+            closest_cavity_cpw_design = cavity_analyzer.find_closest(target_params_cavity,parallel=True, num_cpu="auto", num_top=1)
         else:
-            closest_cavity_cpw_design = self.analyzer.find_closest(target_params_cavity, num_top=1)
+            closest_cavity_cpw_design = cavity_analyzer.find_closest(target_params_cavity, num_top=1)
 
         closest_kappa = closest_cavity_cpw_design['kappa_kHz'].values[0]
         closest_f_cavity = closest_cavity_cpw_design['cavity_frequency_GHz'].values[0]
@@ -104,17 +100,12 @@ class ScalingInterpolator(Interpolator):
         # round updated_coupling_length to nearest integer
         updated_coupling_length = round(updated_coupling_length)
 
-
-        # Reset the analyzer's DataFrame
-        self.analyzer.df = merged_df
-        self.analyzer.selected_system = system_chosen
-        self.analyzer.H_param_keys = H_params_chosen
-
         # a dataframe with three empty colums
         interpolated_designs_df = pd.DataFrame(columns=["design_options_qubit", "design_options_cavity_claw", "design_options"])
 
         # Update the qubit and cavity design options
-        qubit_design_options = closest_qubit_claw_design["design_options_qubit"].iloc[0]
+        # the design options are copied, the dictionaries of the analyzer's DataFrame are left untouched
+        qubit_design_options = copy.deepcopy(closest_qubit_claw_design["design_options_qubit"].iloc[0])
         qubit_design_options['cross_length'] = f"{updated_cross_length}um"
         qubit_design_options["connection_pads"]["readout"]['claw_length'] = f"{updated_claw_length}um"
         required_Lj = Convert.Lj_from_Ej(closest_qubit_claw_design['EJ'].iloc[0], units_in='GHz', units_out='nH') 
@@ -127,7 +118,7 @@ class ScalingInterpolator(Interpolator):
         # setting the `claw_cpw_length` params to zero
         qubit_design_options["connection_pads"]['readout']['claw_cpw_length'] = "0um"
 
-        cavity_design_options = closest_cavity_cpw_design["design_options_cavity_claw"].iloc[0]
+        cavity_design_options = copy.deepcopy(closest_cavity_cpw_design["design_options_cavity_claw"].iloc[0])
         cavity_design_options["cpw_opts"]['total_length'] = f"{updated_resonator_length}um"
 
         if self.analyzer.selected_resonator_type == 'half':
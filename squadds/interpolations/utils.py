@@ -1,10 +1,13 @@
+import copy
 import os
 import time
 
 import pandas as pd
 from pyEPR.calcs import Convert
 
-from squadds.core.utils import create_unified_design_options
+from squadds.core.utils import (create_unified_design_options,
+                                extract_unified_design_fields,
+                                parse_unit_strings)
 
 
 def get_design_from_ml_predictions(analyzer, test_data, y_pred_dnn):
@@ -22,14 +25,15 @@ def get_design_from_ml_predictions(analyzer, test_data, y_pred_dnn):
 
     designs_list = []
 
-    for i, row in test_data.iterrows():
-        # Get target parameters
-        f_q_target = row['qubit_frequency_GHz']
-        f_res_target = row['cavity_frequency_GHz']
-        alpha_target = row['anharmonicity_MHz']
-        kappa_target = row['kappa_kHz']
-        g_target = row['g_MHz']
+    # Find the closest qubit and cavity designs of every target in one pass each
+    qubit_targets = test_data[['qubit_frequency_GHz', 'anharmonicity_MHz', 'g_MHz']]
+    cavity_targets = test_data[['cavity_frequency_GHz', 'kappa_kHz']]
+    closest_qubits = analyzer.find_closest_many(qubit_targets, num_top=1).set_index('target_id')['row_index']
+    closest_cavities = analyzer.find_closest_many(cavity_targets, num_top=1).set_index('target_id')['row_index']
+    qubit_rows = analyzer.take_rows(pd.Index(closest_qubits.values))
+    cavity_rows = analyzer.take_rows(pd.Index(closest_cavities.values))
 
+    for i in test_data.index:
         # Get the corresponding predicted design parameters
         predicted_design_params = y_pred_dnn[i]
         cross_length_pred = predicted_design_params[0]
@@ -38,23 +42,15 @@ def get_design_from_ml_predictions(analyzer, test_data, y_pred_dnn):
         total_length_pred = predicted_design_params[3]
         ground_spacing_pred = predicted_design_params[4]
 
-        # Now find the closest designs
-        # Find the closest qubit design
-        closest_qubit_claw_design = analyzer.find_closest(
-            {"qubit_frequency_GHz": f_q_target, 'anharmonicity_MHz': alpha_target, 'g_MHz': g_target},
-            num_top=1
-        )
-
-        # Find the closest cavity design
-        target_params_cavity = {'cavity_frequency_GHz': f_res_target, 'kappa_kHz': kappa_target}
-        closest_cavity_cpw_design = analyzer.find_closest(
-            target_params_cavity, num_top=1
-        )
+        # The closest qubit and cavity designs
+        closest_qubit_claw_design = qubit_rows.iloc[[closest_qubits.index.get_loc(i)]]
+        closest_cavity_cpw_design = cavity_rows.iloc[[closest_cavities.index.get_loc(i)]]
 
         # Now update the design options
         # Get the design options from the closest designs
-        qubit_design_options = closest_qubit_claw_design["design_options_qubit"].iloc[0].copy()
-        cavity_design_options = closest_cavity_cpw_design["design_options_cavity_claw"].iloc[0].copy()
+        # the design options are copied, the dictionaries of the analyzer's DataFrame are left untouched
+        qubit_design_options = copy.deepcopy(closest_qubit_claw_design["design_options_qubit"].iloc[0])
+        cavity_design_options = copy.deepcopy(closest_cavity_cpw_design["design_options_cavity_claw"].iloc[0])
 
         # Update the qubit design options with predicted values
         qubit_design_options['cross_length'] = f"{cross_length_pred}um"
@@ -117,7 +113,19 @@ def process_dataframe(analyzer, target_params_df, index, path_to_file):
     """
     # Merge with coupling data
     merged_df = analyzer.get_complete_df(target_params_df.iloc[index])
+    return process_complete_df(merged_df)
+
 
+def process_complete_df(merged_df):
+    """
+    Filters the columns of a complete DataFrame (see `Analyzer.get_complete_df`) and converts the design options to floats.
+
+    Args:
+        merged_df (pd.DataFrame): The complete DataFrame.
+
+    Returns:
+        pd.DataFrame: The processed dataframe.
+    """
     # Define columns to keep
     columns_to_keep = [
         'cross_length', 'cross_gap', 'claw_length', 
@@ -131,24 +139,19 @@ def process_dataframe(analyzer, target_params_df, index, path_to_file):
 
     # Convert specific columns from string to float
     float_col_names = ['claw_length']
-    new_df[float_col_names] = new_df[float_col_names].applymap(lambda x: float(x[:-2]))
+    for column in float_col_names:
+        new_df[column] = parse_unit_strings(new_df[column])
 
     # Apply conversions for design options using JSON-like structure
-    new_df['cross_length'] = merged_df['design_options'].apply(
-        lambda x: float(x['qubit_options']['cross_length'][:-2])
-    )
-    new_df["cross_gap"] = merged_df['design_options'].apply(
-        lambda x: float(x['qubit_options']['cross_gap'][:-2])
-    )
-    new_df['ground_spacing'] = merged_df['design_options'].apply(
-        lambda x: float(x['qubit_options']['connection_pads']['readout']['ground_spacing'][:-2])
-    )
-    new_df['coupling_length'] = merged_df['design_options'].apply(
-        lambda x: float(x['cavity_claw_options']['coupler_options']['coupling_length'][:-2])
-    )
-    new_df["total_length"] = merged_df['design_options'].apply(
-        lambda x: float(x['cavity_claw_options']['cpw_opts']["left_options"]['total_length'][:-2])
-    )
+    design_fields = extract_unified_design_fields(merged_df, {
+        'cross_length': ('qubit_options', 'cross_length'),
+        'cross_gap': ('qubit_options', 'cross_gap'),
+        'ground_spacing': ('qubit_options', 'connection_pads', 'readout', 'ground_spacing'),
+        'coupling_length': ('cavity_claw_options', 'coupler_options', 'coupling_length'),
+        'total_length': ('cavity_claw_options', 'cpw_opts', 'left_options', 'total_length'),
+    })
+    for column, values in design_fields.items():
+        new_df[column] = parse_unit_strings(values)
 
     # Drop the 'coupler_type' and 'resonator_type' columns
     new_df = new_df.drop(columns=['coupler_type', 'resonator_type'])
@@ -168,8 +171,13 @@ def generate_qubit_cavity_training_data(analyzer,target_params_df,path_to_file):
     if analyzer.selected_resonator_type == "quarter":
         # for each entry in the target_params_df, process the dataframe and concatenate the results
         processed_dfs = []
+        processed = {}
         for index in range(len(target_params_df)):
-            processed_dfs.append(process_dataframe(analyzer, target_params_df, index, path_to_file))
+            merged_df = analyzer.get_complete_df(target_params_df.iloc[index])
+            # once the Hamiltonian parameters are computed every target gets the same DataFrame, which is processed once
+            if id(merged_df) not in processed:
+                processed[id(merged_df)] = (merged_df, process_complete_df(merged_df))
+            processed_dfs.append(processed[id(merged_df)][1])
         # concatenate the results
         training_df = pd.concat(processed_dfs)
         
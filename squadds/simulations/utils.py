@@ -34,6 +34,7 @@ from qiskit_metal.toolbox_metal import math_and_overrides
 
 from squadds.components.claw_coupler import TransmonClaw
 from squadds.components.coupled_systems import QubitCavity
+from squadds.core.utils import parse_unit_strings
 
 
 def get_cavity_claw_options_keys(cavity_dict):
@@ -51,15 +52,15 @@ def get_cavity_claw_options_keys(cavity_dict):
 
 def string_to_float(string):
     """
-    Converts a string representation of a number to a float.
+    Converts a string representation of a number with units, e.g. "30um", to a float in canonical units.
 
     Args:
-        string (str): The string representation of the number.
+        string (str or array-like): The string representation of the number, or a column of them.
 
     Returns:
-        float: The converted float value.
+        float or numpy.ndarray: The converted value(s), see `squadds.core.utils.parse_unit_strings`.
     """
-    return float(string[:-2])
+    return parse_unit_strings(string)
 
 
 def getMeshScreenshot(projectname, designname, solutiontype="Eigenmode"):
@@ -614,21 +615,19 @@ def convert_str_to_float(value):
     :return: The value as a float
     """
 
-    return float(value[:-2])
-
-    import re
+    return parse_unit_strings(value)
 
 def extract_number(string):
     """
-    Remove non-digit characters from a string, except for decimal.
+    Extracts the number of a string with units, e.g. "30um" or "5.1 GHz", in canonical units.
 
     Args:
-        string (str): The input string.
+        string (str or array-like): The input string, or a column of them.
 
     Returns:
-        str: The string with non-digit characters removed, except for decimal.
+        float or numpy.ndarray: The number(s), see `squadds.core.utils.parse_unit_strings`.
     """
-    return float(re.sub(r"[^\d.]", "", string))
+    return parse_unit_strings(string)
     
 
 def unpack(parent_key, parent_value, delimiter=','):
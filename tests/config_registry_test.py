@@ -0,0 +1,34 @@
+"""
+Offline tests for the index over the configurations of a dataset revision.
+"""
+from squadds.core.registry import ConfigRegistry
+
+
+def make_registry():
+    configs = ["qubit-TransmonCross-cap_matrix", "cavity_claw-RouteMeander-eigenmode", "coupler-NCap-cap_matrix",
+               "qubit-TransmonCross-eigenmode", "measured_device_database"]
+    return ConfigRegistry(configs, revision="r1")
+
+
+def test_lookups():
+    registry = make_registry()
+    assert len(registry) == 4 and "measured_device_database" not in registry
+    assert registry.has_config("qubit", "TransmonCross", "cap_matrix")
+    # every part exists on its own, but not in this combination
+    assert not registry.has_config("qubit", "RouteMeander", "eigenmode")
+    assert registry.has_component("cavity_claw") and not registry.has_component("CLT")
+    assert registry.has_component_name("NCap") and registry.has_data_type("eigenmode")
+
+
+def test_names_and_data_types():
+    registry = make_registry()
+    assert registry.component_names_of("qubit") == ["TransmonCross"]
+    assert registry.component_names_of("resonator") == []
+    assert registry.data_types_of("qubit", "TransmonCross") == ["cap_matrix", "eigenmode"]
+    assert registry.data_types_of("coupler", "TransmonCross") == []
+
+
+if __name__ == "__main__":
+    test_lookups()
+    test_names_and_data_types()
+    print("All config registry tests passed.")
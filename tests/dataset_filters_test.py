@@ -0,0 +1,89 @@
+"""
+Offline tests for the projection and filters pushed down into dataset reads.
+"""
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from squadds.core.cache import TableCache
+from squadds.core.db import SQuADDS_DB
+from squadds.core.registry import ConfigRegistry
+from squadds.core.store import DatasetStore
+from squadds.core.utils import (build_filter_expression, filter_flattened_table,
+                                flatten_table_second_level)
+
+CAVITY = "cavity_claw-RouteMeander-eigenmode"
+
+
+def make_cavity_table():
+    rows = [{"design": {"coupler_type": coupler, "design_options": {"cpw_opts": {"total_length": f"{length}um"}}},
+             "sim_results": {"cavity_frequency": frequency, "kappa": 1e5, "units": "Hz"}}
+            for coupler, length, frequency in [("CLT", 3000, 7e9), ("NCap", 4000, 6e9), ("CLT", 5000, 5e9)]]
+    return pa.Table.from_pylist(rows)
+
+
+def make_session():
+    """Returns a database session reading `make_cavity_table` from a local store, without the Hub."""
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    pq.write_table(make_cavity_table(), store.table_path(CAVITY))
+    store._revision = "r1"
+    store.manifest["entries"][CAVITY] = {"revision": "r1", "fingerprint": "f1"}
+
+    # an instance of its own rather than the shared one
+    db = object.__new__(SQuADDS_DB)
+    db.__init__()
+    db.store = store
+    db.cache = TableCache()
+    db._registry = ConfigRegistry([CAVITY], revision="r1")
+    return db
+
+
+def test_equality_range_and_membership():
+    table = flatten_table_second_level(make_cavity_table())
+    assert filter_flattened_table(table, filters={"coupler_type": "CLT"})["cavity_frequency"].to_pylist() == [7e9, 5e9]
+    assert filter_flattened_table(table, filters={"cavity_frequency": (5.5e9, None)}).num_rows == 2
+    assert filter_flattened_table(table, filters={"cavity_frequency": (None, 6e9)}).num_rows == 2
+    both = filter_flattened_table(table, columns=["coupler_type"], filters={"coupler_type": ["CLT", "NCap"], "cavity_frequency": (6e9, 7e9)})
+    assert both.column_names == ["coupler_type"] and both["coupler_type"].to_pylist() == ["CLT", "NCap"]
+    assert build_filter_expression({}, {}) is None
+    try:
+        build_filter_expression({"missing": 1}, {"coupler_type": ("design", "coupler_type")})
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("unknown columns must be rejected")
+
+
+def test_empty_match_falls_back_once():
+    db = make_session()
+    db.selected_system = ["qubit", "cavity_claw"]
+    db.target_param_keys = ["qubit_frequency"]
+
+    df = db._get_filtered_dataset("eigenmode", "cavity_claw", "RouteMeander", {"coupler_type": "CapNInterdigitalTee", "unknown": 1})
+    assert len(df) == 3
+    assert db.target_param_keys == ["qubit_frequency", "cavity_frequency", "kappa"]
+
+    df = db._get_filtered_dataset("eigenmode", "cavity_claw", "RouteMeander", {"coupler_type": "NCap"})
+    assert df["coupler_type"].tolist() == ["NCap"]
+
+
+def test_converted_frame_is_cached():
+    db = make_session()
+    db.selected_system = "cavity_claw"
+
+    first = db.get_dataset(data_type="eigenmode", component="cavity_claw", component_name="RouteMeander")
+    first["cavity_frequency"] = 0.0
+    first.drop(columns=["kappa"], inplace=True)
+    second = db.get_dataset(data_type="eigenmode", component="cavity_claw", component_name="RouteMeander")
+    assert second["cavity_frequency"].tolist() == [7e9, 6e9, 5e9] and "kappa" in second.columns
+    # the rows are converted to pandas once
+    assert second["design_options"][0] is first["design_options"][0]
+    assert db.get_dataset(data_type="eigenmode", component="cavity_claw", component_name="RouteMeander", compact=True)["cavity_frequency"].dtype == "float32"
+
+
+if __name__ == "__main__":
+    test_equality_range_and_membership()
+    test_empty_match_falls_back_once()
+    test_converted_frame_is_cached()
+    print("All dataset filter tests passed.")
@@ -0,0 +1,54 @@
+"""
+Offline tests for the spatial index used by `Analyzer.find_closest(use_index=True)`.
+"""
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from squadds.core.index import DesignIndex
+from squadds.core.store import DatasetStore
+from squadds.core.metrics import (ChebyshevMetric, CustomMetric,
+                                  EuclideanMetric, ManhattanMetric,
+                                  WeightedEuclideanMetric)
+
+
+def make_df():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"qubit_frequency_GHz": rng.uniform(3, 7, 2000), "anharmonicity_MHz": rng.uniform(-300, -100, 2000),
+                       "g_MHz": rng.uniform(50, 150, 2000)})
+    df.loc[5, "g_MHz"] = np.nan
+    # exact ties are ranked in order of appearance
+    df.iloc[10] = df.iloc[20] = [4.5, -200.0, 70.0]
+    return df
+
+
+def test_index_matches_scan():
+    df = make_df()
+    target_params = {"qubit_frequency_GHz": 4.5, "anharmonicity_MHz": -200, "g_MHz": 70}
+    index = DesignIndex.build(df.to_numpy(), np.arange(len(df)))
+    assert len(index) == len(df) - 1
+    for metric in [EuclideanMetric(), ManhattanMetric(), ChebyshevMetric(), WeightedEuclideanMetric({"g_MHz": 3})]:
+        scan = pd.Series(metric.calculate_batch(target_params, df.to_numpy()), index=df.index).nsmallest(25).index
+        assert list(index.query(metric, target_params, 25)) == list(scan)
+
+
+def test_unsupported_metrics_and_storage():
+    df = make_df()
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    built = DesignIndex.build(df.to_numpy(), np.arange(len(df)))
+    store.save_index("system", "k1", built.arrays())
+    assert store.load_index("system", "k0") is None
+    index = DesignIndex.from_arrays(**store.load_index("system", "k1"))
+    assert np.array_equal(index.tree.data, built.tree.data) and np.array_equal(index.positions, built.positions)
+    target_params = {"qubit_frequency_GHz": 4.5, "anharmonicity_MHz": -200, "g_MHz": 70}
+    assert index.query(CustomMetric(lambda target, simulated: 0.0), target_params, 5) is None
+    assert index.query(EuclideanMetric(), dict(target_params, g_MHz=0), 5) is None
+    assert len(index.query(EuclideanMetric(), target_params, 5)) == 5
+    assert list(index.query(EuclideanMetric(), target_params, 5)) == list(built.query(EuclideanMetric(), target_params, 5))
+
+
+if __name__ == "__main__":
+    test_index_matches_scan()
+    test_unsupported_metrics_and_storage()
+    print("All design index tests passed.")
@@ -0,0 +1,57 @@
+"""
+Offline tests for the compact dtypes applied in Arrow and in pandas.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from squadds.core.utils import apply_dtype_plan, compact_dtype_plan, optimize_dataframe
+
+
+def make_table():
+    return pa.table({
+        "frequency": pa.array([5e9, 6e9, None], type=pa.float64()),
+        "index": pa.array([0, 7, 300], type=pa.int64()),
+        "offset": pa.array([-1, 0, 1], type=pa.int64()),
+        "units": pa.array(["Hz", "Hz", None], type=pa.string()),
+        "flag": pa.array([True, False, True]),
+        "options": pa.array([{"a": 1}, {"a": 2}, {"a": 3}]),
+    })
+
+
+def test_compact_dtype_plan():
+    plan = compact_dtype_plan(make_table())
+    assert plan == {"frequency": pa.float32(), "index": pa.uint16(), "units": pa.dictionary(pa.int32(), pa.string())}
+    assert compact_dtype_plan(pa.table({"empty": pa.array([], type=pa.int64())})) == {}
+
+
+def test_apply_dtype_plan():
+    table = make_table().replace_schema_metadata({"source": "test"})
+    compact = apply_dtype_plan(table, compact_dtype_plan(table))
+    assert compact.column_names == table.column_names
+    assert compact.schema.metadata == {b"source": b"test"}
+    assert compact["options"].equals(table["options"]) and compact["flag"].equals(table["flag"])
+
+    df = compact.to_pandas()
+    assert df["frequency"].dtype == np.float32 and df["index"].dtype == np.uint16 and df["offset"].dtype == np.int64
+    assert isinstance(df["units"].dtype, pd.CategoricalDtype) and df["units"].tolist()[:2] == ["Hz", "Hz"] and pd.isna(df["units"][2])
+    assert df["index"].tolist() == [0, 7, 300] and np.isnan(df["frequency"][2])
+
+
+def test_optimize_dataframe():
+    df = pd.DataFrame({"frequency": [5e9, 6e9, 7e9], "index": [0, 7, 300], "offset": [-1, 0, 1],
+                       "units": ["Hz", "Hz", "Hz"], "options": [{"a": 1}, {"a": 2}, {"a": 3}]})
+    optimized = optimize_dataframe(df)
+    # only non-negative integers are downcast
+    assert optimized.dtypes.to_dict() == {"frequency": np.float32, "index": np.uint16, "offset": np.int64,
+                                          "units": pd.CategoricalDtype(["Hz"]), "options": object}
+    # the input is left as it was
+    assert df["frequency"].dtype == np.float64 and df["units"].dtype == object
+    assert optimized["index"].tolist() == [0, 7, 300] and optimized["offset"].tolist() == [-1, 0, 1]
+
+
+if __name__ == "__main__":
+    test_compact_dtype_plan()
+    test_apply_dtype_plan()
+    test_optimize_dataframe()
+    print("All dtype plan tests passed.")
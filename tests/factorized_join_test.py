@@ -0,0 +1,69 @@
+"""
+Offline tests for the factorized qubit-cavity join.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.join import FactorizedJoin, join_pairs
+
+
+def make_frames():
+    qubits = pd.DataFrame({"claw_length": [10.0, 20.0, 10.0, np.nan, 30.0], "EC": [1.0, 2.0, 3.0, 4.0, 5.0], "units": "fF"})
+    cavities = pd.DataFrame({"claw_length": [20.0, 10.0, 10.0, np.nan, 40.0], "kappa": [0.1, 0.2, 0.3, 0.4, 0.5], "units": "Hz"})
+    return qubits, cavities
+
+
+def test_join_matches_pandas_merge():
+    qubits, cavities = make_frames()
+    join = FactorizedJoin.from_keys(qubits, cavities.drop(columns="claw_length"), [qubits["claw_length"]], [cavities["claw_length"]])
+    merged = pd.merge(qubits, cavities, on="claw_length", suffixes=("_qubit", "_cavity_claw"))
+
+    assert join.left_index.dtype == np.int32 and join.right_index.dtype == np.int32
+    assert list(join.columns) == list(merged.columns)
+    order = ["EC", "kappa"]
+    expanded = join.to_pandas().sort_values(order).reset_index(drop=True)
+    assert expanded.equals(merged.sort_values(order).reset_index(drop=True))
+
+
+def test_derived_columns_filter_and_take():
+    qubits, cavities = make_frames()
+    join = FactorizedJoin.from_keys(qubits, cavities, [qubits["claw_length"]], [cavities["claw_length"]])
+    join["product"] = join.column("EC") * join.column("kappa")
+
+    selected = join[join["product"] > 0.25]
+    assert len(selected) == int((join.column("product") > 0.25).sum())
+    assert np.allclose(selected.column("product"), selected.column("EC") * selected.column("kappa"))
+
+    rows = selected.to_pandas(rows=[0], columns=["EC", "product"])
+    assert rows.iloc[0]["product"] == selected.column("product")[0]
+
+    copy = join.copy()
+    copy.left["new"] = 1
+    assert "new" not in join.columns
+
+
+def test_parallel_pairs_match_serial():
+    rng = np.random.default_rng(0)
+    left = [rng.integers(0, 7, 200).astype(float), rng.choice(["a", "b"], 200)]
+    right = [rng.integers(0, 9, 150).astype(float), rng.choice(["a", "b"], 150)]
+    left[0][::17] = np.nan
+    right[0][::13] = np.nan
+
+    for merge_order in (False, True):
+        serial = join_pairs(left, right, merge_order=merge_order)
+        parallel = join_pairs(left, right, num_workers=3, merge_order=merge_order)
+        assert all(np.array_equal(s, p) for s, p in zip(serial, parallel))
+
+    # in merge order the pairs come out as the rows of `pandas.merge`
+    frame_left = pd.DataFrame({"k0": left[0], "k1": left[1], "i": np.arange(200)})
+    frame_right = pd.DataFrame({"k0": right[0], "k1": right[1], "j": np.arange(150)})
+    merged = pd.merge(frame_left, frame_right, on=["k0", "k1"])
+    left_index, right_index = join_pairs(left, right, num_workers=3, merge_order=True)
+    assert np.array_equal(left_index, merged["i"]) and np.array_equal(right_index, merged["j"])
+
+
+if __name__ == "__main__":
+    test_join_matches_pandas_merge()
+    test_derived_columns_filter_and_take()
+    test_parallel_pairs_match_serial()
+    print("All factorized join tests passed.")
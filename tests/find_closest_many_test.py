@@ -0,0 +1,54 @@
+"""
+Offline tests for `Analyzer.find_closest_many`, against one `find_closest` call per target.
+"""
+import pandas as pd
+
+from squadds.core.analysis import Analyzer
+from system_frame_test import make_cavity_df, make_qubit_df, make_session
+
+
+def make_analyzer():
+    db = make_session()
+    db.selected_df = db.create_qubit_cavity_df(make_qubit_df(), make_cavity_df(), merger_terms=db.claw_merger_terms)
+    analyzer = Analyzer(db)
+    analyzer.metric_weights = {"g_MHz": 2, "kappa_kHz": 0.5}
+    analyzer.custom_metric_func = lambda target, simulated: sum(abs(target[param] - simulated[param]) ** 0.5
+                                                                for param in target if not isinstance(target[param], str))
+    return analyzer
+
+
+def make_targets():
+    return pd.DataFrame({"qubit_frequency_GHz": [4.0, 5.5, 3.2], "anharmonicity_MHz": [-200, -150, -300], "g_MHz": [70, 40, 90],
+                         "cavity_frequency_GHz": [6.2, 7.5, 5.1], "kappa_kHz": [120, 300, 60], "resonator_type": "quarter"},
+                        index=[10, 20, 30])
+
+
+def test_matches_find_closest():
+    analyzer, targets = make_analyzer(), make_targets()
+    for metric in ["Euclidean", "Manhattan", "Chebyshev", "Weighted Euclidean", "Custom"]:
+        expected = {target_id: list(analyzer.find_closest(target, num_top=4, metric=metric, display=False).index)
+                    for target_id, target in targets.to_dict("index").items()}
+        for use_index in (True, False):
+            closest = analyzer.find_closest_many(targets, num_top=4, metric=metric, display=False, use_index=use_index)
+            assert list(closest["target_id"].unique()) == list(targets.index)
+            for target_id, rows in closest.groupby("target_id", sort=False):
+                assert list(rows["rank"]) == list(range(4))
+                assert list(rows["row_index"]) == expected[target_id], (metric, use_index, target_id)
+
+
+def test_unmatched_target_is_rejected():
+    analyzer, targets = make_analyzer(), make_targets()
+    analyzer.find_closest_many(targets, num_top=1, display=False)
+    targets.loc[20, "resonator_type"] = "half"
+    try:
+        analyzer.find_closest_many(targets, num_top=1, display=False)
+    except ValueError as e:
+        assert "target 20" in str(e)
+    else:
+        raise AssertionError("a target without designs must be rejected")
+
+
+if __name__ == "__main__":
+    test_matches_find_closest()
+    test_unmatched_target_is_rejected()
+    print("All find_closest_many tests passed.")
@@ -0,0 +1,38 @@
+"""
+Offline tests for the column statistics and categorical posting lists of a system frame.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.stats import FrameStats
+
+
+def make_df():
+    return pd.DataFrame({
+        "resonator_type": ["quarter", "half", None, "quarter", "half", "quarter"],
+        "claw": ["a", "b", "a", "a", "a", None],
+        "cavity_frequency_GHz": [6.1, 7.2, np.nan, 5.9, 8.0, 6.5],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+
+def test_posting_lists_match_masks():
+    df = make_df()
+    stats = FrameStats(df)
+    stats.precompute(["resonator_type", "claw", "cavity_frequency_GHz"])
+    for value in ["quarter", "half", "full"]:
+        assert np.array_equal(stats.positions("resonator_type", value), np.flatnonzero(df["resonator_type"] == value))
+    expected = np.flatnonzero((df["resonator_type"] == "quarter") & (df["claw"] == "a"))
+    assert np.array_equal(stats.matching([("resonator_type", "quarter"), ("claw", "a")]), expected)
+    assert np.array_equal(stats.matching([]), np.arange(len(df)))
+
+
+def test_bounds_ignore_missing_values():
+    stats = FrameStats(make_df())
+    assert stats.bounds("cavity_frequency_GHz") == (5.9, 8.0)
+    assert stats.summary("cavity_frequency_GHz")["quantiles"][0.5] == 6.5
+
+
+if __name__ == "__main__":
+    test_posting_lists_match_masks()
+    test_bounds_ignore_missing_values()
+    print("All frame stats tests passed.")
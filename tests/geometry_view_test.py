@@ -0,0 +1,64 @@
+"""
+Offline tests for the columnar view of design options.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.analysis import Analyzer
+from squadds.core.geometry import GeometryView
+from squadds.core.utils import extract_nested_fields, extract_unified_design_fields
+
+
+def make_options():
+    qubit = {"cross_length": "200um", "connection_pads": {"readout": {"claw_length": "75um", "ground_spacing": "5um"}}}
+    other = {"cross_length": "0.3mm", "connection_pads": {"readout": {"claw_length": "90um", "ground_spacing": "4um"}}}
+    # merged frames repeat the same dictionaries
+    return pd.Series([qubit, other, qubit, qubit])
+
+
+def test_leaves_by_name_and_path():
+    view = GeometryView.from_design_options(make_options())
+    assert len(view) == 4
+    assert ("connection_pads", "readout", "claw_length") in view.paths
+    assert np.array_equal(view.values("claw_length"), [75.0, 90.0, 75.0, 75.0])
+    assert np.array_equal(view.values("cross_length"), [200.0, 300.0, 200.0, 200.0])
+    assert list(view.raw("connection_pads.readout.ground_spacing", rows=[1, 0])) == ["4um", "5um"]
+
+
+def test_take_and_to_pandas():
+    view = GeometryView.from_design_options(make_options()).take([1, 3])
+    frame = view.to_pandas(["claw_length", "cross_length"])
+    assert frame["claw_length"].tolist() == [90.0, 75.0]
+    assert frame["cross_length"].dtype == np.float64
+
+
+def test_unified_fields_match_nested_extraction():
+    qubit = {"cross_length": "200um", "connection_pads": {"readout": {"claw_length": "75um", "claw_width": "15um"}}}
+    cavity = {"cplr_opts": {"finger_count": 3, "cap_gap": "5um"}, "cpw_opts": {"total_length": "4000um", "trace_gap": "6um", "trace_width": "10um"}}
+    clt = {"cplr_opts": {"coupling_length": "200um"}, "cpw_opts": {"total_length": "3000um", "trace_gap": "6um", "trace_width": "10um"}}
+    df = pd.DataFrame({"design_options_qubit": [qubit, qubit, None], "design_options_cavity_claw": [cavity, clt, cavity],
+                       "coupler_type": ["NCap", "CLT", "NCap"]}, index=[4, 7, 9])
+    paths = {"claw_length": ("qubit_options", "connection_pads", "readout", "claw_length"),
+             "cross_gap": ("qubit_options", "cross_gap"),
+             "finger_count": ("cavity_claw_options", "coupler_options", "finger_count"),
+             "coupling_length": ("cavity_claw_options", "coupler_options", "coupling_length"),
+             "total_length": ("cavity_claw_options", "cpw_opts", "left_options", "total_length")}
+    fields = extract_unified_design_fields(df, paths)
+
+    expected = {**extract_nested_fields(df["design_options_qubit"], {name: path[1:] for name, path in list(paths.items())[:2]}),
+                **extract_nested_fields(df["design_options_cavity_claw"], {"finger_count": ("cplr_opts", "finger_count"),
+                                                                          "coupling_length": ("cplr_opts", "coupling_length"),
+                                                                          "total_length": ("cpw_opts", "total_length")})}
+    for name in paths:
+        pd.testing.assert_series_equal(fields[name], expected[name], check_names=False)
+
+    # the extractors of the Analyzer read the same fields
+    options = object.__new__(Analyzer).get_cpw_options(df)
+    assert options["total_length"].tolist() == ["4000um", "3000um", "4000um"]
+
+
+if __name__ == "__main__":
+    test_leaves_by_name_and_path()
+    test_take_and_to_pandas()
+    test_unified_fields_match_nested_extraction()
+    print("All geometry view tests passed.")
@@ -0,0 +1,100 @@
+"""
+Offline tests for the streamed qubit-half-wave-cavity DataFrame, against the one built in memory.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from squadds.core.cache import TableCache
+from squadds.core.db import SQuADDS_DB
+from squadds.core.registry import ConfigRegistry
+from squadds.core.store import DatasetStore
+from squadds.core.utils import flatten_table_second_level
+
+QUBIT = "qubit-TransmonCross-cap_matrix"
+
+
+def make_qubit_table(n=12):
+    rng = np.random.default_rng(0)
+    rows = [{"design": {"design_options": {"cross_length": f"{rng.choice([150, 200, 250])}um", "cross_gap": "30um",
+                                           "connection_pads": {"readout": {"claw_length": f"{rng.choice([60, 75, 90])}um", "claw_width": "15um",
+                                                                           "ground_spacing": "5um", "claw_cpw_width": "10um", "claw_cpw_length": "40um"}}}},
+             "sim_results": {"cross_to_claw": -rng.uniform(2, 10), "cross_to_ground": -rng.uniform(80, 120), "claw_to_ground": -rng.uniform(50, 100),
+                             "claw_to_claw": rng.uniform(90, 120), "units": "fF"}}
+            for _ in range(n)]
+    return pa.Table.from_pylist(rows)
+
+
+def make_cavity_df(n=10):
+    rng = np.random.default_rng(1)
+    rows = [{"design": {"coupler_type": "NCap", "resonator_type": "half", "design_options": {
+                "claw_opts": {"connection_pads": {"readout": {"claw_length": f"{rng.choice([60, 75, 90])}um", "claw_width": "15um", "ground_spacing": "10um"}}},
+                "cplr_opts": {"finger_count": int(rng.choice([3, 5])), "finger_length": f"{rng.choice([40, 50])}um", "cap_gap": "5um", "cap_width": "10um"},
+                "cpw_opts": {"total_length": f"{rng.choice([3000, 4000])}um", "meander": {"spacing": "100um", "asymmetry": "0um"}}}},
+             "sim_results": {"cavity_frequency": rng.uniform(5e9, 8e9), "kappa": rng.uniform(5e4, 5e5), "units": "Hz"}}
+            for _ in range(n)]
+    return flatten_table_second_level(pa.Table.from_pylist(rows)).to_pandas()
+
+
+def make_session():
+    """Returns a database session reading the qubits from a local store, with the half-wave cavities given directly."""
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    pq.write_table(make_qubit_table(), store.table_path(QUBIT))
+    store._revision = "r1"
+    store.manifest["entries"][QUBIT] = {"revision": "r1", "fingerprint": "f1"}
+
+    # an instance of its own rather than the shared one
+    db = object.__new__(SQuADDS_DB)
+    db.__init__()
+    db.store = store
+    db.cache = TableCache()
+    db._registry = ConfigRegistry([QUBIT], revision="r1")
+    db.selected_system = ["qubit", "cavity_claw"]
+    db.selected_qubit, db.selected_cavity, db.selected_coupler = "TransmonCross", "RouteMeander", "CapNInterdigitalTee"
+    db.generate_updated_half_wave_cavity_df = lambda parallelize=False, num_cpu=None: make_cavity_df()
+    return db
+
+
+def test_stream_matches_in_memory():
+    expected = make_session().generate_qubit_half_wave_cavity_df()
+
+    output_path = os.path.join(tempfile.mkdtemp(), "stream.parquet")
+    # a tiny budget writes one row group per row
+    path = make_session().generate_qubit_half_wave_cavity_df(stream=True, output_path=output_path, memory_budget_mb=1e-6)
+    assert pq.ParquetFile(path).num_row_groups == len(expected) > 1
+
+    streamed = pd.read_parquet(path)
+    assert streamed.dtypes.to_dict() == expected.dtypes.to_dict()
+    pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True))
+
+
+def test_only_the_merge_sees_compact_dtypes():
+    db = make_session()
+    reads = []
+    load_config_table = db._load_config_table
+    db._load_config_table = lambda config, **kwargs: reads.append(config) or load_config_table(config, **kwargs)
+    db.generate_qubit_half_wave_cavity_df()
+    assert reads == [QUBIT]
+    assert db.qubit_df["cross_to_claw"].dtype == np.float64 and db.qubit_df["units"].dtype == object
+    assert db.qubit_df.drop(columns=["claw_length"], errors="ignore").equals(flatten_table_second_level(make_qubit_table()).to_pandas())
+
+
+def test_stream_saves_the_cavities():
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        make_session().generate_qubit_half_wave_cavity_df(save_data=True, stream=True, output_path="stream.parquet")
+        pd.testing.assert_frame_equal(pd.read_parquet("data/half-wave-cavity_df.parquet"), make_cavity_df())
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_stream_matches_in_memory()
+    test_only_the_merge_sees_compact_dtypes()
+    test_stream_saves_the_cavities()
+    print("All half-wave stream tests passed.")
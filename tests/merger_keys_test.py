@@ -0,0 +1,39 @@
+"""
+Offline tests for the keys the qubit and cavity rows are matched on.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.utils import extract_nested_fields, numeric_join_keys
+
+
+def test_equal_lengths_give_equal_keys():
+    keys = numeric_join_keys(pd.Series(["75um", "75.0um", "0.075mm", "75000nm", "90um", "0um", None, "bad"]))
+    assert keys[0] == keys[1] == keys[2] == keys[3]
+    assert keys[4] != keys[0] and keys[5] == 0.0
+    assert np.isnan(keys[6]) and np.isnan(keys[7])
+    # the keys are SI values
+    assert np.isclose(keys[0], 75e-6)
+
+
+def test_nested_fields_match_a_row_by_row_walk():
+    readout = {"connection_pads": {"readout": {"claw_length": "75um", "claw_width": "15um"}}}
+    other = {"connection_pads": {"readout": {"claw_length": "0.09mm"}}}
+    values = pd.Series([readout, other, readout, readout], index=[3, 5, 7, 9])
+    paths = {"claw_length": ("connection_pads", "readout", "claw_length"), "claw_width": ("connection_pads", "readout", "claw_width")}
+
+    fields = extract_nested_fields(values, paths)
+    for name, path in paths.items():
+        expected = values.map(lambda x: x["connection_pads"]["readout"].get(path[-1]))
+        assert fields[name].index.equals(values.index)
+        assert fields[name].tolist() == expected.tolist()
+
+    # dictionaries without a common schema are walked row by row
+    mixed = pd.Series([readout, {"connection_pads": "none"}])
+    assert extract_nested_fields(mixed, paths)["claw_length"].tolist() == ["75um", None]
+
+
+if __name__ == "__main__":
+    test_equal_lengths_give_equal_keys()
+    test_nested_fields_match_a_row_by_row_walk()
+    print("All merger key tests passed.")
@@ -0,0 +1,56 @@
+"""
+Offline tests for the batch implementation of the metric strategies.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.metrics import (ChebyshevMetric, CustomMetric,
+                                  EuclideanMetric, ManhattanMetric,
+                                  WeightedEuclideanMetric, merge_smallest,
+                                  smallest_k)
+
+
+def make_df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"qubit_frequency_GHz": rng.uniform(3, 7, 50), "g_MHz": rng.uniform(50, 150, 50),
+                         "cavity_frequency_GHz": rng.uniform(5, 9, 50)})
+
+
+def test_batch_matches_rows():
+    df = make_df()
+    target_params = {"qubit_frequency_GHz": 4.5, "g_MHz": 70, "cavity_frequency_GHz": 7.0}
+    for metric in [EuclideanMetric(), ManhattanMetric(), ChebyshevMetric(), WeightedEuclideanMetric({"g_MHz": 2})]:
+        assert metric.supports_batch()
+        rows = df.apply(lambda row: metric.calculate(target_params, row), axis=1).to_numpy()
+        batch = metric.calculate_batch(target_params, df[metric.batch_columns(target_params)].to_numpy())
+        assert np.allclose(rows, batch, rtol=1e-12, atol=0)
+
+
+def test_row_only_metrics():
+    class LegacyMetric(EuclideanMetric):
+        def calculate(self, target_params, df_row):
+            return 0.0
+
+    assert not CustomMetric(lambda target, simulated: 0.0).supports_batch()
+    assert not LegacyMetric().supports_batch()
+
+
+def test_top_k_matches_nsmallest():
+    distances = np.round(np.random.default_rng(2).uniform(0, 5, 1000), 1)
+    distances[[3, 500]] = np.nan
+    expected = pd.Series(distances).nsmallest(20).index.to_numpy()
+    assert list(smallest_k(distances, 20)) == list(expected)
+
+    # the closest rows of consecutive chunks merge into the closest rows overall
+    chunks = []
+    for start in range(0, 1000, 300):
+        selected = smallest_k(distances[start:start + 300], 20)
+        chunks.append((distances[start:start + 300][selected], selected + start))
+    assert list(merge_smallest(chunks, 20)[1]) == list(expected)
+
+
+if __name__ == "__main__":
+    test_batch_matches_rows()
+    test_row_only_metrics()
+    test_top_k_matches_nsmallest()
+    print("All metric batch tests passed.")
@@ -0,0 +1,74 @@
+"""
+Offline tests for the pairing of half-wave cavities with the NCap coupler simulations.
+"""
+import numpy as np
+import pandas as pd
+
+from squadds.core.processing import (update_cavity_frequency_and_kappa,
+                                     update_ncap_parameters)
+
+MERGER_TERMS = ['prime_width', 'prime_gap', 'second_width', 'second_gap']
+NCAP_SIM_COLS = ['bottom_to_bottom', 'bottom_to_ground', 'ground_to_ground', 'top_to_bottom', 'top_to_ground', 'top_to_top']
+
+
+def merge_reference(cavity_df, ncap_df, merger_terms, ncap_sim_cols):
+    """The pairing as it was done before, with `pd.merge` on the wide frames."""
+    cavity_df, ncap_df = cavity_df.copy(), ncap_df.copy()
+    for term in merger_terms:
+        cavity_df[f'temp_{term}'] = cavity_df['design_options'].map(lambda x: x['cplr_opts'].get(term))
+        ncap_df[f'temp_{term}'] = ncap_df['design_options'].map(lambda x: x.get(term))
+    cavity_df = cavity_df.reset_index().rename(columns={'index': 'index_cc'})
+    ncap_df = ncap_df.reset_index().rename(columns={'index': 'index_cplr'})
+    temp = [f'temp_{term}' for term in merger_terms]
+    merged_df = pd.merge(cavity_df, ncap_df, left_on=temp, right_on=temp, suffixes=('_cavity_claw', '_ncap'))
+
+    cavity_frequency_updated, kappa = update_cavity_frequency_and_kappa(merged_df)
+    merged_df.loc[:, "cavity_frequency"] = cavity_frequency_updated
+    merged_df.loc[:, "kappa"] = kappa
+
+    def update_cpw_cplr_opts(row):
+        ncap_opts = row["design_options_ncap"]
+        cplr_opts = row["design_options_cavity_claw"]["cplr_opts"].copy()
+        for term in set(ncap_opts) & set(cplr_opts):
+            cplr_opts[term] = ncap_opts[term]
+        return cplr_opts
+
+    merged_df["design_options_cavity_claw"] = merged_df.apply(
+        lambda row: {**row["design_options_cavity_claw"], "cplr_opts": update_cpw_cplr_opts(row)}, axis=1)
+    merged_df = merged_df.drop(columns=temp)
+    merged_df = merged_df.drop(columns=[col for col in merged_df.columns if col.endswith("_ncap") and col != 'index_cplr'])
+    merged_df = merged_df.drop(columns=ncap_sim_cols)
+    return merged_df.rename(columns={col: col.replace("_cavity_claw", "") for col in merged_df.columns})
+
+
+def make_frames():
+    rng = np.random.default_rng(0)
+    geometries = [("11.7um", "5.1um"), ("10um", "6um"), ("12um", "5.1um")]
+    cavity_rows, ncap_rows = [], []
+    for i in range(8):
+        width, gap = geometries[i % 3]
+        cplr = {'prime_width': width, 'prime_gap': gap, 'second_width': width, 'second_gap': gap, 'finger_count': 3, 'cap_gap': '5um'}
+        cavity_rows.append({'coupler_type': 'NCap', 'design_options': {'cplr_opts': cplr, 'cpw_opts': {'total_length': f"{4000 + i}um"}},
+                            'cavity_frequency': rng.uniform(5e9, 8e9), 'kappa': 1e5})
+    # the third geometry has no NCap simulation, the first one has two
+    for i, (width, gap) in enumerate([geometries[0], geometries[1], geometries[0]]):
+        options = {'prime_width': width, 'prime_gap': gap, 'second_width': width, 'second_gap': gap, 'finger_count': 5 + i, 'cap_gap': f"{4 + i}um"}
+        ncap_rows.append({'coupler_type': 'NCap', 'design_options': options, 'ncap_tool': 'q3d',
+                          **{col: rng.uniform(-30, 50) for col in NCAP_SIM_COLS}})
+    return pd.DataFrame(cavity_rows, index=np.arange(10, 18)), pd.DataFrame(ncap_rows)
+
+
+def test_pairing_matches_the_merge():
+    cavity_df, ncap_df = make_frames()
+    expected = merge_reference(cavity_df, ncap_df, MERGER_TERMS, NCAP_SIM_COLS)
+    result = update_ncap_parameters(cavity_df.copy(), ncap_df.copy(), MERGER_TERMS, NCAP_SIM_COLS)
+
+    assert len(result) == 9
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result.drop(columns=['design_options']), expected.drop(columns=['design_options']))
+    assert result['design_options'].tolist() == expected['design_options'].tolist()
+
+
+if __name__ == "__main__":
+    test_pairing_matches_the_merge()
+    print("All NCap pairing tests passed.")
@@ -0,0 +1,89 @@
+"""
+Offline tests for the background prefetch of the datasets of a selected system.
+"""
+import tempfile
+import threading
+
+import pyarrow as pa
+
+from squadds.core.cache import TableCache
+from squadds.core.db import SQuADDS_DB
+from squadds.core.prefetch import Prefetch
+from squadds.core.registry import ConfigRegistry
+from squadds.core.store import DatasetStore
+
+QUBIT = "qubit-TransmonCross-cap_matrix"
+CAVITY = "cavity_claw-RouteMeander-eigenmode"
+
+
+def make_session(load_table):
+    """Returns a database session whose store loads its tables with `load_table(config)`."""
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    store._revision = "r1"
+    store.load_table = load_table
+
+    db = SQuADDS_DB().session()
+    db.store = store
+    db.cache = TableCache()
+    db._registry = ConfigRegistry([QUBIT, CAVITY], revision="r1")
+    db.selected_system = ["qubit", "cavity_claw"]
+    db.selected_qubit = "TransmonCross"
+    db.selected_cavity = "RouteMeander"
+    return db
+
+
+def test_configs_load_concurrently():
+    # each load waits for the other one, so the prefetch only finishes if they run at the same time
+    barrier = threading.Barrier(2, timeout=10)
+    loaded = []
+
+    def load_table(config):
+        barrier.wait()
+        loaded.append(config)
+        return pa.table({"x": [1.0]})
+
+    db = make_session(load_table)
+    prefetch = db.prefetch()
+    assert prefetch.wait(timeout=20) and prefetch.errors() == {}
+    assert sorted(loaded) == [CAVITY, QUBIT] and prefetch.progress() == (2, 2)
+
+    # the tables are served from the cache afterwards
+    db._load_config_table(QUBIT)
+    assert len(loaded) == 2
+
+    # a new prefetch of the same selection reuses the finished tasks
+    assert db.prefetch().futures[QUBIT] is prefetch.futures[QUBIT]
+
+
+def test_errors_surface_on_first_use():
+    def load_table(config):
+        raise IOError(f"cannot read {config}")
+
+    db = make_session(load_table)
+    prefetch = db.prefetch()
+    prefetch.wait()
+    assert set(prefetch.errors()) == {QUBIT, CAVITY}
+    assert isinstance(prefetch.errors()[QUBIT], IOError)
+    # the failure is not cached: using the table loads it again and raises
+    try:
+        db._load_config_table(QUBIT)
+    except IOError:
+        pass
+    else:
+        raise AssertionError("the error of a failed load must surface when the table is used")
+    # a later prefetch starts the failed tasks again
+    assert Prefetch({QUBIT: lambda: 1}, previous=prefetch).futures[QUBIT] is not prefetch.futures[QUBIT]
+
+
+def test_unselect_all_drops_the_prefetch():
+    db = make_session(lambda config: pa.table({"x": [1.0]}))
+    db.prefetch().wait()
+    db.unselect_all()
+    assert db._prefetch is None
+
+
+if __name__ == "__main__":
+    test_configs_load_concurrently()
+    test_errors_surface_on_first_use()
+    test_unselect_all_drops_the_prefetch()
+    print("All prefetch tests passed.")
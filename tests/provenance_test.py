@@ -0,0 +1,82 @@
+"""
+Offline tests for the contributor index persisted by the SQuADDS store.
+"""
+import os
+import tempfile
+import types
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from squadds.core import store as store_module
+from squadds.core.store import DatasetStore, summarize_contributors
+
+
+def make_contributors():
+    alice = {"uploader": "Alice", "PI": "Eli", "group": "QDev", "institution": "USC", "date_created": "2024-01-01"}
+    bob = {"uploader": "Bob", "PI": "Eli", "group": "QDev", "institution": "USC", "date_created": "2024-02-01"}
+    return pa.array([alice, bob, dict(alice, date_created="2024-03-01"), alice])
+
+
+def test_summarize_contributors():
+    summary = summarize_contributors(make_contributors())
+    assert [entry["uploader"] for entry in summary] == ["Alice", "Bob"]
+    assert [entry["rows"] for entry in summary] == [3, 1]
+    assert set(summary[0]) == {"uploader", "PI", "group", "institution", "rows"}
+
+
+def test_provenance_is_read_once_per_fingerprint():
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    config = "qubit-TransmonCross-cap_matrix"
+    pq.write_table(pa.table({"contributor": make_contributors(), "x": [1, 2, 3, 4]}), store.table_path(config))
+    store._revision = "r1"
+    store.manifest["entries"][config] = {"revision": "r1", "fingerprint": "f1"}
+
+    entry = store.provenance(config)
+    assert entry["rows"] == 4 and len(entry["contributors"]) == 2
+
+    # a new process answers from the manifest without reading the table
+    os.remove(store.table_path(config))
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=os.path.dirname(store.root))
+    store._revision = "r1"
+    assert store.provenance(config) == entry
+
+
+def test_provenance_reads_only_the_contributors_from_the_hub():
+    config = "qubit-TransmonCross-cap_matrix"
+    hub = tempfile.mkdtemp()
+    pq.write_table(pa.table({"contributor": make_contributors(), "x": [1, 2, 3, 4]}), os.path.join(hub, "train.parquet"))
+    opened = []
+
+    class FileSystem:
+        def open(self, path, mode="rb"):
+            opened.append(path)
+            return open(os.path.join(hub, os.path.basename(path)), mode)
+
+    def builder(repo, config, revision=None):
+        files = [f"hf://datasets/{repo}@{revision}/{config}/train.parquet"]
+        return types.SimpleNamespace(config=types.SimpleNamespace(data_files={"train": files}))
+
+    def load_dataset(*args, **kwargs):
+        raise AssertionError("the configuration must not be downloaded")
+
+    originals = {name: getattr(store_module, name) for name in ["HfFileSystem", "load_dataset_builder", "load_dataset"]}
+    store_module.HfFileSystem, store_module.load_dataset_builder, store_module.load_dataset = FileSystem, builder, load_dataset
+    try:
+        store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+        store._revision, store._file_hashes = "r1", {f"{config}/train.parquet": "a"}
+        entry = store.provenance(config)
+        assert opened == [f"datasets/SQuADDS/SQuADDS_DB@r1/{config}/train.parquet"]
+        assert entry["rows"] == 4 and [contributor["uploader"] for contributor in entry["contributors"]] == ["Alice", "Bob"]
+        assert entry["fingerprint"] == store._config_fingerprint(config, "r1")
+        assert not os.path.exists(store.table_path(config))
+    finally:
+        for name, value in originals.items():
+            setattr(store_module, name, value)
+
+
+if __name__ == "__main__":
+    test_summarize_contributors()
+    test_provenance_is_read_once_per_fingerprint()
+    test_provenance_reads_only_the_contributors_from_the_hub()
+    print("All provenance tests passed.")
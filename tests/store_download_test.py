@@ -0,0 +1,124 @@
+"""
+Offline tests for the download path of the SQuADDS store, served by a local HTTP stand-in.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from squadds.core.store import DatasetStore, download_file
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from the working directory and honours ``Range: bytes=<start>-`` requests."""
+
+    requests_seen = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        RangeRequestHandler.requests_seen.append((self.path, self.headers.get("Range")))
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+def serve(directory):
+    handler = lambda *args, **kwargs: RangeRequestHandler(*args, directory=directory, **kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_parquet(path):
+    df = pd.DataFrame({"claw_length": [1.0, 2.0, 3.0] * 1000, "coupler_type": ["CLT", "NCap", "CLT"] * 1000})
+    buffer = io.BytesIO()
+    df.to_parquet(buffer)
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+    return df, hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+def test_download_file_resumes_and_verifies():
+    served = tempfile.mkdtemp()
+    _, sha256 = make_parquet(os.path.join(served, "data.parquet"))
+    server, url = serve(served)
+    try:
+        target = os.path.join(tempfile.mkdtemp(), "data.parquet")
+        with open(os.path.join(served, "data.parquet"), "rb") as f:
+            head = f.read(1000)
+        with open(f"{target}.part", "wb") as f:
+            f.write(head)
+
+        RangeRequestHandler.requests_seen.clear()
+        assert download_file(f"{url}/data.parquet", target, sha256=sha256, chunk_size=256) == sha256
+        assert RangeRequestHandler.requests_seen == [("/data.parquet", "bytes=1000-")]
+        assert not os.path.exists(f"{target}.part")
+
+        os.remove(target)
+        try:
+            download_file(f"{url}/data.parquet", target, sha256="0" * 64)
+        except IOError:
+            pass
+        else:
+            raise AssertionError("a corrupted download must be rejected")
+        assert not os.path.exists(target) and not os.path.exists(f"{target}.part")
+    finally:
+        server.shutdown()
+
+
+def test_fetch_file_downloads_once():
+    served = tempfile.mkdtemp()
+    os.makedirs(os.path.join(served, "datasets", "SQuADDS", "SQuADDS_DB", "resolve", "r1"))
+    df, sha256 = make_parquet(os.path.join(served, "datasets", "SQuADDS", "SQuADDS_DB", "resolve", "r1", "data.parquet"))
+    server, url = serve(served)
+    try:
+        store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp(), endpoint=url)
+        store._revision = "r1"
+        store._file_hashes = {"data.parquet": sha256}
+        store._lfs_hashes = {"data.parquet": sha256}
+
+        RangeRequestHandler.requests_seen.clear()
+        path = store.fetch_file("data.parquet")
+        assert store.fetch_file("data.parquet") == path
+        assert len(RangeRequestHandler.requests_seen) == 1
+        assert pd.read_parquet(path).equals(df)
+
+        # a new process pinned to the same revision reuses the stored file
+        store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=os.path.dirname(store.root), endpoint=url)
+        store._revision = "r1"
+        store._file_hashes = {"data.parquet": sha256}
+        assert store.fetch_file("data.parquet") == path
+        assert len(RangeRequestHandler.requests_seen) == 1
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_download_file_resumes_and_verifies()
+    test_fetch_file_downloads_once()
+    print("All store download tests passed.")
@@ -0,0 +1,109 @@
+"""
+Offline tests for the revision pinning of the SQuADDS store, with the Hub calls replaced by stand-ins.
+"""
+import os
+import tempfile
+import types
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from squadds.core import store as store_module
+from squadds.core.store import DatasetStore
+
+REPO = "SQuADDS/SQuADDS_DB"
+
+
+def make_hub(files, sha="r1", fail=False):
+    """Returns stand-ins for `HfApi` and `load_dataset_builder` serving `files` (name -> hash) at commit `sha`."""
+    calls = []
+
+    class Api:
+        def dataset_info(self, repo, files_metadata=False):
+            calls.append(repo)
+            if fail:
+                raise ConnectionError("offline")
+            siblings = [types.SimpleNamespace(rfilename=name, blob_id=blob, lfs=None) for name, blob in files.items()]
+            return types.SimpleNamespace(sha=sha, siblings=siblings)
+
+    def builder(repo, config, revision=None):
+        data_files = {"train": [f"hf://datasets/{repo}@{revision}/{config}/train.parquet"]}
+        return types.SimpleNamespace(config=types.SimpleNamespace(data_files=data_files))
+
+    return Api, builder, calls
+
+
+def patched(**stand_ins):
+    originals = {name: getattr(store_module, name) for name in stand_ins}
+    for name, value in stand_ins.items():
+        setattr(store_module, name, value)
+    return originals
+
+
+def test_revision_and_fingerprint():
+    config = "qubit-TransmonCross-cap_matrix"
+    files = {f"{config}/train.parquet": "a", "cavity_claw-RouteMeander-eigenmode/train.parquet": "b"}
+    api, builder, calls = make_hub(files)
+    originals = patched(HfApi=api, load_dataset_builder=builder)
+    try:
+        store = DatasetStore(REPO, cache_dir=tempfile.mkdtemp())
+        assert store.resolve_revision() == "r1"
+        assert store.resolve_revision() == "r1" and len(calls) == 1
+        fingerprint = store._config_fingerprint(config, "r1")
+
+        # a commit that only touches another configuration keeps the fingerprint
+        store_module.HfApi, _, _ = make_hub(dict(files, **{"cavity_claw-RouteMeander-eigenmode/train.parquet": "c"}), sha="r2")
+        assert store.resolve_revision(refresh=True) == "r2"
+        assert store._config_fingerprint(config, "r2") == fingerprint
+
+        store_module.HfApi, _, _ = make_hub(dict(files, **{f"{config}/train.parquet": "d"}), sha="r3")
+        store.resolve_revision(refresh=True)
+        assert store._config_fingerprint(config, "r3") != fingerprint
+    finally:
+        patched(**originals)
+
+
+def test_manifest_fallback():
+    api, builder, _ = make_hub({}, fail=True)
+    originals = patched(HfApi=api, load_dataset_builder=builder)
+    try:
+        store = DatasetStore(REPO, cache_dir=tempfile.mkdtemp())
+        try:
+            store.resolve_revision()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("an empty store cannot be used without the Hub")
+
+        store.manifest["revision"] = "r0"
+        store._write_manifest()
+        store = DatasetStore(REPO, cache_dir=os.path.dirname(store.root))
+        assert store.resolve_revision() == "r0"
+    finally:
+        patched(**originals)
+
+
+def test_download_drops_empty_structs():
+    config = "qubit-TransmonCross-cap_matrix"
+    api, builder, _ = make_hub({f"{config}/train.parquet": "a"})
+    # `notes` is an empty struct in the datasets, which parquet cannot store
+    table = pa.table({"x": [1.0, 2.0], "notes": pa.array([{}, {}], type=pa.struct([]))})
+
+    def load_dataset(repo, config, revision=None, cache_dir=None):
+        return {"train": types.SimpleNamespace(data=types.SimpleNamespace(table=table))}
+
+    originals = patched(HfApi=api, load_dataset_builder=builder, load_dataset=load_dataset)
+    try:
+        store = DatasetStore(REPO, cache_dir=tempfile.mkdtemp())
+        assert store.load_table(config).column_names == ["x"]
+        assert pq.read_table(store.table_path(config)).column_names == ["x"]
+        assert store.manifest["entries"][config]["revision"] == "r1"
+    finally:
+        patched(**originals)
+
+
+if __name__ == "__main__":
+    test_revision_and_fingerprint()
+    test_manifest_fallback()
+    test_download_drops_empty_structs()
+    print("All store revision tests passed.")
@@ -0,0 +1,84 @@
+"""
+Offline tests for the merged system DataFrames materialized in the SQuADDS store.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from squadds.core import db as db_module
+from squadds.core.db import SQuADDS_DB
+from squadds.core.store import DatasetStore
+
+
+def make_frame():
+    qubit = {"cross_length": "200um", "connection_pads": {"readout": {"claw_length": "75um"}}}
+    other = {"cross_length": "250um", "connection_pads": {"readout": {"claw_length": "90um"}}}
+    cavity = {"cplr_opts": {"finger_count": np.int64(3)}, "cpw_opts": {"total_length": "4000um"}}
+    # merged frames repeat the same dictionary objects on many rows
+    return pd.DataFrame({
+        "index_qc": [0, 0, 1, 1],
+        "design_options_qubit": [qubit, qubit, other, None],
+        "design_options_cavity_claw": [cavity, cavity, cavity, cavity],
+        "claw_length": ["75um", "75um", "90um", "90um"],
+        "cavity_frequency": [5e9, 6e9, 7e9, 8e9],
+    })
+
+
+def test_round_trip_keeps_values_and_sharing():
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    df = make_frame()
+    store.save_frame("system", "k1", df)
+
+    loaded = store.load_frame("system", "k1")
+    assert list(loaded.columns) == list(df.columns)
+    assert loaded.drop(columns=["design_options_qubit", "design_options_cavity_claw"]).equals(
+        df.drop(columns=["design_options_qubit", "design_options_cavity_claw"]))
+    assert loaded["design_options_qubit"].tolist() == [df["design_options_qubit"][0]] * 2 + [df["design_options_qubit"][2], None]
+    assert loaded["design_options_cavity_claw"][0] == {"cplr_opts": {"finger_count": 3}, "cpw_opts": {"total_length": "4000um"}}
+    assert list(loaded["design_options_qubit"][0]) == ["cross_length", "connection_pads"]
+    # rows that shared a dictionary share it again
+    assert loaded["design_options_qubit"][0] is loaded["design_options_qubit"][1]
+    assert loaded["design_options_cavity_claw"][0] is loaded["design_options_cavity_claw"][3]
+
+    # a new process finds the frame again
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=os.path.dirname(store.root))
+    assert store.load_frame("system", "k1") is not None
+
+
+def test_stale_key_is_replaced():
+    store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    store.save_frame("system", "k1", make_frame())
+    assert store.load_frame("system", "k2") is None
+
+    store.save_frame("system", "k2", make_frame().iloc[:2])
+    assert store.load_frame("system", "k1") is None
+    assert len(store.load_frame("system", "k2")) == 2
+    assert not os.path.exists(store.frame_path("k1"))
+    assert not os.path.exists(f"{store.frame_path('k1')[:-len('.parquet')]}.dicts.parquet")
+
+
+def test_system_key_covers_the_frame_format():
+    # an instance of its own rather than the shared one
+    db = object.__new__(SQuADDS_DB)
+    db.__init__()
+    db.store = DatasetStore("SQuADDS/SQuADDS_DB", cache_dir=tempfile.mkdtemp())
+    db.store.config_fingerprint = lambda config: f"fingerprint of {config}"
+    configs = ["qubit-TransmonCross-cap_matrix", "cavity_claw-RouteMeander-eigenmode"]
+    key = db._system_key(configs)
+    assert db._system_key(configs) == key
+
+    original = db_module.SYSTEM_FRAME_FORMAT
+    db_module.SYSTEM_FRAME_FORMAT = original + 1
+    try:
+        assert db._system_key(configs) != key
+    finally:
+        db_module.SYSTEM_FRAME_FORMAT = original
+
+
+if __name__ == "__main__":
+    test_round_trip_keeps_values_and_sharing()
+    test_stale_key_is_replaced()
+    test_system_key_covers_the_frame_format()
+    print("All system frame store tests passed.")
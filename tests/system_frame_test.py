@@ -0,0 +1,105 @@
+"""
+Offline tests for the columns of the merged qubit-cavity system DataFrame.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from squadds.core.analysis import Analyzer
+from squadds.core.db import SQuADDS_DB
+from squadds.core.utils import (create_unified_design_options,
+                                flatten_table_second_level)
+
+
+def make_qubit_df(n=12):
+    rng = np.random.default_rng(0)
+    rows = [{"design": {"design_options": {"cross_length": f"{rng.choice([150, 200, 250])}um", "cross_gap": "30um",
+                                           "connection_pads": {"readout": {"claw_length": f"{rng.choice([60, 75, 90])}um", "claw_width": "15um",
+                                                                           "ground_spacing": "5um", "claw_cpw_width": "10um", "claw_cpw_length": "40um"}}}},
+             "sim_results": {"cross_to_claw": -rng.uniform(2, 10), "cross_to_ground": -rng.uniform(80, 120), "claw_to_ground": -rng.uniform(50, 100),
+                             "claw_to_claw": rng.uniform(90, 120), "units": "fF"}}
+            for _ in range(n)]
+    return flatten_table_second_level(pa.Table.from_pylist(rows)).to_pandas()
+
+
+def make_cavity_df(n=10):
+    rng = np.random.default_rng(1)
+    rows = [{"design": {"coupler_type": "CLT", "resonator_type": "quarter", "design_options": {
+                "claw_opts": {"connection_pads": {"readout": {"claw_length": f"{rng.choice([60, 75, 90])}um", "claw_width": "15um", "ground_spacing": "10um"}}},
+                "cplr_opts": {"coupling_length": f"{rng.choice([100, 200])}um", "finger_count": 3},
+                "cpw_opts": {"total_length": f"{rng.choice([3000, 4000])}um"}}},
+             "sim_results": {"cavity_frequency": rng.uniform(5e9, 8e9), "kappa": rng.uniform(5e4, 5e5), "units": "Hz"}}
+            for _ in range(n)]
+    return flatten_table_second_level(pa.Table.from_pylist(rows)).to_pandas()
+
+
+def baseline_merge(qubit_df, cavity_df):
+    """The system DataFrame as `create_qubit_cavity_df` has always built it, with `pd.merge` and a unified row per pair."""
+    qubit_df, cavity_df = qubit_df.copy(), cavity_df.copy()
+    qubit_df["claw_length"] = qubit_df["design_options"].map(lambda x: x["connection_pads"]["readout"].get("claw_length"))
+    cavity_df["claw_length"] = cavity_df["design_options"].map(lambda x: x["claw_opts"]["connection_pads"]["readout"].get("claw_length"))
+    qubit_df = qubit_df.reset_index().rename(columns={"index": "index_qc"})
+    merged_df = pd.merge(qubit_df, cavity_df, on=["claw_length"], how="inner", suffixes=("_qubit", "_cavity_claw"))
+    merged_df["design_options"] = merged_df.apply(create_unified_design_options, axis=1)
+    return merged_df
+
+
+def make_session():
+    # an instance of its own rather than the shared one
+    db = object.__new__(SQuADDS_DB)
+    db.__init__()
+    db.selected_system = ["qubit", "cavity_claw"]
+    db.selected_qubit, db.selected_cavity = "TransmonCross", "RouteMeander"
+    db.selected_coupler, db.selected_resonator_type = "CLT", "quarter"
+    return db
+
+
+def test_system_frame_keeps_the_baseline_columns():
+    qubit_df, cavity_df = make_qubit_df(), make_cavity_df()
+    expected = baseline_merge(qubit_df, cavity_df)
+    db = make_session()
+    df = db.create_qubit_cavity_df(qubit_df.copy(), cavity_df.copy(), merger_terms=db.claw_merger_terms)
+
+    # the index of the cavity rows is the only new column
+    assert [column for column in df.columns if column != "index_cc"] == list(expected.columns)
+    pd.testing.assert_frame_equal(df[expected.columns].drop(columns=["design_options"]), expected.drop(columns=["design_options"]))
+    assert df["design_options"].tolist() == expected["design_options"].tolist()
+
+    db.selected_df = df
+    analyzer = Analyzer(db)
+    assert analyzer.get_design(analyzer.df) == expected["design_options"][0]
+
+
+def test_parallel_system_frame_matches_serial():
+    qubit_df, cavity_df = make_qubit_df(), make_cavity_df()
+    db = make_session()
+    serial = db.create_qubit_cavity_df(qubit_df.copy(), cavity_df.copy(), merger_terms=db.claw_merger_terms)
+    parallel = db.create_qubit_cavity_df(qubit_df.copy(), cavity_df.copy(), merger_terms=db.claw_merger_terms, parallelize=True, num_cpu=2)
+    pd.testing.assert_frame_equal(parallel.drop(columns=["design_options"]), serial.drop(columns=["design_options"]))
+    assert parallel["design_options"].tolist() == serial["design_options"].tolist()
+
+
+def test_closest_df_keeps_the_baseline_columns():
+    qubit_df, cavity_df = make_qubit_df(), make_cavity_df()
+    expected = baseline_merge(qubit_df, cavity_df)
+    db = make_session()
+    db.selected_df = db.create_qubit_cavity_df(qubit_df.copy(), cavity_df.copy(), merger_terms=db.claw_merger_terms)
+
+    analyzer = Analyzer(db)
+    closest_df = analyzer.find_closest({"qubit_frequency_GHz": 4, "cavity_frequency_GHz": 6.2, "kappa_kHz": 120, "resonator_type": "quarter",
+                                        "anharmonicity_MHz": -200, "g_MHz": 70}, num_top=3, display=False)
+    # `find_closest` renames the cavity results to their units, as it always has
+    renamed = expected.rename(columns={"cavity_frequency": "cavity_frequency_GHz", "kappa": "kappa_kHz"})
+    assert set(renamed.columns) <= set(closest_df.columns)
+    for label, design in closest_df["design_options"].items():
+        assert design == expected["design_options"][label]
+    # the closest designs do not share their dictionaries with the system DataFrame
+    assert closest_df["design_options"].iloc[0]["qubit_options"] is not analyzer.df["design_options"][closest_df.index[0]]["qubit_options"]
+    assert analyzer.closest_design == closest_df["design_options"].iloc[0]
+
+
+if __name__ == "__main__":
+    test_system_frame_keeps_the_baseline_columns()
+    test_parallel_system_frame_matches_serial()
+    test_closest_df_keeps_the_baseline_columns()
+    print("All system frame tests passed.")
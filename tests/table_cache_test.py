@@ -0,0 +1,60 @@
+"""
+Offline tests for the in-process table cache shared by database sessions.
+"""
+import threading
+import time
+
+import pyarrow as pa
+
+from squadds.core.cache import TableCache
+
+
+def test_concurrent_misses_load_once():
+    cache = TableCache(max_bytes=1024 ** 2)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return pa.table({"x": [1, 2, 3]})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(("config",), loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(table is results[0] for table in results)
+
+
+def test_shared_buffers_are_counted_once():
+    table = pa.table({"x": pa.array(range(1000), pa.int64()), "y": pa.array(range(1000), pa.float64())})
+    cache = TableCache(max_bytes=24000)
+    cache.put(("full",), table)
+    assert cache.current_bytes == 16000
+
+    # a projection and a slice share the buffers of the full table
+    cache.put(("x",), table.select(["x"]))
+    assert cache.current_bytes == 16000
+    sliced = TableCache()
+    sliced.put(("full",), table)
+    sliced.put(("head",), table.slice(0, 10))
+    assert sliced.current_bytes == 16000
+
+    cache.put(("object",), object(), nbytes=5000)
+    assert cache.current_bytes == 21000
+
+    # evicting the full table only frees the buffers its projection does not hold
+    cache.put(("other",), pa.table({"z": pa.array(range(500), pa.int64())}))
+    assert ("full",) not in cache and ("x",) in cache and cache.evictions == 1
+    assert cache.current_bytes == 8000 + 5000 + 4000
+    cache.clear()
+    assert cache.current_bytes == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_misses_load_once()
+    test_shared_buffers_are_counted_once()
+    print("All table cache tests passed.")
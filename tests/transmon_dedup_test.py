@@ -0,0 +1,30 @@
+"""
+Offline tests for the diagonalization of each distinct transmon only once.
+"""
+import numpy as np
+
+from squadds.calcs.transmon_cross import TransmonCrossHamiltonian
+
+
+def test_distinct_pairs_match_row_by_row():
+    # the Hamiltonian helpers do not need an analyzer
+    hamiltonian = object.__new__(TransmonCrossHamiltonian)
+    EC = np.array([0.2, 0.25, 0.2, 0.3, 0.25, 0.2])
+    EJ = np.array([12.0, 12.0, 12.0, 15.0, 12.0, 15.0])
+
+    E01, alpha = hamiltonian.unique_E01_and_anharmonicity(EJ, EC)
+    expected = np.array([hamiltonian.E01_and_anharmonicity(ej, ec) for ej, ec in zip(EJ, EC)])
+    assert np.array_equal(E01, expected[:, 0]) and np.array_equal(alpha, expected[:, 1])
+
+    # a single EJ, as when every row uses the EJ of the target
+    E01, alpha = hamiltonian.unique_E01_and_anharmonicity(12.0, EC)
+    expected = np.array([hamiltonian.E01_and_anharmonicity(12.0, ec) for ec in EC])
+    assert np.array_equal(E01, expected[:, 0]) and np.array_equal(alpha, expected[:, 1])
+
+    E01, alpha = hamiltonian.unique_E01_and_anharmonicity(12.0, np.array([]))
+    assert len(E01) == 0 and len(alpha) == 0
+
+
+if __name__ == "__main__":
+    test_distinct_pairs_match_row_by_row()
+    print("All transmon deduplication tests passed.")
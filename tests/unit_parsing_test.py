@@ -0,0 +1,52 @@
+"""
+Offline tests for the vectorized parsing of strings with units.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from squadds.core import utils
+from squadds.core.utils import parse_unit_strings, string_to_float
+
+
+def test_canonical_and_si_units():
+    values = pd.Series(["30um", "12.5um", None, "0.5mm", "10nH", "5.1GHz", "7", "bad"])
+    expected = [30.0, 12.5, np.nan, 500.0, 10.0, 5.1, 7.0, np.nan]
+    assert np.allclose(parse_unit_strings(values), expected, equal_nan=True)
+    assert np.allclose(parse_unit_strings(["75um", "0.075mm"], units="SI"), [75e-6, 75e-6])
+    assert string_to_float("30um") == 30.0
+
+
+def test_arrow_input_and_dtype():
+    array = pa.chunked_array([["1um", "2nm"], [None, "1um"]])
+    parsed = parse_unit_strings(array, dtype=np.float32)
+    assert parsed.dtype == np.float32
+    assert np.allclose(parsed, [1.0, 0.002, np.nan, 1.0], equal_nan=True)
+
+
+def test_threads_share_the_cache():
+    limit = utils._PARSED_UNIT_STRINGS_LIMIT
+    # a tiny cache is cleared all the time while the threads read it
+    utils._PARSED_UNIT_STRINGS_LIMIT = 8
+
+    def parse(worker):
+        for round in range(50):
+            lengths = np.arange(worker * 1000 + round, worker * 1000 + round + 6)
+            assert np.array_equal(parse_unit_strings([f"{length}um" for length in lengths]), lengths)
+            assert parse_unit_strings(f"{lengths[0]}nm", units="SI") == lengths[0] * 1e-9
+        return True
+
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            assert all(pool.map(parse, range(8)))
+    finally:
+        utils._PARSED_UNIT_STRINGS_LIMIT = limit
+
+
+if __name__ == "__main__":
+    test_canonical_and_si_units()
+    test_arrow_input_and_dtype()
+    test_threads_share_the_cache()
+    print("All unit parsing tests passed.")